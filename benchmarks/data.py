@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict
+
+from client.jse_client import STATUS_FINAL
+
+# Provisional hours come back with a lower status until the DSO finalizes them.
+STATUS_PROVISIONAL = 100
+
+SIZES = {
+    "day": 24,
+    "month": 24 * 31,
+    "year": 24 * 365,
+    "5years": 24 * (365 * 5 + 1),
+}
+
+SERIES_START = datetime(2021, 1, 1, tzinfo=timezone.utc)
+
+
+def consumption_response(hours: int, provisional_every: int = 10) -> Dict[str, Any]:
+    """An hourly consumption response shaped like the API's, deterministic per size."""
+    points = []
+    for index in range(hours):
+        start = SERIES_START + timedelta(hours=index)
+        status = STATUS_PROVISIONAL if index % provisional_every == 0 else STATUS_FINAL
+        points.append(
+            {
+                "startTime": start.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+                "value": round(0.2 + (index * 37 % 101) / 100, 3),
+                "status": status,
+                "type": "kWh",
+            }
+        )
+    return {"data": {"productSeries": [{"data": points}]}}
+
+
+def series_end_epoch(hours: int) -> float:
+    return (SERIES_START + timedelta(hours=hours)).timestamp()
@@ -0,0 +1,82 @@
+"""Throughput and retry behaviour of JSEClient against the local stand-in server.
+
+    python -m benchmarks.load --days 365 --workers 8 --latency-ms 80 --rate-429 0.05
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from datetime import date, timedelta
+from typing import List, Optional
+
+from client.fake_server import FakeHelmiServer, FakeServerConfig
+from client.jse_client import normalize_consumption_response
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load test against the stand-in server")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--granularity", choices=["hour", "day"], default="hour")
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--latency-jitter-ms", type=float, default=20.0)
+    parser.add_argument("--rate-401", type=float, default=0.0)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--rate-5xx", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=int)
+    parser.add_argument("--token-ttl", type=int, default=3600)
+    args = parser.parse_args(argv)
+
+    config = FakeServerConfig(
+        token_ttl=args.token_ttl,
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.latency_jitter_ms,
+        rate_401=args.rate_401,
+        rate_429=args.rate_429,
+        rate_5xx=args.rate_5xx,
+        retry_after=args.retry_after,
+    )
+    end = date(2026, 1, 1)
+    start = end - timedelta(days=args.days)
+    with FakeHelmiServer(config) as server:
+        client = server.client()
+        customer_id = client.get_customer_ids(client.get_user_sub())[0]
+        metering_point_id = client.get_metering_point_ids(customer_id)[0]
+        discovery_requests = server.stats.get("api", 0)
+        started = time.perf_counter()
+        error = None
+        points = 0
+        try:
+            raw = client.get_consumption_range(
+                customer_id=customer_id,
+                metering_point_id=metering_point_id,
+                start=start.isoformat(),
+                end=end.isoformat(),
+                resolution=args.granularity,
+                max_workers=args.workers,
+            )
+            points = len(normalize_consumption_response(raw, args.granularity)["series"])
+        except Exception as exc:  # noqa: BLE001 - report instead of crashing the run
+            error = repr(exc)
+        elapsed = time.perf_counter() - started
+        stats = dict(sorted(server.stats.items()))
+
+    requests_sent = stats.get("api", 0) - discovery_requests
+    report = {
+        "seconds": round(elapsed, 3),
+        "points": points,
+        "points_per_second": round(points / elapsed, 1) if elapsed else None,
+        "api_requests": requests_sent,
+        "requests_per_second": round(requests_sent / elapsed, 1) if elapsed else None,
+        "error": error,
+        "server": stats,
+    }
+    json.dump(report, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 1 if error else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+"""Time the hot paths on synthetic hourly series and compare against stored baselines.
+
+    python -m benchmarks.run                 # compare, exit 1 on regression
+    python -m benchmarks.run --update        # record new baselines
+    python -m benchmarks.run --filter normalize --size year
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import timeit
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from client.jse_client import consumption_records, normalize_consumption_response
+from client.rollup import MONTH, rollup
+from client.timeutil import helsinki_offsets
+
+from .data import SIZES, consumption_response, series_end_epoch
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines.json")
+DEFAULT_THRESHOLD = 1.25
+# Aim for roughly this much work per timing run.
+TARGET_SECONDS = 0.2
+REPEAT = 5
+
+Case = Callable[[int], Optional[Callable[[], Any]]]
+
+
+def _normalize(hours: int) -> Callable[[], Any]:
+    response = consumption_response(hours)
+    return lambda: normalize_consumption_response(response, "hour")
+
+
+def _normalize_full_only(hours: int) -> Callable[[], Any]:
+    response = consumption_response(hours)
+    return lambda: normalize_consumption_response(response, "hour", full_only=True)
+
+
+def _coordinator_parse(hours: int) -> Optional[Callable[[], Any]]:
+    try:
+        from custom_components.jse_helmi.coordinator import _parse_hourly
+    except ImportError:
+        return None
+    response = consumption_response(hours)
+    end_epoch = series_end_epoch(hours)
+    return lambda: _parse_hourly(response, end_epoch)
+
+
+def _hourly_total_update(hours: int) -> Optional[Callable[[], Any]]:
+    try:
+        from custom_components.jse_helmi.coordinator import _parse_hourly
+        from custom_components.jse_helmi.series import ConsumptionSeries
+        from custom_components.jse_helmi.sensor import JSEHourlyTotalSensor
+    except ImportError:
+        return None
+    series = ConsumptionSeries()
+    records, _ = _parse_hourly(consumption_response(hours), series_end_epoch(hours))
+    for epoch, value, status in records:
+        series.upsert(epoch, value, status)
+    # Drive the entity without a running Home Assistant: no hass, no state machine.
+    sensor = JSEHourlyTotalSensor.__new__(JSEHourlyTotalSensor)
+    sensor.coordinator = SimpleNamespace(
+        data=SimpleNamespace(series=series), last_update_success=True
+    )
+    sensor.async_write_ha_state = lambda: None
+    first_epoch = series.epochs[0]
+
+    def update() -> None:
+        # Every call counts all hours after the first, like a long catch-up.
+        sensor._total = 1.0
+        sensor._last_epoch = first_epoch
+        sensor._last_ts = None
+        sensor._seed_ts = None
+        sensor._handle_coordinator_update()
+
+    return update
+
+
+def _rollup_months(hours: int) -> Callable[[], Any]:
+    records, _ = consumption_records(consumption_response(hours))
+    epochs = [record[0] for record in records]
+    values = [record[1] for record in records]
+    statuses = [record[2] for record in records]
+
+    def run_rollup() -> Any:
+        # Offsets are part of the work: they are looked up per point on every rollup.
+        return rollup(epochs, values, statuses, helsinki_offsets(epochs), MONTH)
+
+    return run_rollup
+
+
+CASES: Dict[str, Case] = {
+    "normalize": _normalize,
+    "normalize_full_only": _normalize_full_only,
+    "coordinator_parse": _coordinator_parse,
+    "hourly_total_update": _hourly_total_update,
+    "rollup_months": _rollup_months,
+}
+
+
+def calibrate() -> float:
+    """Seconds for a fixed pure-Python workload, used to scale baselines across machines."""
+
+    def work() -> int:
+        total = 0
+        for index in range(20000):
+            total += index * index % 7
+        return total
+
+    return min(timeit.repeat(work, number=10, repeat=REPEAT)) / 10
+
+
+def time_call(func: Callable[[], Any]) -> float:
+    """Best per-call time in seconds over REPEAT runs."""
+    timer = timeit.Timer(func)
+    number, elapsed = timer.autorange()
+    number = max(1, int(number * TARGET_SECONDS / max(elapsed, 1e-9)))
+    return min(timer.repeat(repeat=REPEAT, number=number)) / number
+
+
+def run(names: List[str], sizes: List[str]) -> Tuple[Dict[str, float], List[str]]:
+    results: Dict[str, float] = {}
+    skipped: List[str] = []
+    for name in names:
+        for size in sizes:
+            key = f"{name}[{size}]"
+            func = CASES[name](SIZES[size])
+            if func is None:
+                skipped.append(key)
+                continue
+            results[key] = time_call(func)
+    return results, skipped
+
+
+def compare(
+    results: Dict[str, float],
+    baselines: Dict[str, float],
+    scale: float,
+) -> List[Tuple[str, float, Optional[float], Optional[float]]]:
+    """Rows of (key, seconds, baseline, ratio); ratio is None without a baseline."""
+    rows = []
+    for key, seconds in results.items():
+        baseline = baselines.get(key)
+        ratio = seconds / (baseline * scale) if baseline else None
+        rows.append((key, seconds, baseline, ratio))
+    return rows
+
+
+def load_baselines(path: str) -> Dict[str, Any]:
+    try:
+        with open(path, "r", encoding="utf-8") as handle:
+            return json.load(handle)
+    except FileNotFoundError:
+        return {}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="JSE Helmi benchmarks")
+    parser.add_argument("--filter", action="append", choices=sorted(CASES))
+    parser.add_argument("--size", action="append", choices=list(SIZES))
+    parser.add_argument("--baselines", default=BASELINE_PATH)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--update", action="store_true", help="Write results as the new baselines")
+    args = parser.parse_args(argv)
+
+    names = args.filter or list(CASES)
+    sizes = args.size or list(SIZES)
+    stored = load_baselines(args.baselines)
+    calibration = calibrate()
+    results, skipped = run(names, sizes)
+
+    if args.update:
+        benchmarks = dict(stored.get("benchmarks") or {})
+        # Keep the stored calibration and scale the new results to it, so
+        # entries that were not re-run are left exactly as recorded.
+        stored_calibration = stored.get("calibration") or calibration
+        factor = stored_calibration / calibration
+        benchmarks.update({key: value * factor for key, value in results.items()})
+        with open(args.baselines, "w", encoding="utf-8") as handle:
+            json.dump(
+                {
+                    "calibration": stored_calibration,
+                    "benchmarks": dict(sorted(benchmarks.items())),
+                },
+                handle,
+                indent=2,
+            )
+            handle.write("\n")
+
+    scale = calibration / stored["calibration"] if stored.get("calibration") else 1.0
+    rows = compare(results, stored.get("benchmarks") or {}, scale)
+    regressions = 0
+    unchecked = 0
+    print(f"{'benchmark':36} {'per call':>12} {'baseline':>12} {'ratio':>7}")
+    for key, seconds, baseline, ratio in rows:
+        flag = ""
+        if ratio is None and not args.update:
+            # Timed, but nothing to compare against: not covered by the regression check.
+            flag = "  UNCHECKED (no baseline)"
+            unchecked += 1
+        elif ratio is not None and ratio > args.threshold and not args.update:
+            flag = "  REGRESSION"
+            regressions += 1
+        baseline_text = f"{baseline * scale * 1e3:10.3f}ms" if baseline else f"{'-':>12}"
+        ratio_text = f"{ratio:7.2f}" if ratio is not None else f"{'-':>7}"
+        print(f"{key:36} {seconds * 1e3:10.3f}ms {baseline_text} {ratio_text}{flag}")
+    for key in skipped:
+        print(f"{key:36} UNCHECKED (skipped, Home Assistant not installed)")
+        unchecked += 1
+    if unchecked:
+        print(f"{unchecked} of {len(rows) + len(skipped)} cases were not checked against a baseline")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
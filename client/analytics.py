@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Sequence
+
+from .rollup import local_days
+from .timeutil import format_local_iso
+
+DEFAULT_PERCENTILES = (50.0, 90.0, 95.0, 99.0)
+DEFAULT_TOP = 10
+# Samples along the load-duration curve, from the peak hour to the lowest one.
+DEFAULT_CURVE_POINTS = 21
+
+
+def analyze(
+    epochs: Sequence[int],
+    values: Sequence[float],
+    offsets: Sequence[int],
+    top: int = DEFAULT_TOP,
+    percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+    curve_points: int = DEFAULT_CURVE_POINTS,
+) -> Dict[str, Any]:
+    """Peaks, percentiles, local hour/weekday profiles and a load-duration curve.
+
+    One pass accumulates the profiles and one sort of the hour indices by
+    value serves the peaks, the percentiles and the curve alike.
+    """
+    size = len(epochs)
+    hour_sums = [0.0] * 24
+    hour_counts = [0] * 24
+    weekday_sums = [0.0] * 7
+    weekday_counts = [0] * 7
+    for epoch, value, offset, day in zip(epochs, values, offsets, local_days(epochs, offsets)):
+        hour = (epoch + offset) % 86400 // 3600
+        # 1970-01-01 was a Thursday; index 0 is Monday.
+        weekday = (day + 3) % 7
+        hour_sums[hour] += value
+        hour_counts[hour] += 1
+        weekday_sums[weekday] += value
+        weekday_counts[weekday] += 1
+    order = sorted(range(size), key=values.__getitem__, reverse=True)
+    ranked = [values[index] for index in order]
+    total = sum(values)
+    return {
+        "hours": size,
+        "total": round(total, 6),
+        "mean": round(total / size, 6) if size else None,
+        "peaks": [
+            {"ts": format_local_iso(epochs[index], offsets[index]), "value": values[index]}
+            for index in order[:top]
+        ],
+        "percentiles": {
+            _label(percentile): _percentile(ranked, percentile) for percentile in percentiles
+        },
+        "profile": {
+            "hour": _means(hour_sums, hour_counts),
+            "weekday": _means(weekday_sums, weekday_counts),
+        },
+        "load_duration": _curve(ranked, curve_points),
+    }
+
+
+def _percentile(descending: List[float], percentile: float) -> Any:
+    """Nearest-rank percentile of values sorted high to low."""
+    if not 0 <= percentile <= 100:
+        raise ValueError(f"Percentile must be between 0 and 100: {percentile}")
+    if not descending:
+        return None
+    rank = max(1, -(-len(descending) * percentile // 100))
+    return descending[len(descending) - int(rank)]
+
+
+def _label(percentile: float) -> str:
+    return f"p{percentile:g}"
+
+
+def _means(sums: List[float], counts: List[int]) -> List[Any]:
+    return [round(s / c, 6) if c else None for s, c in zip(sums, counts)]
+
+
+def _curve(descending: List[float], points: int) -> List[Dict[str, float]]:
+    """Share of hours at or above each sampled load, from the peak down."""
+    size = len(descending)
+    if not size or points < 2:
+        return []
+    curve = []
+    for step in range(points):
+        index = min(size - 1, round(step * (size - 1) / (points - 1)))
+        curve.append({"share": round((index + 1) / size, 6), "value": descending[index]})
+    return curve
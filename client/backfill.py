@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import date, datetime, time as dt_time, timedelta
+from typing import Callable, List, Optional, Tuple
+
+from .jse_client import STATUS_FINAL, JSEClient, consumption_records
+from .store import HistoryStore
+from .timeutil import HELSINKI
+
+# Hour windows are whole local weeks starting on Monday, so reruns with a
+# different --since reuse the same window keys (and the same checkpoint).
+WINDOW_DAYS = 7
+DEFAULT_RATE = 2.0
+
+
+class RateLimiter:
+    """Spaces calls at least ``1 / rate`` seconds apart across threads."""
+
+    def __init__(
+        self,
+        rate: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def acquire(self) -> None:
+        with self._lock:
+            now = self._clock()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            self._sleep(slot - now)
+
+
+@dataclass
+class BackfillResult:
+    windows: int = 0
+    skipped: int = 0
+    fetched: int = 0
+    complete: int = 0
+    points: int = 0
+    failed: List[str] = field(default_factory=list)
+
+
+def week_windows(since: date, until: datetime) -> List[Tuple[str, datetime, datetime]]:
+    """(key, start, end) for the local weeks covering [since, until); the last is clipped."""
+    first = since - timedelta(days=since.weekday())
+    cursor = datetime.combine(first, dt_time.min, tzinfo=HELSINKI)
+    windows = []
+    while cursor < until:
+        # Wall-clock arithmetic keeps every window on a local midnight across DST.
+        window_end = cursor + timedelta(days=WINDOW_DAYS)
+        windows.append((cursor.date().isoformat(), cursor, min(window_end, until)))
+        cursor = window_end
+    return windows
+
+
+def run_backfill(
+    client: JSEClient,
+    store: HistoryStore,
+    customer_id: str,
+    since: date,
+    until: datetime,
+    max_workers: int = 4,
+    rate: float = DEFAULT_RATE,
+    limiter: Optional[RateLimiter] = None,
+) -> BackfillResult:
+    """Fetch every window not yet checkpointed; safe to interrupt and run again.
+
+    A window is complete once it covers a full week and holds every local hour
+    of it, all final; the trailing week, weeks with provisional or missing
+    hours and weeks that came back empty are fetched again on the next run.
+    """
+    windows = week_windows(since, until)
+    done = store.completed()
+    pending = [window for window in windows if window[0] not in done]
+    result = BackfillResult(windows=len(windows), skipped=len(windows) - len(pending))
+    limiter = limiter or RateLimiter(rate)
+
+    def fetch(window: Tuple[str, datetime, datetime]) -> Tuple[str, int, bool]:
+        key, start, end = window
+        limiter.acquire()
+        raw = client.get_consumption(
+            customer_id=customer_id,
+            metering_point_id=store.metering_point_id,
+            start=start.isoformat(),
+            end=end.isoformat(),
+            resolution=store.resolution,
+        )
+        end_epoch = int(end.timestamp())
+        records, unit = consumption_records(raw)
+        records = [record for record in records if record[0] < end_epoch]
+        # A local week holds 167, 168 or 169 hours; one with gaps is fetched again.
+        expected_hours = (end_epoch - int(start.timestamp())) // 3600
+        complete = (
+            end - start >= timedelta(days=WINDOW_DAYS)
+            and len({record[0] for record in records}) == expected_hours
+            and all(status == STATUS_FINAL for _, _, status in records)
+        )
+        store.write_window(key, int(start.timestamp()), end_epoch, records, unit, complete)
+        return key, len(records), complete
+
+    if not pending:
+        return result
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pending)))) as pool:
+        futures = {pool.submit(fetch, window): window[0] for window in pending}
+        try:
+            for future in as_completed(futures):
+                try:
+                    _, points, complete = future.result()
+                except Exception as exc:  # noqa: BLE001 - other windows still proceed
+                    result.failed.append(f"{futures[future]}: {exc}")
+                    continue
+                result.fetched += 1
+                result.points += points
+                result.complete += complete
+        except BaseException:
+            # Interrupted: drop queued windows; finished ones are already checkpointed.
+            for future in futures:
+                future.cancel()
+            raise
+    result.failed.sort()
+    return result
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import json
+import os
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - no advisory locks on Windows
+    fcntl = None  # type: ignore[assignment]
+
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "jse_helmi")
+
+
+class FileCache:
+    """Small JSON document shared between CLI processes.
+
+    Readers and writers take an exclusive ``flock`` on a sidecar ``.lock`` file,
+    so one process can refresh a token while the others wait and then reuse it.
+    """
+
+    def __init__(self, path: str, legacy_path: Optional[str] = None) -> None:
+        self.path = path
+        self.lock_path = f"{path}.lock"
+        # Read once when ``path`` does not exist yet; its contents move to ``path``.
+        self.legacy_path = legacy_path
+
+    @contextmanager
+    def locked(self) -> Iterator[Dict[str, Any]]:
+        """Yield the cache contents under lock; mutations are written back."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.lock_path, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                data = _read(self.path)
+                migrate = False
+                if self.legacy_path and not data and not os.path.exists(self.path):
+                    data = _read(self.legacy_path)
+                    migrate = bool(data)
+                before = json.dumps(data, sort_keys=True)
+                yield data
+                if migrate or json.dumps(data, sort_keys=True) != before:
+                    self._write(data)
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _write(self, data: Dict[str, Any]) -> None:
+        # Tokens live in here, so keep the file private to the user.
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump(data, handle)
+        os.replace(tmp_path, self.path)
+
+
+def _read(path: str) -> Dict[str, Any]:
+    try:
+        with open(path, "r", encoding="utf-8") as handle:
+            data = json.load(handle)
+    except (FileNotFoundError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
@@ -1,15 +1,32 @@
 from __future__ import annotations
 
 import argparse
+from array import array
+from bisect import bisect_left
+import csv
 import json
 import os
 import sys
-from datetime import datetime, timedelta
-from typing import Any, Dict, List
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Iterable, List, Optional, TextIO, Tuple
 
-from zoneinfo import ZoneInfo
+from .analytics import DEFAULT_CURVE_POINTS, DEFAULT_PERCENTILES, DEFAULT_TOP, analyze
+from .backfill import DEFAULT_RATE, run_backfill
+from .cache import DEFAULT_CACHE_DIR, FileCache
+from .columnar import append_records, open_columns
+from .rollup import PERIODS, day_number, next_period_start, rollup
+from .http_cache import ResponseCache
+from .jse_client import (
+    DEFAULT_WORKERS,
+    STATUS_FINAL,
+    JSEClient,
+    iter_consumption_stream,
+    normalize_consumption_response,
+)
+from .store import HistoryStore
+from .timeutil import HELSINKI, helsinki_offsets, local_midnight
 
-from .jse_client import JSEClient, normalize_consumption_response
+STREAM_FIELDS = ["ts", "value", "status", "unit"]
 
 
 def _require_env(name: str) -> str:
@@ -19,14 +36,32 @@ def _require_env(name: str) -> str:
     return value
 
 
+def _cache_dir() -> str:
+    return os.getenv("JSE_CACHE_DIR") or DEFAULT_CACHE_DIR
+
+
+def _store_dir(args: argparse.Namespace) -> str:
+    return args.store or os.getenv("JSE_STORE_DIR") or os.path.join(_cache_dir(), "history")
+
+
 def _build_client() -> JSEClient:
     email = _require_env("JSE_EMAIL")
     password = _require_env("JSE_PASSWORD")
-    return JSEClient(email=email, password=password)
+    cache_dir = _cache_dir()
+    # Tokens cached by earlier versions in tokens.json are picked up on first use.
+    cache = FileCache(
+        os.path.join(cache_dir, "cache.json"), legacy_path=os.path.join(cache_dir, "tokens.json")
+    )
+    return JSEClient(
+        email=email,
+        password=password,
+        cache=cache,
+        response_cache=ResponseCache(os.path.join(cache_dir, "http")),
+    )
 
 
 def _now_local() -> datetime:
-    return datetime.now(ZoneInfo("Europe/Helsinki"))
+    return datetime.now(HELSINKI)
 
 
 def _cmd_login_test(client: JSEClient) -> Dict[str, Any]:
@@ -38,21 +73,33 @@ def _cmd_login_test(client: JSEClient) -> Dict[str, Any]:
 def _cmd_customers(client: JSEClient) -> Dict[str, Any]:
     sub = client.get_user_sub()
     customer_ids = client.get_customer_ids(sub)
-    customers: List[Dict[str, Any]] = []
-    for customer_id in customer_ids:
-        metering_points = client.get_metering_point_ids(customer_id)
-        customers.append(
-            {"customer_id": customer_id, "metering_point_ids": metering_points}
-        )
+    metering_points = client.get_metering_point_ids_by_customer(customer_ids)
+    customers: List[Dict[str, Any]] = [
+        {"customer_id": customer_id, "metering_point_ids": metering_points[customer_id]}
+        for customer_id in customer_ids
+    ]
     return {"customers": customers}
 
 
-def _cmd_consumption(client: JSEClient, args: argparse.Namespace) -> Dict[str, Any]:
+def _resolve_ids(client: JSEClient, args: argparse.Namespace) -> Tuple[str, str]:
+    """Customer and metering point from the flags, else the first ones found."""
     sub = client.get_user_sub()
     customer_ids = client.get_customer_ids(sub)
     if not customer_ids:
         raise RuntimeError("No customer ids found")
     customer_id = args.customer_id or customer_ids[0]
+    if args.metering_point_id:
+        return customer_id, args.metering_point_id
+    metering_points = client.get_metering_point_ids(customer_id)
+    if not metering_points:
+        raise RuntimeError("No metering points found for customer")
+    return customer_id, metering_points[0]
+
+
+def _cmd_consumption(
+    client: JSEClient, args: argparse.Namespace, out: TextIO
+) -> Optional[Dict[str, Any]]:
+    customer_id, metering_point_id = _resolve_ids(client, args)
 
     if args.last_hours is not None:
         end_dt = _now_local().replace(minute=0, second=0, microsecond=0)
@@ -60,32 +107,28 @@ def _cmd_consumption(client: JSEClient, args: argparse.Namespace) -> Dict[str, A
         args.start = start_dt.isoformat()
         args.end = end_dt.isoformat()
 
-    if args.metering_point_id:
-        metering_point_id = args.metering_point_id
-    else:
-        metering_points = client.get_metering_point_ids(customer_id)
-        if not metering_points:
-            raise RuntimeError("No metering points found for customer")
-        metering_point_id = metering_points[0]
+    if args.format != "json":
+        windows = client.iter_consumption_windows(
+            customer_id=customer_id,
+            metering_point_id=metering_point_id,
+            start=args.start,
+            end=args.end,
+            resolution=args.granularity,
+            max_workers=args.workers,
+        )
+        _stream_points(iter_consumption_stream(windows, args.full_only), args.format, out)
+        return None
 
-    raw = client.get_consumption(
+    fetch = client.get_cost_range if args.with_cost else client.get_consumption_range
+    raw = fetch(
         customer_id=customer_id,
         metering_point_id=metering_point_id,
         start=args.start,
         end=args.end,
         resolution=args.granularity,
+        max_workers=args.workers,
     )
-    if args.full_only:
-        data = raw.get("data", {})
-        series_list = data.get("productSeries") or []
-        if series_list:
-            filtered = [
-                point
-                for point in series_list[0].get("data") or []
-                if int(point.get("status", 0)) == 150
-            ]
-            series_list[0]["data"] = filtered
-    normalized = normalize_consumption_response(raw, args.granularity)
+    normalized = normalize_consumption_response(raw, args.granularity, args.full_only)
     return {
         "customer_id": customer_id,
         "metering_point_id": metering_point_id,
@@ -93,6 +136,223 @@ def _cmd_consumption(client: JSEClient, args: argparse.Namespace) -> Dict[str, A
     }
 
 
+def _cmd_backfill(client: JSEClient, args: argparse.Namespace) -> Dict[str, Any]:
+    customer_id, metering_point_id = _resolve_ids(client, args)
+    until = _now_local().replace(minute=0, second=0, microsecond=0)
+    if args.until:
+        until = min(until, datetime.combine(args.until, time.min, tzinfo=HELSINKI))
+    store = HistoryStore(_store_dir(args), metering_point_id)
+    result = run_backfill(
+        client,
+        store,
+        customer_id,
+        since=args.since,
+        until=until,
+        max_workers=args.workers,
+        rate=args.rate,
+    )
+    if result.failed:
+        raise RuntimeError(
+            f"{len(result.failed)} of {result.windows} windows failed; run again to resume "
+            f"(first: {result.failed[0]})"
+        )
+    return {
+        "customer_id": customer_id,
+        "metering_point_id": metering_point_id,
+        "store": store.directory,
+        "windows": result.windows,
+        "skipped": result.skipped,
+        "fetched": result.fetched,
+        "complete": result.complete,
+        "points": result.points,
+    }
+
+
+def _stored_metering_points(root: str) -> List[str]:
+    try:
+        return sorted(
+            name for name in os.listdir(root) if os.path.isdir(os.path.join(root, name))
+        )
+    except FileNotFoundError:
+        return []
+
+
+def _store_for(args: argparse.Namespace) -> HistoryStore:
+    """The local store of --metering-point-id, or of the only metering point stored."""
+    root = _store_dir(args)
+    metering_point_id = args.metering_point_id
+    if not metering_point_id:
+        stored = _stored_metering_points(root)
+        if len(stored) != 1:
+            raise RuntimeError(
+                f"{len(stored)} metering points in {root}; pick one with --metering-point-id"
+            )
+        metering_point_id = stored[0]
+    return HistoryStore(root, metering_point_id)
+
+
+def _cmd_export(args: argparse.Namespace) -> Dict[str, Any]:
+    store = _store_for(args)
+    exported: List[str] = []
+    if os.path.exists(os.path.join(args.out, "epoch.npy")):
+        with open_columns(args.out) as columns:
+            exported = list(columns.meta.get("exported_windows") or [])
+    # Windows exported while complete never change; read every other one, including
+    # weeks that a failed backfill filled in after the last export.
+    done = set(exported)
+    records = []
+    for key in store.window_keys():
+        if key in done:
+            continue
+        window = store.read_window(key)
+        if window is None:
+            continue
+        records.extend(tuple(point) for point in window.get("points") or [])
+        if window.get("complete"):
+            exported.append(key)
+    appended, updated = append_records(
+        args.out,
+        records,
+        {
+            "metering_point_id": store.metering_point_id,
+            "unit": store.unit(),
+            "resolution": store.resolution,
+            "exported_windows": sorted(exported),
+        },
+    )
+    with open_columns(args.out) as columns:
+        rows = columns.rows
+    return {"out": args.out, "rows": rows, "appended": appended, "updated": updated}
+
+
+def _load_hours(
+    args: argparse.Namespace,
+    columns: Optional[str] = None,
+    store: Optional[HistoryStore] = None,
+) -> Tuple[Any, Any, Any, Dict[str, Any]]:
+    """(epochs, values, statuses, meta) from a columns directory, else from the store.
+
+    --since/--until are local dates; the range is [since, until).
+    """
+    start = local_midnight(day_number(args.since)) if args.since else None
+    end = local_midnight(day_number(args.until)) if args.until else None
+    if columns is None and store is None:
+        columns = args.columns
+    if columns:
+        with open_columns(columns) as mapped:
+            lo = bisect_left(mapped.epoch, start) if start is not None else 0
+            hi = bisect_left(mapped.epoch, end) if end is not None else mapped.rows
+            return (
+                array("q", mapped.epoch[lo:hi]),
+                array("d", mapped.value[lo:hi]),
+                array("H", mapped.status[lo:hi]),
+                mapped.meta,
+            )
+    store = store or _store_for(args)
+    epochs, values, statuses = array("q"), array("d"), array("H")
+    for epoch, value, status in store.iter_records(start, end):
+        epochs.append(epoch)
+        values.append(value)
+        statuses.append(status)
+    meta = {"metering_point_id": store.metering_point_id, "unit": store.unit()}
+    return epochs, values, statuses, meta
+
+
+def _cmd_rollup(args: argparse.Namespace) -> Dict[str, Any]:
+    epochs, values, statuses, meta = _load_hours(args)
+    periods = []
+    for period in rollup(epochs, values, statuses, helsinki_offsets(epochs), args.period):
+        start = day_number(period.start)
+        following = next_period_start(start, args.period)
+        expected = (local_midnight(following) - local_midnight(start)) // 3600
+        periods.append(
+            {
+                "start": period.start.isoformat(),
+                "value": period.total,
+                "hours": period.points,
+                "expected_hours": expected,
+                "complete": period.final and period.points == expected,
+            }
+        )
+    return {
+        "metering_point_id": meta.get("metering_point_id"),
+        "unit": meta.get("unit") or "kWh",
+        "period": args.period,
+        "periods": periods,
+    }
+
+
+def _cmd_query(args: argparse.Namespace) -> Dict[str, Any]:
+    sources: List[Tuple[Optional[str], Optional[HistoryStore]]] = [
+        (columns, None) for columns in args.columns or []
+    ]
+    root = _store_dir(args)
+    metering_point_ids = _stored_metering_points(root) if args.all else args.metering_point_id or []
+    sources.extend((None, HistoryStore(root, mp_id)) for mp_id in metering_point_ids)
+    if not sources:
+        sources.append((None, _store_for(args)))
+    reports = []
+    for columns, store in sources:
+        epochs, values, statuses, meta = _load_hours(args, columns, store)
+        if args.full_only:
+            keep = [index for index, status in enumerate(statuses) if status == STATUS_FINAL]
+            epochs = array("q", (epochs[index] for index in keep))
+            values = array("d", (values[index] for index in keep))
+        reports.append(
+            {
+                "metering_point_id": meta.get("metering_point_id"),
+                "unit": meta.get("unit") or "kWh",
+                **analyze(
+                    epochs,
+                    values,
+                    helsinki_offsets(epochs),
+                    top=args.top,
+                    percentiles=args.percentiles,
+                    curve_points=args.curve_points,
+                ),
+            }
+        )
+    return {"reports": reports}
+
+
+def _add_local_source(parser: argparse.ArgumentParser, many: bool = False) -> None:
+    """Flags shared by commands that read local history instead of the API."""
+    parser.add_argument("--since", type=date.fromisoformat, help="First local day (YYYY-MM-DD)")
+    parser.add_argument("--until", type=date.fromisoformat, help="Local day to stop before")
+    if many:
+        parser.add_argument(
+            "--columns", action="append", help="Columns written by `export`; repeatable"
+        )
+        parser.add_argument(
+            "--metering-point-id", action="append", help="Metering point in the store; repeatable"
+        )
+        parser.add_argument(
+            "--all", action="store_true", help="Every metering point in the store"
+        )
+    else:
+        parser.add_argument(
+            "--columns", help="Read columns written by `export` instead of the store"
+        )
+        parser.add_argument("--metering-point-id", help="Metering point in the store")
+    parser.add_argument(
+        "--store",
+        help="Store directory (default: $JSE_STORE_DIR or <cache dir>/history)",
+    )
+
+
+def _stream_points(points: Iterable[Dict[str, Any]], fmt: str, out: TextIO) -> None:
+    """Write points as they arrive so memory stays flat for long exports."""
+    if fmt == "csv":
+        writer = csv.DictWriter(out, fieldnames=STREAM_FIELDS)
+        writer.writeheader()
+        for point in points:
+            writer.writerow(point)
+        return
+    for point in points:
+        out.write(json.dumps(point))
+        out.write("\n")
+
+
 def main(argv: List[str]) -> int:
     parser = argparse.ArgumentParser(description="JSE Helmi CLI")
     subparsers = parser.add_subparsers(dest="command", required=True)
@@ -121,29 +381,128 @@ def main(argv: List[str]) -> int:
     )
     consumption.add_argument("--customer-id", help="Override customer id")
     consumption.add_argument("--metering-point-id", help="Override metering point id")
+    consumption.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="Parallel requests when a long range is split into windows",
+    )
+    consumption.add_argument(
+        "--format",
+        choices=["json", "ndjson", "csv"],
+        default="json",
+        help="json builds one document; ndjson and csv stream one point per line",
+    )
+    consumption.add_argument(
+        "--with-cost",
+        action="store_true",
+        help="Fetch pricing alongside and add price (EUR/kWh) and cost (EUR) per point",
+    )
+
+    backfill = subparsers.add_parser(
+        "backfill", help="Download hourly history into a local store, resuming where it stopped"
+    )
+    backfill.add_argument(
+        "--since", required=True, type=date.fromisoformat, help="First day (YYYY-MM-DD)"
+    )
+    backfill.add_argument(
+        "--until", type=date.fromisoformat, help="Day to stop before (default: now)"
+    )
+    backfill.add_argument("--customer-id", help="Override customer id")
+    backfill.add_argument("--metering-point-id", help="Override metering point id")
+    backfill.add_argument(
+        "--workers", type=int, default=DEFAULT_WORKERS, help="Concurrent window requests"
+    )
+    backfill.add_argument(
+        "--rate",
+        type=float,
+        default=DEFAULT_RATE,
+        help="Most requests started per second across all workers",
+    )
+    backfill.add_argument(
+        "--store",
+        help="Store directory (default: $JSE_STORE_DIR or <cache dir>/history)",
+    )
+
+    export = subparsers.add_parser(
+        "export", help="Append the local store to columnar .npy files for analytics"
+    )
+    export.add_argument("--out", required=True, help="Directory for epoch/value/status.npy")
+    export.add_argument("--metering-point-id", help="Metering point in the store")
+    export.add_argument(
+        "--store",
+        help="Store directory (default: $JSE_STORE_DIR or <cache dir>/history)",
+    )
+
+    rollup_parser = subparsers.add_parser(
+        "rollup", help="Day, ISO week or month totals computed locally from hourly history"
+    )
+    rollup_parser.add_argument("--period", required=True, choices=PERIODS)
+    _add_local_source(rollup_parser)
+
+    query = subparsers.add_parser(
+        "query", help="Peaks, percentiles, profiles and load-duration curves from local history"
+    )
+    _add_local_source(query, many=True)
+    query.add_argument("--top", type=int, default=DEFAULT_TOP, help="Peak hours to list")
+    query.add_argument(
+        "--percentiles",
+        default=",".join(f"{p:g}" for p in DEFAULT_PERCENTILES),
+        help="Comma-separated percentiles of hourly values",
+    )
+    query.add_argument(
+        "--curve-points",
+        type=int,
+        default=DEFAULT_CURVE_POINTS,
+        help="Samples along the load-duration curve",
+    )
+    query.add_argument(
+        "--full-only", action="store_true", help="Only include hours with status=150"
+    )
 
     args = parser.parse_args(argv)
 
     if args.command == "consumption":
         if args.last_hours is None and (not args.start or not args.end):
             parser.error("consumption requires --start and --end unless --last-hours is set")
+        if args.with_cost and args.format != "json":
+            parser.error("--with-cost is only available with --format json")
+    if args.command == "query":
+        try:
+            args.percentiles = [float(item) for item in args.percentiles.split(",") if item.strip()]
+        except ValueError:
+            parser.error("--percentiles must be comma-separated numbers")
+        # NaN fails the comparison too.
+        if not all(0 <= percentile <= 100 for percentile in args.percentiles):
+            parser.error("--percentiles must be between 0 and 100")
 
     try:
-        client = _build_client()
-        if args.command == "login-test":
-            result = _cmd_login_test(client)
-        elif args.command == "customers":
-            result = _cmd_customers(client)
-        elif args.command == "consumption":
-            result = _cmd_consumption(client, args)
+        # Local commands read only files, so no credentials are needed.
+        if args.command == "export":
+            result = _cmd_export(args)
+        elif args.command == "rollup":
+            result = _cmd_rollup(args)
+        elif args.command == "query":
+            result = _cmd_query(args)
         else:
-            raise RuntimeError(f"Unknown command: {args.command}")
+            client = _build_client()
+            if args.command == "login-test":
+                result = _cmd_login_test(client)
+            elif args.command == "customers":
+                result = _cmd_customers(client)
+            elif args.command == "consumption":
+                result = _cmd_consumption(client, args, sys.stdout)
+            elif args.command == "backfill":
+                result = _cmd_backfill(client, args)
+            else:
+                raise RuntimeError(f"Unknown command: {args.command}")
     except Exception as exc:  # noqa: BLE001 - simple CLI error handling
         print(f"error: {exc}", file=sys.stderr)
         return 1
 
-    json.dump(result, sys.stdout, indent=2)
-    sys.stdout.write("\n")
+    if result is not None:
+        json.dump(result, sys.stdout, indent=2)
+        sys.stdout.write("\n")
     return 0
 
 
@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import ast
+from array import array
+from bisect import bisect_left
+from contextlib import contextmanager
+import json
+import mmap
+import os
+import struct
+import sys
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+Record = Tuple[int, float, int]
+
+# One .npy file per column, so numpy.load(path, mmap_mode="r") maps it directly.
+# (name, .npy descr, array typecode); all little-endian.
+COLUMNS = (("epoch", "<i8", "q"), ("value", "<f8", "d"), ("status", "<u2", "H"))
+META_FILE = "meta.json"
+
+_MAGIC = b"\x93NUMPY\x01\x00"
+# Fixed header size with room for any row count, so appends rewrite it in place.
+HEADER_SIZE = 128
+
+
+class Columns:
+    """Read-only memory-mapped columns; ``epoch``, ``value`` and ``status`` are memoryviews."""
+
+    def __init__(self, directory: str) -> None:
+        self._maps: List[mmap.mmap] = []
+        # Every view onto a mapping must be released before the mapping can close.
+        self._views: List[memoryview] = []
+        views: Dict[str, Any] = {}
+        length = None
+        for name, _, typecode in COLUMNS:
+            path = _column_path(directory, name)
+            with open(path, "rb") as handle:
+                rows = _read_header(handle)
+                size = HEADER_SIZE + rows * struct.calcsize(typecode)
+                if rows == 0:
+                    views[name] = array(typecode)
+                else:
+                    mapped = mmap.mmap(handle.fileno(), size, access=mmap.ACCESS_READ)
+                    self._maps.append(mapped)
+                    view = memoryview(mapped)
+                    self._views.append(view)
+                    views[name] = self._track(
+                        _native(self._track(view[HEADER_SIZE:size]), typecode)
+                    )
+            length = rows if length is None else min(length, rows)
+        self.rows = length or 0
+        # An append interrupted between columns leaves them uneven; trust the shortest.
+        self.epoch = self._track(views["epoch"][: self.rows])
+        self.value = self._track(views["value"][: self.rows])
+        self.status = self._track(views["status"][: self.rows])
+        self.meta = _read_meta(directory)
+
+    def _track(self, view: Any) -> Any:
+        if isinstance(view, memoryview):
+            self._views.append(view)
+        return view
+
+    def close(self) -> None:
+        for view in reversed(self._views):
+            view.release()
+        for mapped in self._maps:
+            mapped.close()
+        self._views = []
+        self._maps = []
+
+
+@contextmanager
+def open_columns(directory: str) -> Iterator[Columns]:
+    columns = Columns(directory)
+    try:
+        yield columns
+    finally:
+        columns.close()
+
+
+def append_records(
+    directory: str, records: Iterable[Record], meta: Dict[str, Any]
+) -> Tuple[int, int]:
+    """Add new hours at the end and revise known ones in place; returns (appended, updated).
+
+    Records older than the last stored hour that are not already stored
+    force a full rewrite, which only happens when history is filled in
+    out of order.
+    """
+    os.makedirs(directory, exist_ok=True)
+    incoming = sorted({record[0]: record for record in records}.values())
+    epochs, values, statuses = _load(directory)
+    last = epochs[-1] if epochs else None
+    updates: List[Tuple[int, float, int]] = []
+    tail: List[Record] = []
+    rewrite = False
+    for epoch, value, status in incoming:
+        if last is not None and epoch <= last:
+            index = bisect_left(epochs, epoch)
+            if index < len(epochs) and epochs[index] == epoch:
+                if values[index] != value or statuses[index] != status:
+                    updates.append((index, value, status))
+                continue
+            rewrite = True
+            break
+        tail.append((epoch, value, status))
+    if rewrite:
+        merged = {record[0]: record for record in zip(epochs, values, statuses)}
+        before = dict(merged)
+        merged.update({record[0]: record for record in incoming})
+        rows = [merged[epoch] for epoch in sorted(merged)]
+        _rewrite(directory, rows)
+        updated = sum(1 for epoch in before if before[epoch] != merged[epoch])
+        _write_meta(directory, meta)
+        return len(merged) - len(before), updated
+    if updates:
+        _update_in_place(directory, updates)
+    if tail or not epochs:
+        _append(directory, len(epochs), tail)
+    _write_meta(directory, meta)
+    return len(tail), len(updates)
+
+
+def _column_path(directory: str, name: str) -> str:
+    return os.path.join(directory, f"{name}.npy")
+
+
+def _header(descr: str, rows: int) -> bytes:
+    text = f"{{'descr': '{descr}', 'fortran_order': False, 'shape': ({rows},), }}"
+    body = text.ljust(HEADER_SIZE - len(_MAGIC) - 2 - 1) + "\n"
+    return _MAGIC + struct.pack("<H", len(body)) + body.encode("latin1")
+
+
+def _read_header(handle: Any) -> int:
+    raw = handle.read(HEADER_SIZE)
+    if len(raw) < HEADER_SIZE or not raw.startswith(_MAGIC):
+        raise ValueError(f"{handle.name} is not a column written by this exporter")
+    (length,) = struct.unpack("<H", raw[len(_MAGIC) : len(_MAGIC) + 2])
+    if len(_MAGIC) + 2 + length != HEADER_SIZE:
+        raise ValueError(f"{handle.name} has an unexpected header size")
+    header = ast.literal_eval(raw[len(_MAGIC) + 2 :].decode("latin1"))
+    return int(header["shape"][0])
+
+
+def _native(view: memoryview, typecode: str) -> Any:
+    if sys.byteorder == "little":
+        return view.cast(typecode)
+    # Big-endian hosts get a swapped copy instead of a mapping.
+    values = array(typecode, view.tobytes())
+    values.byteswap()
+    return values
+
+
+def _to_little(values: array) -> bytes:
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _load(directory: str) -> Tuple[array, array, array]:
+    if not os.path.exists(_column_path(directory, "epoch")):
+        return array("q"), array("d"), array("H")
+    with open_columns(directory) as columns:
+        return array("q", columns.epoch), array("d", columns.value), array("H", columns.status)
+
+
+def _append(directory: str, rows: int, tail: List[Record]) -> None:
+    """Append data first and bump the headers last, so readers never see unwritten rows."""
+    for position, (name, descr, typecode) in enumerate(COLUMNS):
+        path = _column_path(directory, name)
+        data = array(typecode, (record[position] for record in tail))
+        mode = "r+b" if os.path.exists(path) else "w+b"
+        with open(path, mode) as handle:
+            if mode == "w+b":
+                handle.write(_header(descr, 0))
+            # Drop rows past the agreed length left by an interrupted append.
+            handle.truncate(HEADER_SIZE + rows * data.itemsize)
+            handle.seek(0, os.SEEK_END)
+            handle.write(_to_little(data))
+            handle.flush()
+            os.fsync(handle.fileno())
+            handle.seek(0)
+            handle.write(_header(descr, rows + len(tail)))
+
+
+def _update_in_place(directory: str, updates: List[Tuple[int, float, int]]) -> None:
+    """Overwrite revised values and statuses; rows are fixed-size, so epochs stay put."""
+    for position, (name, _, typecode) in enumerate(COLUMNS):
+        if name == "epoch":
+            continue
+        size = struct.calcsize(typecode)
+        with open(_column_path(directory, name), "r+b") as handle:
+            for update in updates:
+                handle.seek(HEADER_SIZE + update[0] * size)
+                handle.write(_to_little(array(typecode, [update[position]])))
+
+
+def _rewrite(directory: str, rows: List[Record]) -> None:
+    for position, (name, descr, typecode) in enumerate(COLUMNS):
+        path = _column_path(directory, name)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as handle:
+            handle.write(_header(descr, len(rows)))
+            handle.write(_to_little(array(typecode, (row[position] for row in rows))))
+        os.replace(tmp_path, path)
+
+
+def _read_meta(directory: str) -> Dict[str, Any]:
+    try:
+        with open(os.path.join(directory, META_FILE), "r", encoding="utf-8") as handle:
+            meta = json.load(handle)
+    except (FileNotFoundError, ValueError):
+        return {}
+    return meta if isinstance(meta, dict) else {}
+
+
+def _write_meta(directory: str, meta: Dict[str, Any]) -> None:
+    path = os.path.join(directory, META_FILE)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        json.dump({**_read_meta(directory), **meta}, handle)
+    os.replace(tmp_path, path)
@@ -0,0 +1,423 @@
+"""Local stand-in for Cognito and the Helmi API, for load and fault testing.
+
+    python -m client.fake_server --port 8765 --latency-ms 40 --rate-429 0.05
+
+then point the CLI at it:
+
+    JSE_COGNITO_ENDPOINT=http://127.0.0.1:8765/ JSE_API_BASE=http://127.0.0.1:8765 \\
+    JSE_EMAIL=user@example.com JSE_PASSWORD=secret python -m client.cli customers
+"""
+from __future__ import annotations
+
+import argparse
+import base64
+import hashlib
+import json
+import random
+import secrets
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from .jse_client import STATUS_FINAL, JSEClient, _parse_datetime
+from .timeutil import HELSINKI
+
+DEFAULT_EMAIL = "user@example.com"
+DEFAULT_PASSWORD = "secret"
+STATUS_PROVISIONAL = 100
+
+
+@dataclass
+class FakeServerConfig:
+    email: str = DEFAULT_EMAIL
+    password: str = DEFAULT_PASSWORD
+    sub: str = "00000000-0000-4000-8000-000000000001"
+    customers: int = 1
+    metering_points_per_customer: int = 1
+    # Access token lifetime; short values exercise the refresh flow.
+    token_ttl: int = 3600
+    latency_ms: float = 0.0
+    latency_jitter_ms: float = 0.0
+    # Probabilities of answering an authenticated API request with a fault.
+    rate_401: float = 0.0
+    rate_429: float = 0.0
+    rate_5xx: float = 0.0
+    retry_after: Optional[int] = None
+    # Statuses returned for the next API requests, in order, before random faults.
+    fault_script: List[int] = field(default_factory=list)
+    # Hours before "now" that are still provisional.
+    provisional_hours: int = 48
+    # Largest customerId[] array honoured per request, like a server-side cap.
+    max_customer_batch: int = 50
+    # Send ETags and answer matching If-None-Match with 304.
+    etags: bool = True
+    seed: int = 0
+
+
+class FakeHelmiServer:
+    """Threaded HTTP server; use as a context manager or call start()/stop()."""
+
+    def __init__(
+        self,
+        config: Optional[FakeServerConfig] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        self.config = config or FakeServerConfig()
+        self.stats: Dict[str, int] = {}
+        self._random = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._access_tokens: Dict[str, float] = {}
+        self._refresh_tokens: set = set()
+        self._httpd = ThreadingHTTPServer((host, port), _handler_for(self))
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> FakeHelmiServer:
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        try:
+            self._httpd.serve_forever()
+        finally:
+            self._httpd.server_close()
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self) -> FakeHelmiServer:
+        return self.start()
+
+    def __exit__(self, *_exc: Any) -> None:
+        self.stop()
+
+    def client(self, **kwargs: Any) -> JSEClient:
+        """A JSEClient pointed at this server, logging in with the configured account.
+
+        Keyword arguments (``password``, ``response_cache``, ``breaker``, ...)
+        are passed on to JSEClient.
+        """
+        kwargs.setdefault("email", self.config.email)
+        kwargs.setdefault("password", self.config.password)
+        return JSEClient(cognito_endpoint=f"{self.url}/", api_base=self.url, **kwargs)
+
+    def customer_ids(self) -> List[str]:
+        return [f"jes_{1000000 + index}" for index in range(self.config.customers)]
+
+    def metering_point_ids(self, customer_id: str) -> List[str]:
+        number = customer_id.split("_", 1)[-1]
+        return [
+            f"FI_JSE000_{number}_{index}"
+            for index in range(self.config.metering_points_per_customer)
+        ]
+
+    def count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] = self.stats.get(key, 0) + 1
+
+    def expire_tokens(self) -> None:
+        """Invalidate every issued access token, as if they all timed out."""
+        with self._lock:
+            self._access_tokens.clear()
+
+    def _delay(self) -> None:
+        config = self.config
+        if config.latency_ms or config.latency_jitter_ms:
+            with self._lock:
+                jitter = self._random.uniform(0, config.latency_jitter_ms)
+            time.sleep((config.latency_ms + jitter) / 1000)
+
+    def _injected_fault(self) -> Optional[int]:
+        config = self.config
+        with self._lock:
+            if config.fault_script:
+                return config.fault_script.pop(0)
+            roll = self._random.random()
+        for status, rate in ((401, config.rate_401), (429, config.rate_429), (503, config.rate_5xx)):
+            if roll < rate:
+                return status
+            roll -= rate
+        return None
+
+    def _issue_tokens(self, with_refresh: bool) -> Dict[str, Any]:
+        access = secrets.token_hex(16)
+        with self._lock:
+            self._access_tokens[access] = time.time() + self.config.token_ttl
+        result: Dict[str, Any] = {
+            "AccessToken": access,
+            "IdToken": _fake_jwt({"sub": self.config.sub, "email": self.config.email}),
+            "ExpiresIn": self.config.token_ttl,
+            "TokenType": "Bearer",
+        }
+        if with_refresh:
+            refresh = secrets.token_hex(16)
+            with self._lock:
+                self._refresh_tokens.add(refresh)
+            result["RefreshToken"] = refresh
+        return {"AuthenticationResult": result}
+
+    def _valid_access_token(self, token: str) -> bool:
+        with self._lock:
+            expires_at = self._access_tokens.get(token)
+        return expires_at is not None and expires_at > time.time()
+
+    def cognito(self, target: str, payload: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        params = payload.get("AuthParameters") or {}
+        if target == "InitiateAuth" and payload.get("AuthFlow") == "USER_PASSWORD_AUTH":
+            if (params.get("USERNAME"), params.get("PASSWORD")) != (
+                self.config.email,
+                self.config.password,
+            ):
+                return 400, _cognito_error("NotAuthorizedException", "Incorrect username or password.")
+            return 200, self._issue_tokens(with_refresh=True)
+        if target == "InitiateAuth" and payload.get("AuthFlow") == "REFRESH_TOKEN_AUTH":
+            with self._lock:
+                known = params.get("REFRESH_TOKEN") in self._refresh_tokens
+            if not known:
+                return 400, _cognito_error("NotAuthorizedException", "Invalid Refresh Token")
+            return 200, self._issue_tokens(with_refresh=False)
+        if target == "GetUser":
+            if not self._valid_access_token(payload.get("AccessToken", "")):
+                return 400, _cognito_error("NotAuthorizedException", "Access Token has expired")
+            return 200, {
+                "Username": self.config.email,
+                "UserAttributes": [
+                    {"Name": "sub", "Value": self.config.sub},
+                    {"Name": "email", "Value": self.config.email},
+                ],
+            }
+        return 400, _cognito_error("InvalidParameterException", f"Unsupported {target}")
+
+    def api(self, path: str, query: Dict[str, List[str]]) -> Tuple[int, Any]:
+        if path == "/idm/customerMetadata":
+            if query.get("sub", [""])[0] != self.config.sub:
+                return 200, {"data": {"customer_ids": []}}
+            return 200, {"data": {"customer_ids": self.customer_ids()}}
+        if path == "/customer/customers":
+            requested = query.get("customerId[]", [])[: self.config.max_customer_batch]
+            known = set(self.customer_ids())
+            return 200, {
+                "data": [self._profile(customer_id) for customer_id in requested if customer_id in known]
+            }
+        parts = path.strip("/").split("/")
+        if len(parts) == 4 and parts[0] == "consumption" and parts[2] == "energy":
+            kind, metering_point_id = parts[1], parts[3]
+            if kind not in ("consumption", "pricing"):
+                return 404, {"message": "Not Found"}
+            try:
+                start = _parse_datetime(query["start"][0])
+                end = _parse_datetime(query["end"][0])
+            except (KeyError, ValueError):
+                return 400, {"message": "start and end are required"}
+            resolution = query.get("resolution", ["hour"])[0]
+            points = _generate_points(
+                kind, metering_point_id, start, end, resolution, self.config.provisional_hours
+            )
+            return 200, {"data": {"productSeries": [{"data": points}]}}
+        return 404, {"message": "Not Found"}
+
+    def _profile(self, customer_id: str) -> Dict[str, Any]:
+        return {
+            "id": customer_id,
+            "customerId": customer_id.split("_", 1)[-1],
+            "contracts": [
+                {"meteringPoint": {"meteringPointId": metering_point_id}}
+                for metering_point_id in self.metering_point_ids(customer_id)
+            ],
+        }
+
+
+def _handler_for(server: FakeHelmiServer) -> type:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *_args: Any) -> None:
+            pass
+
+        def do_POST(self) -> None:
+            server._delay()
+            length = int(self.headers.get("Content-Length") or 0)
+            try:
+                payload = json.loads(self.rfile.read(length) or b"{}")
+            except ValueError:
+                payload = {}
+            target = (self.headers.get("X-Amz-Target") or "").rsplit(".", 1)[-1]
+            server.count(f"cognito:{target}")
+            status, body = server.cognito(target, payload)
+            self._send(status, body, "application/x-amz-json-1.1")
+
+        def do_GET(self) -> None:
+            server._delay()
+            url = urlsplit(self.path)
+            server.count("api")
+            auth = self.headers.get("Authorization") or ""
+            if not server._valid_access_token(auth[len("Bearer "):]):
+                server.count("status:401")
+                self._send(401, {"message": "Unauthorized"})
+                return
+            fault = server._injected_fault()
+            if fault is not None:
+                server.count(f"status:{fault}")
+                headers = {}
+                if fault == 429 and server.config.retry_after is not None:
+                    headers["Retry-After"] = str(server.config.retry_after)
+                self._send(fault, {"message": "Injected fault"}, headers=headers)
+                return
+            status, body = server.api(url.path, parse_qs(url.query))
+            headers = {}
+            if status == 200 and server.config.etags:
+                digest = hashlib.sha256(json.dumps(body, sort_keys=True).encode()).hexdigest()
+                headers["ETag"] = f'"{digest[:20]}"'
+                if self.headers.get("If-None-Match") == headers["ETag"]:
+                    server.count("status:304")
+                    self._send_empty(304, headers)
+                    return
+            server.count(f"status:{status}")
+            self._send(status, body, headers=headers)
+
+        def _send_empty(self, status: int, headers: Dict[str, str]) -> None:
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+
+        def _send(
+            self,
+            status: int,
+            body: Any,
+            content_type: str = "application/json",
+            headers: Optional[Dict[str, str]] = None,
+        ) -> None:
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+    return Handler
+
+
+def _generate_points(
+    kind: str,
+    metering_point_id: str,
+    start: datetime,
+    end: datetime,
+    resolution: str,
+    provisional_hours: int,
+) -> List[Dict[str, Any]]:
+    """Deterministic points for [start, end): hours in UTC steps, days at local midnights."""
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=HELSINKI)
+    if end.tzinfo is None:
+        end = end.replace(tzinfo=HELSINKI)
+    provisional_from = datetime.now(timezone.utc) - timedelta(hours=provisional_hours)
+    points: List[Dict[str, Any]] = []
+    if resolution == "day":
+        cursor = start.astimezone(HELSINKI).replace(hour=0, minute=0, second=0, microsecond=0)
+        if cursor < start:
+            cursor += timedelta(days=1)
+        step = None
+    else:
+        cursor = start.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        if cursor < start:
+            cursor += timedelta(hours=1)
+        step = timedelta(hours=1)
+    while cursor < end:
+        if step is None:
+            # Local-day steps; re-localize so DST days are 23 or 25 hours long.
+            following = (cursor.replace(tzinfo=None) + timedelta(days=1)).replace(tzinfo=HELSINKI)
+        else:
+            following = cursor + step
+        utc = cursor.astimezone(timezone.utc)
+        hours = (following - cursor).total_seconds() / 3600
+        points.append(
+            {
+                "startTime": utc.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+                "value": _value(kind, metering_point_id, int(utc.timestamp()), hours),
+                "status": STATUS_PROVISIONAL if utc >= provisional_from else STATUS_FINAL,
+                "type": "EUR/kWh" if kind == "pricing" else "kWh",
+            }
+        )
+        cursor = following
+    return points
+
+
+def _value(kind: str, metering_point_id: str, epoch: int, hours: float) -> float:
+    digest = hashlib.blake2b(f"{kind}:{metering_point_id}:{epoch}".encode(), digest_size=2).digest()
+    fraction = int.from_bytes(digest, "big") / 65535
+    if kind == "pricing":
+        return round(0.02 + 0.2 * fraction, 5)
+    return round(hours * (0.2 + 1.8 * fraction), 3)
+
+
+def _fake_jwt(claims: Dict[str, Any]) -> str:
+    def part(value: Dict[str, Any]) -> str:
+        return base64.urlsafe_b64encode(json.dumps(value).encode()).rstrip(b"=").decode()
+
+    return f"{part({'alg': 'none', 'typ': 'JWT'})}.{part(claims)}.stand-in"
+
+
+def _cognito_error(kind: str, message: str) -> Dict[str, Any]:
+    return {"__type": kind, "message": message}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Local stand-in for Cognito and the Helmi API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--email", default=DEFAULT_EMAIL)
+    parser.add_argument("--password", default=DEFAULT_PASSWORD)
+    parser.add_argument("--customers", type=int, default=1)
+    parser.add_argument("--metering-points", type=int, default=1)
+    parser.add_argument("--token-ttl", type=int, default=3600)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--latency-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--rate-401", type=float, default=0.0)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--rate-5xx", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    config = FakeServerConfig(
+        email=args.email,
+        password=args.password,
+        customers=args.customers,
+        metering_points_per_customer=args.metering_points,
+        token_ttl=args.token_ttl,
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.latency_jitter_ms,
+        rate_401=args.rate_401,
+        rate_429=args.rate_429,
+        rate_5xx=args.rate_5xx,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+    server = FakeHelmiServer(config, host=args.host, port=args.port)
+    print(f"Serving on {server.url} (Ctrl-C to stop)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import urlencode
+
+# Entries kept on disk before the least recently used ones are dropped.
+DEFAULT_MAX_ENTRIES = 512
+
+
+class ResponseCache:
+    """API response bodies with their ETag/Last-Modified, one file per request.
+
+    Bodies can be large (a year of hourly points), so they live in their own
+    files instead of the shared token cache that every call reads and locks.
+    """
+
+    def __init__(self, directory: str, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self.directory = directory
+        self.max_entries = max_entries
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as handle:
+                entry = json.load(handle)
+        except (FileNotFoundError, ValueError):
+            return None
+        if not isinstance(entry, dict) or entry.get("key") != key:
+            return None
+        return entry
+
+    def put(self, key: str, validators: Dict[str, str], body: Any) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        entry = {"key": key, "validators": validators, "body": body, "stored_at": time.time()}
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump(entry, handle)
+        os.replace(tmp_path, path)
+        self._prune()
+
+    def touch(self, key: str) -> None:
+        """Mark an entry as recently used after a 304 revalidated it."""
+        try:
+            os.utime(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def _path(self, key: str) -> str:
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return os.path.join(self.directory, f"{digest}.json")
+
+    def _prune(self) -> None:
+        try:
+            names = [name for name in os.listdir(self.directory) if name.endswith(".json")]
+        except FileNotFoundError:
+            return
+        if len(names) <= self.max_entries:
+            return
+        paths = [os.path.join(self.directory, name) for name in names]
+        paths.sort(key=_mtime)
+        for path in paths[: len(paths) - self.max_entries]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def request_key(method: str, url: str, params: Optional[Any]) -> str:
+    """Stable key for a request; list-valued params keep their order."""
+    query = urlencode(params or {}, doseq=True)
+    return f"{method} {url}?{query}"
+
+
+def validators_from(headers: Any) -> Dict[str, str]:
+    """ETag/Last-Modified from a response, as the headers a revalidation sends."""
+    validators: Dict[str, str] = {}
+    etag = headers.get("ETag")
+    if etag:
+        validators["If-None-Match"] = etag
+    last_modified = headers.get("Last-Modified")
+    if last_modified:
+        validators["If-Modified-Since"] = last_modified
+    return validators
+
+
+def _mtime(path: str) -> float:
+    try:
+        return os.path.getmtime(path)
+    except FileNotFoundError:
+        return 0.0
@@ -1,19 +1,55 @@
 from __future__ import annotations
 
+import base64
 import json
+import os
+import threading
 import time
-from dataclasses import dataclass
-from datetime import date, datetime, time, timezone
-from typing import Any, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
 import requests
-from zoneinfo import ZoneInfo
+
+from .cache import FileCache
+from .http_cache import ResponseCache, request_key, validators_from
+from .retry import (
+    BREAKER_STATUSES,
+    FAIL,
+    NOT_MODIFIED,
+    RETRY,
+    UNAUTHORIZED,
+    CircuitBreaker,
+    RetryPolicy,
+    classify_status,
+    parse_retry_after,
+)
+from .timeutil import HELSINKI, api_to_helsinki_iso, parse_api_epoch, parse_api_time
 
 
 COGNITO_ENDPOINT = "https://cognito-idp.eu-west-1.amazonaws.com/"
 COGNITO_CLIENT_ID = "eem5mn6iqfgf225ebg82v1k8l"
 API_BASE = "https://api.asiakas.jes-extranet.com"
 
+# Refresh this many seconds before the access token expires.
+TOKEN_REFRESH_MARGIN = 300
+
+# Longest range requested in one call; longer ranges are split into windows.
+MAX_WINDOW = {
+    "hour": timedelta(days=7),
+    "day": timedelta(days=366),
+}
+DEFAULT_WORKERS = 4
+
+# How long customer and metering point ids are reused from the cache.
+DISCOVERY_TTL = 24 * 3600
+# Customer ids sent per /customer/customers request.
+CUSTOMER_BATCH_SIZE = 20
+
+# Points with this status are final; anything else may still be revised.
+STATUS_FINAL = 150
+
 
 @dataclass
 class AuthTokens:
@@ -21,6 +57,10 @@ class AuthTokens:
     id_token: str
     refresh_token: Optional[str]
     expires_in: int
+    expires_at: float = 0.0
+
+    def is_fresh(self, margin: float = TOKEN_REFRESH_MARGIN) -> bool:
+        return bool(self.access_token) and self.expires_at - margin > time.time()
 
 
 class JSEClient:
@@ -29,32 +69,68 @@ class JSEClient:
         email: str,
         password: str,
         session: Optional[requests.Session] = None,
+        cache: Optional[FileCache] = None,
+        discovery_ttl: float = DISCOVERY_TTL,
+        cognito_endpoint: Optional[str] = None,
+        api_base: Optional[str] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        response_cache: Optional[ResponseCache] = None,
     ) -> None:
         self.email = email
         self.password = password
+        # Point both at a local stand-in (see client.fake_server) for load tests.
+        self.cognito_endpoint = (
+            cognito_endpoint or os.getenv("JSE_COGNITO_ENDPOINT") or COGNITO_ENDPOINT
+        )
+        self.api_base = (api_base or os.getenv("JSE_API_BASE") or API_BASE).rstrip("/")
         self.session = session or requests.Session()
+        self.retry_policy = retry_policy or RetryPolicy()
+        # One breaker per client: window workers share it, so an outage fails them all fast.
+        self.breaker = breaker or CircuitBreaker()
+        self.cache = cache
+        # Bodies plus ETag/Last-Modified, revalidated with conditional requests.
+        self.response_cache = response_cache
+        self.discovery_ttl = discovery_ttl
         self.tokens: Optional[AuthTokens] = None
+        self._auth_lock = threading.Lock()
 
     def login(self) -> AuthTokens:
+        """Full password login; the fresh tokens replace any cached ones."""
+        with self._auth_lock:
+            tokens = self._password_login()
+            if self.cache is not None:
+                with self.cache.locked() as data:
+                    data[self._cache_key("tokens")] = asdict(tokens)
+            self.tokens = tokens
+        return tokens
+
+    def refresh(self, refresh_token: str) -> AuthTokens:
+        payload = {
+            "AuthFlow": "REFRESH_TOKEN_AUTH",
+            "ClientId": COGNITO_CLIENT_ID,
+            "AuthParameters": {"REFRESH_TOKEN": refresh_token},
+        }
+        data = self._cognito_request("InitiateAuth", payload)
+        # Cognito does not rotate the refresh token on REFRESH_TOKEN_AUTH.
+        return _tokens_from_result(data, refresh_token)
+
+    def _password_login(self) -> AuthTokens:
         payload = {
             "AuthFlow": "USER_PASSWORD_AUTH",
             "ClientId": COGNITO_CLIENT_ID,
             "AuthParameters": {"USERNAME": self.email, "PASSWORD": self.password},
         }
         data = self._cognito_request("InitiateAuth", payload)
-        result = data.get("AuthenticationResult") or {}
-        tokens = AuthTokens(
-            access_token=result.get("AccessToken", ""),
-            id_token=result.get("IdToken", ""),
-            refresh_token=result.get("RefreshToken"),
-            expires_in=int(result.get("ExpiresIn", 0)),
-        )
-        if not tokens.access_token:
-            raise RuntimeError("Cognito auth did not return AccessToken")
-        self.tokens = tokens
-        return tokens
+        return _tokens_from_result(data, None)
 
     def get_user_sub(self) -> str:
+        # The IdToken already carries the sub; only ask Cognito if it does not.
+        self._access_token()
+        assert self.tokens
+        sub = _jwt_claims(self.tokens.id_token).get("sub")
+        if sub:
+            return sub
         data = self._cognito_request(
             "GetUser", {"AccessToken": self._access_token()}
         )
@@ -64,9 +140,12 @@ class JSEClient:
         raise RuntimeError("Cognito GetUser response missing sub")
 
     def get_customer_ids(self, sub: str) -> List[str]:
-        data = self._api_get("/idm/customerMetadata", params={"sub": sub})
-        customer_ids = data.get("data", {}).get("customer_ids") or []
-        return list(customer_ids)
+        def load() -> List[str]:
+            data = self._api_get("/idm/customerMetadata", params={"sub": sub})
+            customer_ids = data.get("data", {}).get("customer_ids") or []
+            return list(customer_ids)
+
+        return self._cached(self._cache_key("customer_ids", sub), load)
 
     def get_customer_profile(self, customer_id: str) -> Dict[str, Any]:
         data = self._api_get(
@@ -77,15 +156,66 @@ class JSEClient:
             raise RuntimeError("No customer profile returned")
         return items[0]
 
+    def get_customer_profiles(self, customer_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Fetch many profiles per request via the customerId[] array parameter.
+
+        Ids the server leaves out of a batch (e.g. because it caps the array)
+        are fetched one by one in parallel.
+        """
+        profiles: Dict[str, Dict[str, Any]] = {}
+        for offset in range(0, len(customer_ids), CUSTOMER_BATCH_SIZE):
+            batch = customer_ids[offset : offset + CUSTOMER_BATCH_SIZE]
+            data = self._api_get("/customer/customers", params={"customerId[]": batch})
+            for item in data.get("data") or []:
+                customer_id = _profile_customer_id(item, batch)
+                if customer_id:
+                    profiles[customer_id] = item
+        missing = [customer_id for customer_id in customer_ids if customer_id not in profiles]
+        if missing:
+            with ThreadPoolExecutor(max_workers=min(DEFAULT_WORKERS, len(missing))) as pool:
+                for customer_id, profile in zip(
+                    missing, pool.map(self._optional_profile, missing)
+                ):
+                    if profile is not None:
+                        profiles[customer_id] = profile
+        return profiles
+
     def get_metering_point_ids(self, customer_id: str) -> List[str]:
-        profile = self.get_customer_profile(customer_id)
-        metering_points: List[str] = []
-        for contract in profile.get("contracts", []) or []:
-            mp = contract.get("meteringPoint") or {}
-            mp_id = mp.get("meteringPointId")
-            if mp_id:
-                metering_points.append(mp_id)
-        return metering_points
+        def load() -> List[str]:
+            return _metering_point_ids(self.get_customer_profile(customer_id))
+
+        return self._cached(self._cache_key("metering_points", customer_id), load)
+
+    def get_metering_point_ids_by_customer(
+        self, customer_ids: List[str]
+    ) -> Dict[str, List[str]]:
+        """Metering point ids for several customers in as few requests as possible."""
+        keys = {
+            customer_id: self._cache_key("metering_points", customer_id)
+            for customer_id in customer_ids
+        }
+        cached = self._cache_get(list(keys.values()))
+        result = {
+            customer_id: cached[key] for customer_id, key in keys.items() if key in cached
+        }
+        missing = [customer_id for customer_id in customer_ids if customer_id not in result]
+        if missing:
+            profiles = self.get_customer_profiles(missing)
+            fetched = {
+                customer_id: _metering_point_ids(profiles.get(customer_id) or {})
+                for customer_id in missing
+            }
+            self._cache_put(
+                {keys[customer_id]: value for customer_id, value in fetched.items()}
+            )
+            result.update(fetched)
+        return {customer_id: result[customer_id] for customer_id in customer_ids}
+
+    def _optional_profile(self, customer_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            return self.get_customer_profile(customer_id)
+        except RuntimeError:
+            return None
 
     def get_consumption(
         self,
@@ -94,6 +224,148 @@ class JSEClient:
         start: str,
         end: str,
         resolution: str,
+    ) -> Dict[str, Any]:
+        return self._energy_get(
+            "consumption", customer_id, metering_point_id, start, end, resolution
+        )
+
+    def get_pricing(
+        self,
+        customer_id: str,
+        metering_point_id: str,
+        start: str,
+        end: str,
+        resolution: str,
+    ) -> Dict[str, Any]:
+        return self._energy_get(
+            "pricing", customer_id, metering_point_id, start, end, resolution
+        )
+
+    def get_consumption_range(
+        self,
+        customer_id: str,
+        metering_point_id: str,
+        start: str,
+        end: str,
+        resolution: str,
+        max_workers: int = DEFAULT_WORKERS,
+    ) -> Dict[str, Any]:
+        """Like get_consumption, but splits long ranges into concurrent windows."""
+        return merge_consumption_responses(
+            self.iter_consumption_windows(
+                customer_id, metering_point_id, start, end, resolution, max_workers
+            )
+        )
+
+    def get_cost_range(
+        self,
+        customer_id: str,
+        metering_point_id: str,
+        start: str,
+        end: str,
+        resolution: str,
+        max_workers: int = DEFAULT_WORKERS,
+    ) -> Dict[str, Any]:
+        """Consumption with ``price`` and ``cost`` joined onto every point.
+
+        Consumption and pricing are fetched concurrently, so adding cost does
+        not double the latency of the call.
+        """
+        args = (customer_id, metering_point_id, start, end, resolution, max_workers)
+        self._access_token()
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            consumption = pool.submit(
+                lambda: merge_consumption_responses(self.iter_consumption_windows(*args))
+            )
+            pricing = pool.submit(
+                lambda: merge_consumption_responses(self.iter_pricing_windows(*args))
+            )
+            raw = consumption.result()
+            prices = pricing.result()
+        series_list = (raw.get("data") or {}).get("productSeries") or []
+        if series_list:
+            series_list[0]["data"] = merge_cost_series(
+                series_list[0].get("data") or [], _series_points(prices)
+            )
+        return raw
+
+    def iter_consumption_windows(
+        self,
+        customer_id: str,
+        metering_point_id: str,
+        start: str,
+        end: str,
+        resolution: str,
+        max_workers: int = DEFAULT_WORKERS,
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield raw responses for each window of the range, in chronological order."""
+        return self._iter_windows(
+            self.get_consumption,
+            customer_id,
+            metering_point_id,
+            start,
+            end,
+            resolution,
+            max_workers,
+        )
+
+    def iter_pricing_windows(
+        self,
+        customer_id: str,
+        metering_point_id: str,
+        start: str,
+        end: str,
+        resolution: str,
+        max_workers: int = DEFAULT_WORKERS,
+    ) -> Iterator[Dict[str, Any]]:
+        return self._iter_windows(
+            self.get_pricing,
+            customer_id,
+            metering_point_id,
+            start,
+            end,
+            resolution,
+            max_workers,
+        )
+
+    def _iter_windows(
+        self,
+        fetch_window: Callable[..., Dict[str, Any]],
+        customer_id: str,
+        metering_point_id: str,
+        start: str,
+        end: str,
+        resolution: str,
+        max_workers: int,
+    ) -> Iterator[Dict[str, Any]]:
+        windows = split_range(start, end, MAX_WINDOW.get(resolution))
+
+        def fetch(window: Tuple[datetime, datetime]) -> Dict[str, Any]:
+            return fetch_window(
+                customer_id=customer_id,
+                metering_point_id=metering_point_id,
+                start=window[0].isoformat(),
+                end=window[1].isoformat(),
+                resolution=resolution,
+            )
+
+        if len(windows) <= 1 or max_workers <= 1:
+            for window in windows:
+                yield fetch(window)
+            return
+        # Authenticate once up front instead of racing in every worker.
+        self._access_token()
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(windows))) as pool:
+            yield from pool.map(fetch, windows)
+
+    def _energy_get(
+        self,
+        kind: str,
+        customer_id: str,
+        metering_point_id: str,
+        start: str,
+        end: str,
+        resolution: str,
     ) -> Dict[str, Any]:
         params = {
             "customerId": customer_id,
@@ -101,51 +373,319 @@ class JSEClient:
             "end": _normalize_datetime(end),
             "resolution": resolution,
         }
-        path = f"/consumption/consumption/energy/{metering_point_id}"
-        return self._api_get(path, params=params)
+        # Provisional hours change without notice, so only fully final windows are kept.
+        return self._api_get(
+            f"/consumption/{kind}/energy/{metering_point_id}",
+            params=params,
+            cache_if=_all_final if kind == "consumption" else None,
+        )
 
     def _access_token(self) -> str:
-        if not self.tokens:
-            self.login()
+        tokens = self.tokens
+        if tokens is None or not tokens.is_fresh():
+            self._ensure_tokens()
         assert self.tokens
         return self.tokens.access_token
 
+    def _ensure_tokens(self, rejected: Optional[str] = None) -> None:
+        """Load, refresh or obtain tokens, skipping an access token the API rejected."""
+        with self._auth_lock:
+            current = self.tokens
+            if current and current.is_fresh() and current.access_token != rejected:
+                return
+            if self.cache is None:
+                self.tokens = self._refresh_or_login(current)
+                return
+            key = self._cache_key("tokens")
+            with self.cache.locked() as data:
+                cached = _tokens_from_dict(data.get(key)) or current
+                if cached and cached.is_fresh() and cached.access_token != rejected:
+                    self.tokens = cached
+                    return
+                self.tokens = self._refresh_or_login(cached)
+                data[key] = asdict(self.tokens)
+
+    def _refresh_or_login(self, tokens: Optional[AuthTokens]) -> AuthTokens:
+        if tokens and tokens.refresh_token:
+            try:
+                return self.refresh(tokens.refresh_token)
+            except (requests.RequestException, RuntimeError):
+                # Refresh token expired or revoked; fall back to the password.
+                pass
+        return self._password_login()
+
+    def _cache_key(self, kind: str, *parts: str) -> str:
+        account = self.email.lower()
+        if self.api_base != API_BASE:
+            # Keep tokens and ids from a stand-in server apart from the real ones.
+            account = f"{account}@{self.api_base}"
+        return ":".join([kind, account, *parts])
+
+    def _cached(self, key: str, load: Callable[[], Any]) -> Any:
+        """Return a cached discovery value younger than the TTL, else load and store it."""
+        cached = self._cache_get([key])
+        if key in cached:
+            return cached[key]
+        # Load outside the lock: it may need to take the lock to refresh tokens.
+        value = load()
+        self._cache_put({key: value})
+        return value
+
+    def _cache_get(self, keys: List[str]) -> Dict[str, Any]:
+        if self.cache is None or self.discovery_ttl <= 0:
+            return {}
+        found: Dict[str, Any] = {}
+        now = time.time()
+        with self.cache.locked() as data:
+            for key in keys:
+                entry = data.get(key)
+                if isinstance(entry, dict):
+                    if now - float(entry.get("fetched_at", 0)) < self.discovery_ttl:
+                        found[key] = entry.get("value")
+        return found
+
+    def _cache_put(self, values: Dict[str, Any]) -> None:
+        if self.cache is None or self.discovery_ttl <= 0 or not values:
+            return
+        now = time.time()
+        with self.cache.locked() as data:
+            for key, value in values.items():
+                data[key] = {"value": value, "fetched_at": now}
+
     def _cognito_request(self, target: str, payload: Dict[str, Any]) -> Dict[str, Any]:
         headers = {
             "Content-Type": "application/x-amz-json-1.1",
             "X-Amz-Target": f"AWSCognitoIdentityProviderService.{target}",
         }
         response = self.session.post(
-            COGNITO_ENDPOINT, headers=headers, data=json.dumps(payload), timeout=30
+            self.cognito_endpoint, headers=headers, data=json.dumps(payload), timeout=30
         )
         response.raise_for_status()
         return response.json()
 
-    def _api_get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        url = f"{API_BASE}{path}"
+    def _api_get(
+        self,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        cache_if: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    ) -> Dict[str, Any]:
+        url = f"{self.api_base}{path}"
         headers = {"Accept": "application/json", "Authorization": f"Bearer {self._access_token()}"}
         try:
-            return _request_with_retry(self.session, "GET", url, headers=headers, params=params)
+            return self._request("GET", url, headers, params, cache_if)
         except PermissionError:
-            # Re-login once and retry with a fresh access token.
-            self.login()
+            # Refresh (or re-login) once and retry with a fresh access token.
+            self._ensure_tokens(rejected=headers["Authorization"][len("Bearer "):])
             headers["Authorization"] = f"Bearer {self._access_token()}"
-            return _request_with_retry(self.session, "GET", url, headers=headers, params=params)
+            return self._request("GET", url, headers, params, cache_if)
+
+    def _request(
+        self,
+        method: str,
+        url: str,
+        headers: Dict[str, str],
+        params: Optional[Dict[str, Any]],
+        cache_if: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    ) -> Dict[str, Any]:
+        cache = self.response_cache if method == "GET" else None
+        key = ""
+        entry = None
+        if cache is not None:
+            key = self._cache_key("http", request_key(method, url, params))
+            entry = cache.get(key)
+            if entry is not None:
+                headers = {**headers, **(entry.get("validators") or {})}
+        status, response_headers, body = _request_with_retry(
+            self.session,
+            method,
+            url,
+            headers=headers,
+            params=params,
+            policy=self.retry_policy,
+            breaker=self.breaker,
+        )
+        if status == 304:
+            if cache is None or entry is None:
+                raise RuntimeError("Not Modified (304) without a cached response")
+            cache.touch(key)
+            return entry["body"]
+        if cache is not None:
+            validators = validators_from(response_headers)
+            if validators and (cache_if is None or cache_if(body)):
+                cache.put(key, validators, body)
+        return body
+
+
+def split_range(
+    start: str, end: str, window: Optional[timedelta]
+) -> List[Tuple[datetime, datetime]]:
+    """Split [start, end) into consecutive windows no longer than ``window``."""
+    start_dt = _parse_datetime(start)
+    end_dt = _parse_datetime(end)
+    if start_dt.tzinfo is None:
+        start_dt = start_dt.replace(tzinfo=HELSINKI)
+    if end_dt.tzinfo is None:
+        end_dt = end_dt.replace(tzinfo=HELSINKI)
+    if window is None or end_dt <= start_dt:
+        return [(start_dt, end_dt)]
+    windows: List[Tuple[datetime, datetime]] = []
+    cursor = start_dt
+    while cursor < end_dt:
+        # Aware arithmetic keeps local midnights aligned across DST changes.
+        window_end = min(cursor + window, end_dt)
+        windows.append((cursor, window_end))
+        cursor = window_end
+    return windows
+
+
+def merge_cost_series(
+    consumption: List[Dict[str, Any]],
+    prices: List[Dict[str, Any]],
+) -> List[Dict[str, Any]]:
+    """Join prices onto consumption points in one pass over both sorted series.
+
+    Prices are taken as EUR/kWh, so ``cost = value * price``; hours without a
+    price get ``None`` for both.
+    """
+    price_keys = [_start_key(point) for point in prices]
+    merged: List[Dict[str, Any]] = []
+    j = 0
+    for point in consumption:
+        key = _start_key(point)
+        while j < len(prices) and price_keys[j] < key:
+            j += 1
+        price = None
+        if j < len(prices) and price_keys[j] == key:
+            price = prices[j].get("value")
+        value = point.get("value")
+        cost = None
+        if price is not None and value is not None:
+            cost = round(float(value) * float(price), 6)
+        merged.append({**point, "price": price, "cost": cost})
+    return merged
+
+
+def _start_key(point: Dict[str, Any]) -> float:
+    start = point.get("startTime")
+    if not start:
+        return float("-inf")
+    epoch = parse_api_epoch(start)
+    if epoch is not None:
+        return epoch
+    return _parse_datetime(start).timestamp()
+
+
+def _all_final(response: Dict[str, Any]) -> bool:
+    points = _series_points(response)
+    return bool(points) and all(
+        int(point.get("status") or 0) == STATUS_FINAL for point in points
+    )
+
+
+def _series_points(response: Dict[str, Any]) -> List[Dict[str, Any]]:
+    series_list = (response.get("data") or {}).get("productSeries") or []
+    return list(series_list[0].get("data") or []) if series_list else []
+
+
+def merge_consumption_responses(
+    responses: Iterable[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """Stitch windowed responses into one, dropping points repeated at the seams."""
+    merged: Optional[Dict[str, Any]] = None
+    points: List[Dict[str, Any]] = []
+    seen = set()
+    for response in responses:
+        if merged is None:
+            merged = response
+        series_list = (response.get("data") or {}).get("productSeries") or []
+        if not series_list:
+            continue
+        for point in series_list[0].get("data") or []:
+            key = point.get("startTime")
+            if key in seen:
+                continue
+            seen.add(key)
+            points.append(point)
+    if merged is None:
+        return {"data": {"productSeries": []}}
+    data = merged.setdefault("data", {})
+    series_list = data.get("productSeries") or []
+    if series_list:
+        series_list[0]["data"] = points
+    elif points:
+        data["productSeries"] = [{"data": points}]
+    return merged
+
+
+def _tokens_from_result(
+    data: Dict[str, Any], refresh_token: Optional[str]
+) -> AuthTokens:
+    result = data.get("AuthenticationResult") or {}
+    expires_in = int(result.get("ExpiresIn", 0))
+    tokens = AuthTokens(
+        access_token=result.get("AccessToken", ""),
+        id_token=result.get("IdToken", ""),
+        refresh_token=result.get("RefreshToken") or refresh_token,
+        expires_in=expires_in,
+        expires_at=time.time() + expires_in,
+    )
+    if not tokens.access_token:
+        raise RuntimeError("Cognito auth did not return AccessToken")
+    return tokens
+
+
+def _metering_point_ids(profile: Dict[str, Any]) -> List[str]:
+    metering_points: List[str] = []
+    for contract in profile.get("contracts", []) or []:
+        mp = contract.get("meteringPoint") or {}
+        mp_id = mp.get("meteringPointId")
+        if mp_id:
+            metering_points.append(mp_id)
+    return metering_points
+
+
+def _profile_customer_id(profile: Dict[str, Any], requested: List[str]) -> Optional[str]:
+    """Match a returned profile to the id we asked for (``jes_1234567`` style)."""
+    for candidate in (profile.get("id"), f"jes_{profile.get('customerId')}"):
+        if candidate in requested:
+            return candidate
+    return None
+
+
+def _jwt_claims(token: str) -> Dict[str, Any]:
+    """Decode a JWT payload without verifying it; Cognito already did."""
+    try:
+        payload = token.split(".")[1]
+        padded = payload + "=" * (-len(payload) % 4)
+        claims = json.loads(base64.urlsafe_b64decode(padded))
+    except (IndexError, ValueError):
+        return {}
+    return claims if isinstance(claims, dict) else {}
+
+
+def _tokens_from_dict(value: Any) -> Optional[AuthTokens]:
+    if not isinstance(value, dict):
+        return None
+    try:
+        return AuthTokens(**value)
+    except TypeError:
+        return None
 
 
 def _normalize_datetime(value: str) -> str:
     dt = _parse_datetime(value)
     if dt.tzinfo is None:
-        dt = dt.replace(tzinfo=ZoneInfo("Europe/Helsinki"))
+        dt = dt.replace(tzinfo=HELSINKI)
     return dt.isoformat()
 
 
 def _parse_datetime(value: str) -> datetime:
     text = value.strip()
+    api_time = parse_api_time(text)
+    if api_time is not None:
+        return api_time.replace(tzinfo=timezone.utc)
     if "T" not in text:
-        return datetime.combine(date.fromisoformat(text), time.min).replace(
-            tzinfo=ZoneInfo("Europe/Helsinki")
-        )
+        return datetime.combine(date.fromisoformat(text), dt_time.min).replace(tzinfo=HELSINKI)
     if text[-5:-4] in {"+", "-"} and text[-2:].isdigit() and text[-5:-2].isdigit():
         # Convert +HHMM to +HH:MM for Python's fromisoformat.
         text = f"{text[:-2]}:{text[-2:]}"
@@ -160,59 +700,143 @@ def _request_with_retry(
     url: str,
     headers: Dict[str, str],
     params: Optional[Dict[str, Any]] = None,
-    max_retries: int = 3,
-) -> Dict[str, Any]:
-    last_exc: Optional[Exception] = None
-    for attempt in range(max_retries):
+    policy: Optional[RetryPolicy] = None,
+    breaker: Optional[CircuitBreaker] = None,
+) -> Tuple[int, Any, Any]:
+    """Send with retries; returns (status, headers, parsed body), body None on 304."""
+    policy = policy or RetryPolicy()
+    started = time.monotonic()
+    attempt = 0
+    while True:
+        probe = breaker.before_request() if breaker is not None else False
+        retry_after: Optional[float] = None
         try:
             response = session.request(
-                method, url, headers=headers, params=params, timeout=30
+                method,
+                url,
+                headers=headers,
+                params=params,
+                timeout=policy.timeout(time.monotonic() - started),
             )
-            if response.status_code == 401 and attempt == 0:
-                # The caller will re-login by re-invoking the request after login.
-                raise PermissionError("Unauthorized (401)")
-            if response.status_code in (429, 500, 502, 503, 504):
-                raise RuntimeError(f"Retryable status {response.status_code}")
-            response.raise_for_status()
-            return response.json()
-        except PermissionError:
-            raise
-        except Exception as exc:  # noqa: BLE001 - keep simple retry loop
-            last_exc = exc
-            if attempt < max_retries - 1:
-                time.sleep(0.5 * (2**attempt))
+        except requests.RequestException as exc:
+            if breaker is not None:
+                breaker.record_failure()
+            error: Exception = exc
+        else:
+            status = response.status_code
+            if breaker is not None:
+                if status in BREAKER_STATUSES:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+            action = classify_status(status)
+            if action == UNAUTHORIZED:
+                # The caller refreshes the tokens and repeats the request once.
+                raise PermissionError(f"Unauthorized ({status})")
+            if action == RETRY:
+                error = RuntimeError(f"Retryable status {status}")
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            elif action == FAIL:
+                raise RuntimeError(f"Request failed with status {status}")
+            elif action == NOT_MODIFIED:
+                return status, response.headers, None
+            else:
+                try:
+                    return status, response.headers, response.json()
+                except ValueError as exc:
+                    error = exc
+        finally:
+            if probe:
+                breaker.release_probe()
+        delay = policy.next_delay(attempt, time.monotonic() - started, retry_after)
+        if delay is None:
+            raise RuntimeError(f"Request failed after {attempt + 1} attempts") from error
+        time.sleep(delay)
+        attempt += 1
+
+
+def iter_consumption_points(
+    response: Dict[str, Any],
+    full_only: bool = False,
+) -> Iterator[Dict[str, Any]]:
+    """Yield normalized points one at a time; each carries its own unit."""
+    data = response.get("data", {})
+    series_list = data.get("productSeries") or []
+    if not series_list:
+        return
+    for point in series_list[0].get("data") or []:
+        if full_only and int(point.get("status") or 0) != STATUS_FINAL:
+            continue
+        item = {
+            "ts": _to_helsinki_iso(point.get("startTime")),
+            "value": point.get("value"),
+            "status": point.get("status"),
+        }
+        if "cost" in point:
+            item["price"] = point.get("price")
+            item["cost"] = point.get("cost")
+        item["unit"] = point.get("type", "")
+        yield item
+
+
+def consumption_records(response: Dict[str, Any]) -> Tuple[List[Tuple[int, float, int]], str]:
+    """(epoch, value, status) per point, sorted by epoch, plus the response's unit."""
+    records: List[Tuple[int, float, int]] = []
+    unit = ""
+    for point in _series_points(response):
+        start = point.get("startTime")
+        if not start:
+            continue
+        try:
+            value = float(point["value"])
+        except (KeyError, TypeError, ValueError):
+            # A null or missing value is an hour without data, not zero consumption.
+            continue
+        if not unit:
+            unit = point.get("type", "")
+        records.append((int(_start_key(point)), value, int(point.get("status") or 0)))
+    records.sort()
+    return records, unit
+
+
+def iter_consumption_stream(
+    responses: Iterable[Dict[str, Any]],
+    full_only: bool = False,
+) -> Iterator[Dict[str, Any]]:
+    """Yield normalized points across windowed responses, skipping seam duplicates."""
+    previous: set = set()
+    for response in responses:
+        current: set = set()
+        for point in iter_consumption_points(response, full_only):
+            if point["ts"] in previous or point["ts"] in current:
                 continue
-            raise RuntimeError(f"Request failed after {max_retries} attempts") from last_exc
-    raise RuntimeError("Unreachable retry loop")
+            current.add(point["ts"])
+            yield point
+        previous = current
 
 
 def normalize_consumption_response(
     response: Dict[str, Any],
     granularity: str,
+    full_only: bool = False,
 ) -> Dict[str, Any]:
-    data = response.get("data", {})
-    series_list = data.get("productSeries") or []
     series = []
     unit = ""
-    if series_list:
-        data_points = series_list[0].get("data") or []
-        for point in data_points:
-            if not unit:
-                unit = point.get("type", "")
-            series.append(
-                {
-                    "ts": _to_helsinki_iso(point.get("startTime")),
-                    "value": point.get("value"),
-                    "status": point.get("status"),
-                }
-            )
+    for point in iter_consumption_points(response, full_only):
+        point_unit = point.pop("unit")
+        if not unit:
+            unit = point_unit
+        series.append(point)
     return {"granularity": granularity, "unit": unit, "series": series}
 
 
 def _to_helsinki_iso(value: Optional[str]) -> Optional[str]:
     if not value:
         return value
+    fast = api_to_helsinki_iso(value)
+    if fast is not None:
+        return fast
     dt = _parse_datetime(value)
     if dt.tzinfo is None:
         dt = dt.replace(tzinfo=timezone.utc)
-    return dt.astimezone(ZoneInfo("Europe/Helsinki")).isoformat()
+    return dt.astimezone(HELSINKI).isoformat()
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+Record = Tuple[int, float, int]
+
+CHECKPOINT_FILE = "checkpoint.json"
+
+
+class HistoryStore:
+    """Downloaded history for one metering point, one JSON file per window.
+
+    Windows are keyed by their local start date, so file names sort in time
+    order. Each file is replaced atomically; ``checkpoint.json`` lists the
+    windows that are complete and need not be fetched again.
+    """
+
+    def __init__(self, directory: str, metering_point_id: str, resolution: str = "hour") -> None:
+        self.root = directory
+        self.metering_point_id = metering_point_id
+        self.resolution = resolution
+        self.directory = os.path.join(directory, metering_point_id, resolution)
+        self._lock = threading.Lock()
+
+    def completed(self) -> Dict[str, int]:
+        """Window key -> point count for every window recorded as complete."""
+        done = _read_json(os.path.join(self.directory, CHECKPOINT_FILE)).get("done")
+        return dict(done) if isinstance(done, dict) else {}
+
+    def write_window(
+        self,
+        key: str,
+        start: int,
+        end: int,
+        records: List[Record],
+        unit: str,
+        complete: bool,
+    ) -> None:
+        """Store one window, then record (or withdraw) it in the checkpoint."""
+        os.makedirs(self.directory, exist_ok=True)
+        _write_json(
+            self._window_path(key),
+            {
+                "start": start,
+                "end": end,
+                "unit": unit,
+                "complete": complete,
+                "points": [list(record) for record in records],
+            },
+        )
+        with self._lock:
+            path = os.path.join(self.directory, CHECKPOINT_FILE)
+            checkpoint = _read_json(path)
+            done = checkpoint.get("done")
+            done = dict(done) if isinstance(done, dict) else {}
+            if complete:
+                done[key] = len(records)
+            else:
+                done.pop(key, None)
+            checkpoint["done"] = done
+            _write_json(path, checkpoint)
+
+    def window_keys(self) -> List[str]:
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted(
+            name[: -len(".json")]
+            for name in names
+            if name.endswith(".json") and name != CHECKPOINT_FILE
+        )
+
+    def read_window(self, key: str) -> Optional[Dict[str, Any]]:
+        window = _read_json(self._window_path(key))
+        return window or None
+
+    def iter_records(
+        self, start: Optional[int] = None, end: Optional[int] = None
+    ) -> Iterator[Record]:
+        """Stored points in time order within [start, end), each epoch once."""
+        last = None
+        for key in self.window_keys():
+            window = self.read_window(key)
+            if window is None:
+                continue
+            if start is not None and int(window.get("end", 0)) <= start:
+                continue
+            if end is not None and int(window.get("start", 0)) >= end:
+                break
+            for epoch, value, status in window.get("points") or []:
+                if last is not None and epoch <= last:
+                    continue
+                if (start is not None and epoch < start) or (end is not None and epoch >= end):
+                    continue
+                last = epoch
+                yield int(epoch), float(value), int(status)
+
+    def unit(self) -> str:
+        for key in self.window_keys():
+            window = self.read_window(key)
+            if window and window.get("unit"):
+                return str(window["unit"])
+        return ""
+
+    def _window_path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+
+def _read_json(path: str) -> Dict[str, Any]:
+    try:
+        with open(path, "r", encoding="utf-8") as handle:
+            data = json.load(handle)
+    except (FileNotFoundError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _write_json(path: str, data: Dict[str, Any]) -> None:
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        json.dump(data, handle)
+    os.replace(tmp_path, path)
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Sequence
+
+from zoneinfo import ZoneInfo
+
+HELSINKI = ZoneInfo("Europe/Helsinki")
+
+STANDARD_OFFSET = 2 * 3600
+SUMMER_OFFSET = 3 * 3600
+
+# Finland has followed the EU rule (last Sunday of March/October, 01:00 UTC)
+# since 1996; outside this span callers fall back to zoneinfo.
+_TABLE_FIRST_YEAR = 1996
+_TABLE_LAST_YEAR = 2100
+
+_EPOCH_ORDINAL = datetime(1970, 1, 1).toordinal()
+_NAIVE_EPOCH = datetime(1970, 1, 1)
+_OFFSET_DELTAS = {
+    offset: timedelta(seconds=offset) for offset in (STANDARD_OFFSET, SUMMER_OFFSET)
+}
+_OFFSET_SUFFIXES = {STANDARD_OFFSET: "+02:00", SUMMER_OFFSET: "+03:00"}
+
+
+def days_from_civil(year: int, month: int, day: int) -> int:
+    """Days since 1970-01-01 for a proleptic Gregorian date."""
+    year -= month <= 2
+    era = year // 400
+    yoe = year - era * 400
+    doy = (153 * (month + (-3 if month > 2 else 9)) + 2) // 5 + day - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146097 + doe - 719468
+
+
+def _last_sunday(year: int, month: int) -> int:
+    last = days_from_civil(year, month, 31)
+    # 1970-01-01 was a Thursday, so (days - 3) % 7 counts days since Sunday.
+    return last - (last - 3) % 7
+
+
+def _build_transitions() -> List[int]:
+    transitions: List[int] = []
+    for year in range(_TABLE_FIRST_YEAR, _TABLE_LAST_YEAR + 1):
+        transitions.append(_last_sunday(year, 3) * 86400 + 3600)
+        transitions.append(_last_sunday(year, 10) * 86400 + 3600)
+    return transitions
+
+
+# UTC epochs where the offset flips; even positions start summer time.
+TRANSITIONS = _build_transitions()
+TABLE_START = days_from_civil(_TABLE_FIRST_YEAR, 1, 1) * 86400
+TABLE_END = days_from_civil(_TABLE_LAST_YEAR + 1, 1, 1) * 86400
+
+
+def helsinki_offset(epoch: int) -> Optional[int]:
+    """UTC offset in seconds at ``epoch``, or None outside the precomputed table."""
+    if not TABLE_START <= epoch < TABLE_END:
+        return None
+    return SUMMER_OFFSET if bisect_right(TRANSITIONS, epoch) % 2 else STANDARD_OFFSET
+
+
+def helsinki_offsets(epochs: Sequence[int]) -> List[int]:
+    """Offsets for a whole series; ascending input is a single walk of the table."""
+    offsets: List[int] = []
+    index = 0
+    for epoch in epochs:
+        if not TABLE_START <= epoch < TABLE_END:
+            offsets.append(_zoneinfo_offset(epoch))
+            continue
+        if index and TRANSITIONS[index - 1] > epoch:
+            index = bisect_right(TRANSITIONS, epoch)
+        while index < len(TRANSITIONS) and TRANSITIONS[index] <= epoch:
+            index += 1
+        offsets.append(SUMMER_OFFSET if index % 2 else STANDARD_OFFSET)
+    return offsets
+
+
+def local_midnight(day: int) -> int:
+    """UTC epoch at which local day number ``day`` (days since 1970-01-01) begins.
+
+    Transitions happen at 01:00 UTC, never near local midnight, so the offset
+    two hours before UTC midnight is the offset at local midnight.
+    """
+    probe = day * 86400 - STANDARD_OFFSET
+    offset = helsinki_offset(probe)
+    if offset is None:
+        offset = _zoneinfo_offset(probe)
+    return day * 86400 - offset
+
+
+def parse_api_time(text: str) -> Optional[datetime]:
+    """Naive UTC datetime for the API's ``YYYY-MM-DDTHH:MM:SS.000Z`` timestamps.
+
+    Returns None for anything else (including non-zero milliseconds) so the
+    caller can take the general path.
+    """
+    if len(text) != 24 or text[10] != "T" or text[19:] != ".000Z":
+        return None
+    try:
+        return datetime.fromisoformat(text[:19])
+    except ValueError:
+        return None
+
+
+def parse_api_epoch(text: str) -> Optional[int]:
+    dt = parse_api_time(text)
+    return None if dt is None else _naive_epoch(dt)
+
+
+def api_to_helsinki_iso(text: str) -> Optional[str]:
+    """Local ISO string for an API timestamp, or None if the fast path does not apply."""
+    dt = parse_api_time(text)
+    if dt is None:
+        return None
+    offset = helsinki_offset(_naive_epoch(dt))
+    if offset is None:
+        return None
+    return (dt + _OFFSET_DELTAS[offset]).isoformat() + _OFFSET_SUFFIXES[offset]
+
+
+def format_local_iso(epoch: int, offset: int) -> str:
+    """ISO string for ``epoch`` shown at ``offset``, as ``isoformat()`` would print it."""
+    local = _NAIVE_EPOCH + timedelta(seconds=epoch + offset)
+    suffix = _OFFSET_SUFFIXES.get(offset)
+    if suffix is None:
+        sign = "+" if offset >= 0 else "-"
+        hours, minutes = divmod(abs(offset) // 60, 60)
+        suffix = f"{sign}{hours:02d}:{minutes:02d}"
+    return local.isoformat() + suffix
+
+
+def _naive_epoch(dt: datetime) -> int:
+    return (
+        (dt.toordinal() - _EPOCH_ORDINAL) * 86400
+        + dt.hour * 3600
+        + dt.minute * 60
+        + dt.second
+    )
+
+
+def _zoneinfo_offset(epoch: int) -> int:
+    offset = HELSINKI.utcoffset(datetime.fromtimestamp(epoch, timezone.utc))
+    return int(offset.total_seconds()) if offset else STANDARD_OFFSET
@@ -1,37 +1,36 @@
 from __future__ import annotations
 
-from datetime import timedelta
-
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.event import async_track_time_change
 
-from .const import DOMAIN, DEFAULT_UPDATE_INTERVAL_MINUTES, CONF_UPDATE_MINUTE, DEFAULT_UPDATE_MINUTE
+from .const import DOMAIN
 from .coordinator import JSECoordinator
+from .hub import async_get_hub, async_release_hub
 
 PLATFORMS = ["sensor"]
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     config = {**entry.data, **entry.options}
-    coordinator = JSECoordinator(
-        hass,
-        config,
-        update_interval=timedelta(minutes=DEFAULT_UPDATE_INTERVAL_MINUTES),
-    )
+    # Entries of the same account share one login, session and refresh cycle.
+    hub = await async_get_hub(hass, config)
+    # No fixed interval: the hub refreshes each entry when its scheduler says it is due.
+    coordinator = JSECoordinator(hass, hub, config)
+    await coordinator.async_restore()
     await coordinator.async_config_entry_first_refresh()
-    update_minute = int(config.get(CONF_UPDATE_MINUTE, DEFAULT_UPDATE_MINUTE))
-
-    async def _schedule_refresh(*_args) -> None:
-        await coordinator.async_request_refresh()
-
-    unsub = async_track_time_change(hass, _schedule_refresh, minute=update_minute, second=0)
+    hub.async_add_coordinator(entry.entry_id, coordinator)
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = {
         "coordinator": coordinator,
-        "unsub": unsub,
+        "hub": hub,
     }
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    # The first-run history import takes dozens of requests; setup does not wait for it.
+    entry.async_create_background_task(
+        hass,
+        coordinator.async_prepare_statistics(),
+        f"{DOMAIN}_statistics_{entry.entry_id}",
+    )
     return True
 
 
@@ -39,6 +38,6 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
         data = hass.data.get(DOMAIN, {}).pop(entry.entry_id, None)
-        if data and data.get("unsub"):
-            data["unsub"]()
+        if data and data.get("hub"):
+            async_release_hub(hass, data["hub"], entry.entry_id)
     return unload_ok
@@ -1,16 +1,40 @@
 from __future__ import annotations
 
+import asyncio
+import base64
 import json
+import os
 import time
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-import requests
+import aiohttp
+
+from .const import STATUS_FINAL
+from .http_cache import ResponseCache, request_key, validators_from
+from .metrics import ACCOUNT, ApiMetrics, RequestTrace
+from .retry import (
+    BREAKER_STATUSES,
+    FAIL,
+    NOT_MODIFIED,
+    RETRY,
+    UNAUTHORIZED,
+    CircuitBreaker,
+    RetryPolicy,
+    classify_status,
+    parse_retry_after,
+)
 
 COGNITO_ENDPOINT = "https://cognito-idp.eu-west-1.amazonaws.com/"
 COGNITO_CLIENT_ID = "eem5mn6iqfgf225ebg82v1k8l"
 API_BASE = "https://api.asiakas.jes-extranet.com"
 
+# Refresh this many seconds before the access token expires.
+TOKEN_REFRESH_MARGIN = 300
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=30)
+# Customer ids sent per /customer/customers request.
+CUSTOMER_BATCH_SIZE = 20
+
 
 @dataclass
 class AuthTokens:
@@ -18,71 +42,174 @@ class AuthTokens:
     id_token: str
     refresh_token: Optional[str]
     expires_in: int
+    expires_at: float = 0.0
+
+    def is_fresh(self, margin: float = TOKEN_REFRESH_MARGIN) -> bool:
+        return bool(self.access_token) and self.expires_at - margin > time.time()
 
 
 class JSEApi:
+    """Async client for the Helmi API; pass Home Assistant's shared aiohttp session."""
+
     def __init__(
         self,
         email: str,
         password: str,
-        session: Optional[requests.Session] = None,
+        session: aiohttp.ClientSession,
+        tokens: Optional[AuthTokens] = None,
+        cognito_endpoint: Optional[str] = None,
+        api_base: Optional[str] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        breaker: Optional[CircuitBreaker] = None,
     ) -> None:
         self.email = email
         self.password = password
-        self.session = session or requests.Session()
-        self.tokens: Optional[AuthTokens] = None
+        # Overridable so the integration can run against a local stand-in server.
+        self.cognito_endpoint = (
+            cognito_endpoint or os.getenv("JSE_COGNITO_ENDPOINT") or COGNITO_ENDPOINT
+        )
+        self.api_base = (api_base or os.getenv("JSE_API_BASE") or API_BASE).rstrip("/")
+        self.session = session
+        self.retry_policy = retry_policy or RetryPolicy()
+        # Shared by every metering point of the account, so an outage fails them all fast.
+        self.breaker = breaker or CircuitBreaker()
+        # Bodies plus ETag/Last-Modified, revalidated with conditional requests.
+        self.response_cache = ResponseCache()
+        self.metrics = ApiMetrics()
+        self.tokens: Optional[AuthTokens] = tokens
+        self._auth_lock = asyncio.Lock()
 
-    def login(self) -> AuthTokens:
+    async def login(self) -> AuthTokens:
         payload = {
             "AuthFlow": "USER_PASSWORD_AUTH",
             "ClientId": COGNITO_CLIENT_ID,
             "AuthParameters": {"USERNAME": self.email, "PASSWORD": self.password},
         }
-        data = self._cognito_request("InitiateAuth", payload)
-        result = data.get("AuthenticationResult") or {}
-        tokens = AuthTokens(
-            access_token=result.get("AccessToken", ""),
-            id_token=result.get("IdToken", ""),
-            refresh_token=result.get("RefreshToken"),
-            expires_in=int(result.get("ExpiresIn", 0)),
-        )
-        if not tokens.access_token:
-            raise RuntimeError("Cognito auth did not return AccessToken")
-        self.tokens = tokens
-        return tokens
-
-    def get_user_sub(self) -> str:
-        data = self._cognito_request(
-            "GetUser", {"AccessToken": self._access_token()}
-        )
+        self.metrics.password_logins += 1
+        data = await self._cognito_request("InitiateAuth", payload)
+        self.tokens = _tokens_from_result(data, None)
+        return self.tokens
+
+    async def refresh(self) -> AuthTokens:
+        """Use the refresh token if we have one, falling back to a password login."""
+        refresh_token = self.tokens.refresh_token if self.tokens else None
+        if not refresh_token:
+            return await self.login()
+        payload = {
+            "AuthFlow": "REFRESH_TOKEN_AUTH",
+            "ClientId": COGNITO_CLIENT_ID,
+            "AuthParameters": {"REFRESH_TOKEN": refresh_token},
+        }
+        self.metrics.token_refreshes += 1
+        try:
+            data = await self._cognito_request("InitiateAuth", payload)
+            # Cognito does not rotate the refresh token on REFRESH_TOKEN_AUTH.
+            self.tokens = _tokens_from_result(data, refresh_token)
+        except (aiohttp.ClientError, RuntimeError):
+            return await self.login()
+        return self.tokens
+
+    async def get_user_sub(self) -> str:
+        access_token = await self._access_token()
+        # The IdToken already carries the sub; only ask Cognito if it does not.
+        sub = _jwt_claims(self.tokens.id_token if self.tokens else "").get("sub")
+        if sub:
+            return sub
+        data = await self._cognito_request("GetUser", {"AccessToken": access_token})
         for attr in data.get("UserAttributes", []):
             if attr.get("Name") == "sub":
                 return attr.get("Value", "")
         raise RuntimeError("Cognito GetUser response missing sub")
 
-    def get_customer_ids(self, sub: str) -> List[str]:
-        data = self._api_get("/idm/customerMetadata", params={"sub": sub})
+    async def get_customer_ids(self, sub: str) -> List[str]:
+        data = await self._api_get("/idm/customerMetadata", params={"sub": sub})
         customer_ids = data.get("data", {}).get("customer_ids") or []
         return list(customer_ids)
 
-    def get_metering_point_ids(self, customer_id: str) -> List[str]:
-        data = self._api_get(
+    async def get_metering_point_ids(self, customer_id: str) -> List[str]:
+        data = await self._api_get(
             "/customer/customers", params={"customerId[]": customer_id}
         )
         items = data.get("data") or []
         if not items:
             return []
-        profile = items[0]
-        metering_points: List[str] = []
-        for contract in profile.get("contracts", []) or []:
-            mp = contract.get("meteringPoint") or {}
-            mp_id = mp.get("meteringPointId")
-            if mp_id:
-                metering_points.append(mp_id)
-        return metering_points
-
-    def get_consumption(
+        return _metering_point_ids(items[0])
+
+    async def get_customer_profiles(
+        self, customer_ids: List[str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """Fetch many profiles per request via the customerId[] array parameter.
+
+        Ids the server leaves out of a batch (e.g. because it caps the array)
+        are fetched one by one concurrently.
+        """
+        profiles: Dict[str, Dict[str, Any]] = {}
+        for offset in range(0, len(customer_ids), CUSTOMER_BATCH_SIZE):
+            batch = customer_ids[offset : offset + CUSTOMER_BATCH_SIZE]
+            data = await self._api_get(
+                "/customer/customers",
+                params=[("customerId[]", customer_id) for customer_id in batch],
+            )
+            for item in data.get("data") or []:
+                customer_id = _profile_customer_id(item, batch)
+                if customer_id:
+                    profiles[customer_id] = item
+        missing = [customer_id for customer_id in customer_ids if customer_id not in profiles]
+        responses = await asyncio.gather(
+            *(self._optional_profile(customer_id) for customer_id in missing)
+        )
+        for customer_id, profile in zip(missing, responses):
+            if profile is not None:
+                profiles[customer_id] = profile
+        return profiles
+
+    async def _optional_profile(self, customer_id: str) -> Optional[Dict[str, Any]]:
+        # One failing id must not discard the profiles the others returned.
+        try:
+            data = await self._api_get(
+                "/customer/customers", params={"customerId[]": customer_id}
+            )
+        except RuntimeError:
+            return None
+        items = data.get("data") or []
+        return items[0] if items else None
+
+    async def get_metering_point_ids_by_customer(
+        self, customer_ids: List[str]
+    ) -> Dict[str, List[str]]:
+        profiles = await self.get_customer_profiles(customer_ids)
+        return {
+            customer_id: _metering_point_ids(profiles.get(customer_id) or {})
+            for customer_id in customer_ids
+        }
+
+    async def get_consumption(
+        self,
+        customer_id: str,
+        metering_point_id: str,
+        start: str,
+        end: str,
+        resolution: str,
+    ) -> Dict[str, Any]:
+        return await self._energy_get(
+            "consumption", customer_id, metering_point_id, start, end, resolution
+        )
+
+    async def get_pricing(
+        self,
+        customer_id: str,
+        metering_point_id: str,
+        start: str,
+        end: str,
+        resolution: str,
+    ) -> Dict[str, Any]:
+        return await self._energy_get(
+            "pricing", customer_id, metering_point_id, start, end, resolution
+        )
+
+    async def _energy_get(
         self,
+        kind: str,
         customer_id: str,
         metering_point_id: str,
         start: str,
@@ -95,63 +222,226 @@ class JSEApi:
             "end": end,
             "resolution": resolution,
         }
-        path = f"/consumption/consumption/energy/{metering_point_id}"
-        return self._api_get(path, params=params)
+        path = f"/consumption/{kind}/energy/{metering_point_id}"
+        # Provisional hours change without notice, so only fully final windows are kept.
+        return await self._api_get(
+            path, params=params, cache_if=_all_final if kind == "consumption" else None
+        )
 
-    def _access_token(self) -> str:
-        if not self.tokens:
-            self.login()
+    async def _access_token(self) -> str:
+        tokens = self.tokens
+        if tokens is None or not tokens.is_fresh():
+            async with self._auth_lock:
+                # Another coroutine may have refreshed while we waited.
+                if self.tokens is None:
+                    await self.login()
+                elif not self.tokens.is_fresh():
+                    await self.refresh()
         assert self.tokens
         return self.tokens.access_token
 
-    def _cognito_request(self, target: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    async def _reauthenticate(self, rejected: str) -> None:
+        self.metrics.rejected_tokens += 1
+        async with self._auth_lock:
+            if self.tokens is None or self.tokens.access_token == rejected:
+                await self.refresh()
+
+    async def _cognito_request(
+        self, target: str, payload: Dict[str, Any]
+    ) -> Dict[str, Any]:
         headers = {
             "Content-Type": "application/x-amz-json-1.1",
             "X-Amz-Target": f"AWSCognitoIdentityProviderService.{target}",
         }
-        response = self.session.post(
-            COGNITO_ENDPOINT, headers=headers, data=json.dumps(payload), timeout=30
-        )
-        response.raise_for_status()
-        return response.json()
+        async with self.session.post(
+            self.cognito_endpoint,
+            headers=headers,
+            data=json.dumps(payload),
+            timeout=REQUEST_TIMEOUT,
+        ) as response:
+            response.raise_for_status()
+            # Cognito answers with application/x-amz-json-1.1.
+            return await response.json(content_type=None)
 
-    def _api_get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        url = f"{API_BASE}{path}"
-        headers = {"Accept": "application/json", "Authorization": f"Bearer {self._access_token()}"}
+    async def _api_get(
+        self,
+        path: str,
+        params: Optional[Any] = None,
+        cache_if: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    ) -> Dict[str, Any]:
+        url = f"{self.api_base}{path}"
+        label = _metrics_label(path)
+        access_token = await self._access_token()
+        headers = {"Accept": "application/json", "Authorization": f"Bearer {access_token}"}
         try:
-            return _request_with_retry(self.session, "GET", url, headers=headers, params=params)
+            return await self._request("GET", url, headers, params, cache_if, label)
         except PermissionError:
-            self.login()
-            headers["Authorization"] = f"Bearer {self._access_token()}"
-            return _request_with_retry(self.session, "GET", url, headers=headers, params=params)
+            await self._reauthenticate(access_token)
+            headers["Authorization"] = f"Bearer {await self._access_token()}"
+            return await self._request("GET", url, headers, params, cache_if, label)
 
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        headers: Dict[str, str],
+        params: Optional[Any],
+        cache_if: Optional[Callable[[Dict[str, Any]], bool]] = None,
+        label: str = ACCOUNT,
+    ) -> Dict[str, Any]:
+        key = request_key(method, url, params)
+        cached = self.response_cache.get(key) if method == "GET" else None
+        if cached is not None:
+            headers = {**headers, **cached[0]}
+        trace = RequestTrace()
+        started = time.monotonic()
+        try:
+            status, response_headers, body = await _request_with_retry(
+                self.session,
+                method,
+                url,
+                headers=headers,
+                params=params,
+                policy=self.retry_policy,
+                breaker=self.breaker,
+                trace=trace,
+            )
+        except PermissionError:
+            # Auth churn is counted by _reauthenticate, not as a failure.
+            self.metrics.record(label, time.monotonic() - started, trace)
+            raise
+        except Exception as exc:
+            self.metrics.record(label, time.monotonic() - started, trace, error=exc)
+            raise
+        self.metrics.record(
+            label, time.monotonic() - started, trace, not_modified=status == 304
+        )
+        if status == 304:
+            if cached is None:
+                raise RuntimeError("Not Modified (304) without a cached response")
+            return cached[1]
+        if method == "GET":
+            validators = validators_from(response_headers)
+            if validators and (cache_if is None or cache_if(body)):
+                self.response_cache.put(key, validators, body)
+        return body
+
+
+def _metrics_label(path: str) -> str:
+    """Energy calls are attributed to their metering point, everything else to the account."""
+    parts = path.strip("/").split("/")
+    if len(parts) == 4 and parts[0] == "consumption" and parts[2] == "energy":
+        return parts[3]
+    return ACCOUNT
+
+
+def _all_final(response: Dict[str, Any]) -> bool:
+    series_list = (response.get("data") or {}).get("productSeries") or []
+    points = (series_list[0].get("data") or []) if series_list else []
+    return bool(points) and all(
+        int(point.get("status") or 0) == STATUS_FINAL for point in points
+    )
+
+
+def _metering_point_ids(profile: Dict[str, Any]) -> List[str]:
+    metering_points: List[str] = []
+    for contract in profile.get("contracts", []) or []:
+        mp = contract.get("meteringPoint") or {}
+        mp_id = mp.get("meteringPointId")
+        if mp_id:
+            metering_points.append(mp_id)
+    return metering_points
+
+
+def _profile_customer_id(profile: Dict[str, Any], requested: List[str]) -> Optional[str]:
+    """Match a returned profile to the id we asked for (``jes_1234567`` style)."""
+    for candidate in (profile.get("id"), f"jes_{profile.get('customerId')}"):
+        if candidate in requested:
+            return candidate
+    return None
 
-def _request_with_retry(
-    session: requests.Session,
+
+def _jwt_claims(token: str) -> Dict[str, Any]:
+    """Decode a JWT payload without verifying it; Cognito already did."""
+    try:
+        payload = token.split(".")[1]
+        padded = payload + "=" * (-len(payload) % 4)
+        claims = json.loads(base64.urlsafe_b64decode(padded))
+    except (IndexError, ValueError):
+        return {}
+    return claims if isinstance(claims, dict) else {}
+
+
+def _tokens_from_result(
+    data: Dict[str, Any], refresh_token: Optional[str]
+) -> AuthTokens:
+    result = data.get("AuthenticationResult") or {}
+    expires_in = int(result.get("ExpiresIn", 0))
+    tokens = AuthTokens(
+        access_token=result.get("AccessToken", ""),
+        id_token=result.get("IdToken", ""),
+        refresh_token=result.get("RefreshToken") or refresh_token,
+        expires_in=expires_in,
+        expires_at=time.time() + expires_in,
+    )
+    if not tokens.access_token:
+        raise RuntimeError("Cognito auth did not return AccessToken")
+    return tokens
+
+
+async def _request_with_retry(
+    session: aiohttp.ClientSession,
     method: str,
     url: str,
     headers: Dict[str, str],
-    params: Optional[Dict[str, Any]] = None,
-    max_retries: int = 3,
-) -> Dict[str, Any]:
-    last_exc: Optional[Exception] = None
-    for attempt in range(max_retries):
+    params: Optional[Any] = None,
+    policy: Optional[RetryPolicy] = None,
+    breaker: Optional[CircuitBreaker] = None,
+    trace: Optional[RequestTrace] = None,
+) -> Tuple[int, Any, Any]:
+    """Send with retries; returns (status, headers, parsed body), body None on 304."""
+    policy = policy or RetryPolicy()
+    trace = trace or RequestTrace()
+    started = time.monotonic()
+    attempt = 0
+    while True:
+        probe = breaker.before_request() if breaker is not None else False
+        trace.attempts += 1
+        retry_after: Optional[float] = None
         try:
-            response = session.request(
-                method, url, headers=headers, params=params, timeout=30
-            )
-            if response.status_code in (401, 403):
-                raise PermissionError(f"Unauthorized ({response.status_code})")
-            if response.status_code in (429, 500, 502, 503, 504):
-                raise RuntimeError(f"Retryable status {response.status_code}")
-            response.raise_for_status()
-            return response.json()
-        except PermissionError:
-            raise
-        except Exception as exc:  # noqa: BLE001 - keep simple retry loop
-            last_exc = exc
-            if attempt < max_retries - 1:
-                time.sleep(0.5 * (2**attempt))
-                continue
-            raise RuntimeError(f"Request failed after {max_retries} attempts") from last_exc
-    raise RuntimeError("Unreachable retry loop")
+            timeout = aiohttp.ClientTimeout(total=policy.timeout(time.monotonic() - started))
+            async with session.request(
+                method, url, headers=headers, params=params, timeout=timeout
+            ) as response:
+                status = response.status
+                if breaker is not None:
+                    if status in BREAKER_STATUSES:
+                        breaker.record_failure()
+                    else:
+                        breaker.record_success()
+                action = classify_status(status)
+                if action == UNAUTHORIZED:
+                    raise PermissionError(f"Unauthorized ({status})")
+                if action == RETRY:
+                    error: Exception = RuntimeError(f"Retryable status {status}")
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                elif action == FAIL:
+                    raise RuntimeError(f"Request failed with status {status}")
+                elif action == NOT_MODIFIED:
+                    return status, response.headers, None
+                else:
+                    raw = await response.read()
+                    trace.size += len(raw)
+                    return status, response.headers, json.loads(raw)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as exc:
+            if breaker is not None and not isinstance(exc, ValueError):
+                breaker.record_failure()
+            error = exc
+        finally:
+            if probe:
+                breaker.release_probe()
+        delay = policy.next_delay(attempt, time.monotonic() - started, retry_after)
+        if delay is None:
+            raise RuntimeError(f"Request failed after {attempt + 1} attempts") from error
+        await asyncio.sleep(delay)
+        attempt += 1
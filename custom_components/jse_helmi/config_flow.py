@@ -1,11 +1,12 @@
 from __future__ import annotations
 
-import requests
+import aiohttp
 import voluptuous as vol
 
 from homeassistant import config_entries
 from homeassistant.core import HomeAssistant
 from homeassistant.data_entry_flow import FlowResult
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
 from .api import JSEApi
 from .const import (
@@ -31,7 +32,9 @@ class JSEConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         self._password: str | None = None
         self._customer_ids: list[str] = []
         self._metering_point_ids: list[str] = []
+        self._metering_points_by_customer: dict[str, list[str]] = {}
         self._selected_customer_id: str | None = None
+        self._api: JSEApi | None = None
 
     async def async_step_user(self, user_input: dict | None = None) -> FlowResult:
         errors: dict[str, str] = {}
@@ -40,12 +43,13 @@ class JSEConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             self._password = user_input[CONF_PASSWORD]
             try:
                 await self._async_discover()
-            except requests.HTTPError as exc:
-                if exc.response is not None and exc.response.status_code in (401, 403):
+            except aiohttp.ClientResponseError as exc:
+                # Cognito rejects bad credentials with 400 NotAuthorizedException.
+                if exc.status in (400, 401, 403):
                     errors["base"] = "auth_failed"
                 else:
                     errors["base"] = "cannot_connect"
-            except requests.RequestException:
+            except aiohttp.ClientError:
                 errors["base"] = "cannot_connect"
             except Exception:
                 errors["base"] = "unknown"
@@ -114,18 +118,35 @@ class JSEConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             },
         )
 
+    def _get_api(self) -> JSEApi:
+        # One client per flow, so discovery steps reuse a single login.
+        if (
+            self._api is None
+            or self._api.email != self._email
+            or self._api.password != self._password
+        ):
+            self._api = JSEApi(
+                email=self._email or "",
+                password=self._password or "",
+                session=async_get_clientsession(self.hass),
+            )
+        return self._api
+
     async def _async_discover(self) -> None:
-        api = JSEApi(email=self._email or "", password=self._password or "")
-        sub = await self.hass.async_add_executor_job(api.get_user_sub)
-        self._customer_ids = await self.hass.async_add_executor_job(
-            api.get_customer_ids, sub
+        api = self._get_api()
+        sub = await api.get_user_sub()
+        self._customer_ids = await api.get_customer_ids(sub)
+        # Resolve every customer's metering points up front in one batch.
+        self._metering_points_by_customer = await api.get_metering_point_ids_by_customer(
+            self._customer_ids
         )
 
     async def _async_set_metering_points(self, customer_id: str) -> None:
-        api = JSEApi(email=self._email or "", password=self._password or "")
-        self._metering_point_ids = await self.hass.async_add_executor_job(
-            api.get_metering_point_ids, customer_id
-        )
+        if customer_id not in self._metering_points_by_customer:
+            self._metering_points_by_customer[customer_id] = (
+                await self._get_api().get_metering_point_ids(customer_id)
+            )
+        self._metering_point_ids = self._metering_points_by_customer[customer_id]
 
     @staticmethod
     def async_get_options_flow(config_entry: config_entries.ConfigEntry):
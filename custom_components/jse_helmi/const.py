@@ -8,7 +8,17 @@ CONF_CUTOFF_HOUR = "cutoff_hour"
 CONF_UPDATE_MINUTE = "update_minute"
 CONF_STALE_HOURS = "stale_hours"
 
-DEFAULT_UPDATE_INTERVAL_MINUTES = 60
 DEFAULT_CUTOFF_HOUR = 5
 DEFAULT_UPDATE_MINUTE = 10
 DEFAULT_STALE_HOURS = 3
+
+STORAGE_VERSION = 1
+
+# Points with this status are final; anything else may still be revised.
+STATUS_FINAL = 150
+# Hourly history kept in the local consumption store.
+STORE_RETENTION_DAYS = 31
+# History imported into long-term statistics on first run.
+BACKFILL_DAYS = 180
+# Longest range requested in one hourly consumption call.
+HOURLY_WINDOW_DAYS = 7
@@ -1,32 +1,61 @@
 from __future__ import annotations
 
+import asyncio
 from dataclasses import dataclass
-from datetime import timedelta
+from datetime import date, datetime, timedelta
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from homeassistant.util import dt as dt_util
 
-from .api import JSEApi
 from .const import (
     CONF_CUTOFF_HOUR,
     CONF_CUSTOMER_ID,
-    CONF_EMAIL,
     CONF_METERING_POINT_ID,
-    CONF_PASSWORD,
     CONF_STALE_HOURS,
+    CONF_UPDATE_MINUTE,
     DEFAULT_CUTOFF_HOUR,
     DEFAULT_STALE_HOURS,
+    DEFAULT_UPDATE_MINUTE,
     DOMAIN,
+    HOURLY_WINDOW_DAYS,
+    STORE_RETENTION_DAYS,
 )
+from .hub import JSEHub
+from .periods import (
+    closed_days,
+    closed_months,
+    day_start,
+    derive_days,
+    derive_months,
+    first_open,
+    is_final,
+    months_before,
+)
+from .scheduler import PublishScheduler
+from .series import ConsumptionSeries, HourlyRecord
+from .statistics import ConsumptionStatistics
+from .store import REVISION_MERGE_GAP_HOURS, ConsumptionStore
 
+# Concurrent window requests while backfilling history.
+HISTORY_CONCURRENCY = 4
 
-@dataclass
-class ConsumptionPoint:
-    timestamp: str
-    value: float
+SERIES_WINDOW = timedelta(days=2)
+# Separate provisional ranges re-requested per refresh; older ones wait until these finalize.
+MAX_REVISION_RANGES = 4
+# Closed days and months kept; days cover the whole previous month so it can be summed.
+DAY_RETENTION_DAYS = 62
+MONTH_RETENTION_MONTHS = 13
+# A day or month the API did not return as final (e.g. before the meter existed)
+# is asked for again after this long rather than on every refresh.
+PERIOD_RETRY_SECONDS = 6 * 3600
+# Backoff between attempts of the first-run statistics backfill.
+STATISTICS_RETRY_SECONDS = 5 * 60
+MAX_STATISTICS_RETRY_SECONDS = 3 * 3600
+
+_LOGGER = logging.getLogger(__name__)
 
 
 @dataclass
@@ -34,68 +63,341 @@ class ConsumptionData:
     customer_id: str
     metering_point_id: str
     unit: str
-    series: List[ConsumptionPoint]
+    series: ConsumptionSeries
+    # Closed local days and months, keyed by the epoch of their local start.
+    daily_series: ConsumptionSeries
+    monthly_series: ConsumptionSeries
 
 
 class JSECoordinator(DataUpdateCoordinator[ConsumptionData]):
     def __init__(
         self,
         hass: HomeAssistant,
+        hub: JSEHub,
         config: Dict[str, Any],
-        update_interval: timedelta,
     ) -> None:
         self.hass = hass
-        self._email = config[CONF_EMAIL]
-        self._password = config[CONF_PASSWORD]
+        self._hub = hub
         self._customer_id = config[CONF_CUSTOMER_ID]
         self._metering_point_id = config[CONF_METERING_POINT_ID]
         self.cutoff_hour = int(config.get(CONF_CUTOFF_HOUR, DEFAULT_CUTOFF_HOUR))
         self.stale_hours = int(config.get(CONF_STALE_HOURS, DEFAULT_STALE_HOURS))
-        self._client = JSEApi(email=self._email, password=self._password)
+        self._client = hub.api
+        self._store = ConsumptionStore(hass, self._metering_point_id)
+        self._statistics = ConsumptionStatistics(hass, self._metering_point_id)
+        # Until publish lags are learned, expect final hours at the configured minute.
+        update_minute = int(config.get(CONF_UPDATE_MINUTE, DEFAULT_UPDATE_MINUTE))
+        self.scheduler = PublishScheduler(default_lag=update_minute * 60)
+        # Epoch seconds when the hub should refresh this entry next.
+        self.next_refresh = 0.0
+        # Per resolution: (first open period start, epoch seconds when it may be requested again).
+        self._period_retry: Dict[str, Tuple[int, float]] = {}
         super().__init__(
             hass,
-            logger=logging.getLogger(__name__),
+            logger=_LOGGER,
             name=f"{DOMAIN}_{self._metering_point_id}",
-            update_interval=update_interval,
+            # The hub drives refreshes from the scheduler instead of a fixed interval.
+            update_interval=None,
         )
 
+    def api_metrics(self) -> Dict[str, Any]:
+        """Request metrics for this metering point plus the account's auth counters."""
+        metrics = self._client.metrics
+        return {**metrics.snapshot(self._metering_point_id), "auth": metrics.auth_snapshot()}
+
+    async def async_restore(self) -> None:
+        """Load the stored hourly points and learned publish lags before the first refresh."""
+        await self._store.async_load()
+        self.scheduler = PublishScheduler(self.scheduler.default_lag, self._store.lags)
+        self._store.lags = self.scheduler.lags
+
     async def _async_update_data(self) -> ConsumptionData:
         try:
-            return await self.hass.async_add_executor_job(self._fetch_consumption)
+            data = await self._fetch_consumption()
         except Exception as exc:  # noqa: BLE001 - coordinator wraps errors
-            logging.getLogger(__name__).exception("JSE Helmi update failed")
+            now = dt_util.utcnow().timestamp()
+            self.scheduler.failed(now)
+            self.next_refresh = self.scheduler.next_poll(now, self._store.last_final_epoch())
+            _LOGGER.exception("JSE Helmi update failed")
             raise UpdateFailed(str(exc)) from exc
+        await self._hub.async_save_tokens()
+        return data
 
-    def _fetch_consumption(self) -> ConsumptionData:
+    async def _fetch_consumption(self) -> ConsumptionData:
         end = dt_util.as_local(dt_util.now()).replace(minute=0, second=0, microsecond=0)
-        start = end - timedelta(days=2)
-        raw = self._client.get_consumption(
+        window_start = end - SERIES_WINDOW
+        retention_start = end - timedelta(days=STORE_RETENTION_DAYS)
+        start = window_start
+        last_final = self._store.last_final_epoch()
+        latest = self._store.series.last_epoch
+        if latest is not None:
+            # New hours start after the latest one we hold, final or not.
+            start = max(retention_start, _local(latest + 3600))
+        # Provisional hours we already hold are re-requested as narrow ranges until final.
+        revisions = self._store.provisional_ranges(int(retention_start.timestamp()))
+        if revisions and revisions[-1][1] >= start.timestamp() - REVISION_MERGE_GAP_HOURS * 3600:
+            # A provisional tail joins the new range instead of costing its own request.
+            start = _local(revisions.pop()[0])
+        revisions = revisions[-MAX_REVISION_RANGES:]
+        fetch_new = start < end
+        # Hours held without a price (a pricing call failed) are priced again the same way.
+        # The new range is priced anyway, so older ranges are clipped at its start.
+        new_from = int(start.timestamp()) if fetch_new else int(end.timestamp())
+        price_ranges = [
+            (range_start, min(range_end, new_from))
+            for range_start, range_end in self._store.unpriced_ranges(
+                int(retention_start.timestamp())
+            )
+            if range_start < new_from
+        ][-MAX_REVISION_RANGES:]
+        if fetch_new:
+            price_ranges.extend(
+                (int(window_start.timestamp()), int(window_end.timestamp()))
+                for window_start, window_end in _hour_windows(start, end)
+            )
+        if fetch_new or revisions or price_ranges:
+            # (end epoch, request) per range; _parse_hourly drops anything past the end.
+            fetches = [
+                (range_end, self._fetch_hours(_local(range_start), _local(range_end)))
+                for range_start, range_end in revisions
+            ]
+            if fetch_new:
+                # After downtime the new range can span the whole retention; keep
+                # each request within HOURLY_WINDOW_DAYS like the history backfill.
+                fetches.extend(
+                    (int(window_end.timestamp()), self._fetch_hours(window_start, window_end))
+                    for window_start, window_end in _hour_windows(start, end)
+                )
+            requests = [request for _, request in fetches]
+            # Pricing is fetched alongside consumption, one request per range.
+            requests.extend(
+                self._fetch_pricing(_local(range_start).isoformat(), _local(range_end).isoformat())
+                for range_start, range_end in price_ranges
+            )
+            responses = await asyncio.gather(*requests)
+            changed_from: Optional[int] = None
+            for (range_end, _), raw in zip(fetches, responses):
+                records, unit = _parse_hourly(raw, range_end)
+                if unit and not self._store.unit:
+                    self._store.unit = unit
+                changed = self._store.merge(records)
+                if changed is not None and (changed_from is None or changed < changed_from):
+                    changed_from = changed
+            prices: List[Tuple[int, float]] = []
+            for (_, range_end), raw_prices in zip(price_ranges, responses[len(fetches) :]):
+                if raw_prices is not None:
+                    records, _ = _parse_hourly(raw_prices, range_end)
+                    prices.extend((epoch, value) for epoch, value, _ in records)
+            self._store.merge_prices(prices)
+            self._store.prune(int(retention_start.timestamp()))
+            self.scheduler.observe(
+                dt_util.utcnow().timestamp(), last_final, self._store.last_final_epoch()
+            )
+            await self._async_update_statistics(changed_from)
+        await self._async_update_periods(end.date())
+        self._store.async_schedule_save()
+
+        now = dt_util.utcnow().timestamp()
+        self.next_refresh = self.scheduler.next_poll(now, self._store.last_final_epoch())
+
+        return ConsumptionData(
+            customer_id=self._customer_id,
+            metering_point_id=self._metering_point_id,
+            unit=self._store.unit or "kWh",
+            series=self._store.since(int(window_start.timestamp())),
+            daily_series=self._store.days.since(0),
+            monthly_series=self._store.months.since(0),
+        )
+
+    async def _async_update_periods(self, today: date) -> None:
+        """Bring closed days and months up to date, preferring sums of what we hold.
+
+        Days are summed from final hours and months from final days; the API
+        is only asked for the span from the first period still missing, at
+        most once per resolution, and final periods are never requested again.
+        A span whose first period comes back empty or provisional waits
+        PERIOD_RETRY_SECONDS before it is requested again.
+        """
+        store = self._store
+        days = closed_days(today - timedelta(days=DAY_RETENTION_DAYS), today)
+        months = closed_months(months_before(today, MONTH_RETENTION_MONTHS), today)
+        store.prune_periods(day_start(days[0]), day_start(months[0]))
+        # Periods still covered by the finer series are summed once final, so only
+        # those before its first point need a coarser request.
+        hours_from = store.series.epochs[0] if store.series else day_start(today)
+        days_from = day_start(days[0])
+        try:
+            store.merge(derive_days(store.series, days), store.days)
+            await self._fetch_periods(
+                store.days, [day_start(day) for day in days], day_start(today), hours_from, "day"
+            )
+            store.merge(derive_months(store.days, months), store.months)
+            await self._fetch_periods(
+                store.months,
+                [day_start(month) for month in months],
+                day_start(today.replace(day=1)),
+                days_from,
+                "month",
+            )
+        except Exception:  # noqa: BLE001 - the hourly data must still be published
+            _LOGGER.warning("JSE Helmi day/month fetch failed", exc_info=True)
+
+    async def _fetch_periods(
+        self,
+        series: ConsumptionSeries,
+        starts: List[int],
+        end: int,
+        covered_from: int,
+        resolution: str,
+    ) -> None:
+        """One request from the first open period up to those the finer series covers."""
+        missing = first_open(series, [start for start in starts if start < covered_from])
+        if missing is None:
+            self._period_retry.pop(resolution, None)
+            return
+        now = dt_util.utcnow().timestamp()
+        retry = self._period_retry.get(resolution)
+        if retry is not None and retry[0] == missing and now < retry[1]:
+            return
+        # Requests end at a period boundary: the first period the finer series covers.
+        until = next((start for start in starts if start >= covered_from), end)
+        raw = await self._client.get_consumption(
+            customer_id=self._customer_id,
+            metering_point_id=self._metering_point_id,
+            start=_local(missing).isoformat(),
+            end=_local(until).isoformat(),
+            resolution=resolution,
+        )
+        records, _ = _parse_hourly(raw, until)
+        snap = _month_of if resolution == "month" else _day_of
+        records = [(snap(epoch), value, status) for epoch, value, status in records]
+        # A final period is immutable; a late response must not overwrite one.
+        self._store.merge(
+            (
+                record
+                for record in records
+                if record[0] >= missing and not is_final(series, record[0])
+            ),
+            series,
+        )
+        if is_final(series, missing):
+            self._period_retry.pop(resolution, None)
+        else:
+            # Empty or still provisional: wait before asking for the same span again.
+            self._period_retry[resolution] = (missing, now + PERIOD_RETRY_SECONDS)
+
+    async def _fetch_hours(self, start: datetime, end: datetime) -> Dict[str, Any]:
+        return await self._client.get_consumption(
             customer_id=self._customer_id,
             metering_point_id=self._metering_point_id,
             start=start.isoformat(),
             end=end.isoformat(),
             resolution="hour",
         )
-        data = raw.get("data", {})
-        series_list = data.get("productSeries") or []
-        points: List[ConsumptionPoint] = []
-        unit = ""
-        if series_list:
-            for point in series_list[0].get("data") or []:
-                ts = point.get("startTime")
-                parsed = dt_util.parse_datetime(ts) if ts else None
-                local_dt = dt_util.as_local(parsed) if parsed else None
-                if local_dt and local_dt >= end:
-                    continue
-                local_ts = local_dt.isoformat() if local_dt else ""
-                if not unit:
-                    unit = point.get("type", "")
-                points.append(
-                    ConsumptionPoint(timestamp=local_ts, value=float(point.get("value", 0.0)))
+
+    async def _async_update_statistics(self, changed_from: Optional[int]) -> None:
+        # Statistics are a side channel; a recorder hiccup must not fail the update.
+        try:
+            await self._statistics.async_update(self._store.series, changed_from)
+        except Exception:  # noqa: BLE001 - statistics are best effort
+            _LOGGER.warning("JSE Helmi statistics import failed", exc_info=True)
+
+    async def async_prepare_statistics(self) -> None:
+        """Backfill long-term statistics; started as a background task after setup.
+
+        Failures are retried with backoff so a transient error neither fails
+        setup nor leaves the statistic without history.
+        """
+        delay = STATISTICS_RETRY_SECONDS
+        while True:
+            try:
+                await self._statistics.async_prepare(self._store.series, self._fetch_history)
+                return
+            except Exception:  # noqa: BLE001 - statistics are best effort
+                _LOGGER.warning(
+                    "JSE Helmi statistics backfill failed; retrying in %d s", delay, exc_info=True
                 )
-        return ConsumptionData(
-            customer_id=self._customer_id,
-            metering_point_id=self._metering_point_id,
-            unit=unit or "kWh",
-            series=points,
-        )
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_STATISTICS_RETRY_SECONDS)
+
+    async def _fetch_history(self, start: datetime, end: datetime) -> List[HourlyRecord]:
+        """Fetch a long hourly range in concurrent windows for the statistics backfill."""
+        semaphore = asyncio.Semaphore(HISTORY_CONCURRENCY)
+        windows = _hour_windows(start, end)
+
+        async def fetch(window_start: datetime, window_end: datetime) -> List[HourlyRecord]:
+            async with semaphore:
+                raw = await self._client.get_consumption(
+                    customer_id=self._customer_id,
+                    metering_point_id=self._metering_point_id,
+                    start=window_start.isoformat(),
+                    end=window_end.isoformat(),
+                    resolution="hour",
+                )
+            return _parse_hourly(raw, window_end.timestamp())[0]
+
+        results = await asyncio.gather(*(fetch(*window) for window in windows))
+        # Windows can repeat the hour at their seam; keep one record per hour.
+        merged = {record[0]: record for records in results for record in records}
+        return list(merged.values())
+
+    async def _fetch_pricing(self, start: str, end: str) -> Optional[Dict[str, Any]]:
+        # Missing prices only leave cost empty; they must not fail the update.
+        try:
+            return await self._client.get_pricing(
+                customer_id=self._customer_id,
+                metering_point_id=self._metering_point_id,
+                start=start,
+                end=end,
+                resolution="hour",
+            )
+        except Exception:  # noqa: BLE001 - pricing is best effort
+            _LOGGER.warning("JSE Helmi pricing fetch failed", exc_info=True)
+            return None
+
+
+def _local(epoch: int) -> datetime:
+    return dt_util.as_local(dt_util.utc_from_timestamp(epoch))
+
+
+def _hour_windows(start: datetime, end: datetime) -> List[Tuple[datetime, datetime]]:
+    """Split [start, end) into local windows of at most HOURLY_WINDOW_DAYS."""
+    windows = []
+    cursor = dt_util.as_local(start)
+    end_local = dt_util.as_local(end)
+    while cursor < end_local:
+        window_end = min(cursor + timedelta(days=HOURLY_WINDOW_DAYS), end_local)
+        windows.append((cursor, window_end))
+        cursor = window_end
+    return windows
+
+
+def _day_of(epoch: int) -> int:
+    return day_start(_local(epoch).date())
+
+
+def _month_of(epoch: int) -> int:
+    return day_start(_local(epoch).date().replace(day=1))
+
+
+def _parse_hourly(raw: Dict[str, Any], end_epoch: float) -> Tuple[List[HourlyRecord], str]:
+    """Turn an hourly consumption or pricing response into (epoch, value, status) records."""
+    data = raw.get("data", {})
+    series_list = data.get("productSeries") or []
+    records: List[HourlyRecord] = []
+    unit = ""
+    if series_list:
+        for point in series_list[0].get("data") or []:
+            ts = point.get("startTime")
+            parsed = dt_util.parse_datetime(ts) if ts else None
+            if parsed is None or parsed.timestamp() >= end_epoch:
+                continue
+            if not unit:
+                unit = point.get("type", "")
+            try:
+                value = float(point["value"])
+            except (KeyError, TypeError, ValueError):
+                # A null or missing value is an hour without data, not zero consumption.
+                continue
+            records.append((int(parsed.timestamp()), value, int(point.get("status", 0) or 0)))
+    return records, unit
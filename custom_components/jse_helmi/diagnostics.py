@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from typing import Any, Dict
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_EMAIL, CONF_PASSWORD, DOMAIN
+from .coordinator import ConsumptionData, JSECoordinator
+
+TO_REDACT = {CONF_EMAIL, CONF_PASSWORD}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> Dict[str, Any]:
+    """Full hourly series on demand, instead of in every recorded state."""
+    coordinator: JSECoordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    data: ConsumptionData = coordinator.data
+    return {
+        "config": async_redact_data({**entry.data, **entry.options}, TO_REDACT),
+        "last_update_success": coordinator.last_update_success,
+        "api": coordinator.api_metrics(),
+        "unit": data.unit,
+        "series": [
+            {
+                "ts": point.timestamp,
+                "value": point.value,
+                "status": point.status,
+                "price": point.price,
+                "cost": point.cost,
+            }
+            for point in data.series
+        ],
+        "daily": [
+            {"ts": point.timestamp, "value": point.value, "status": point.status}
+            for point in data.daily_series
+        ],
+        "monthly": [
+            {"ts": point.timestamp, "value": point.value, "status": point.status}
+            for point in data.monthly_series
+        ],
+    }
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlencode
+
+# Responses kept in memory per account before the least recently used go.
+DEFAULT_MAX_ENTRIES = 128
+
+
+class ResponseCache:
+    """API response bodies with their ETag/Last-Modified, least recently used first out.
+
+    Home Assistant runs for weeks, so memory is enough; the CLI keeps the same
+    entries on disk (client/http_cache.py).
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, Tuple[Dict[str, str], Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Tuple[Dict[str, str], Any]]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: str, validators: Dict[str, str], body: Any) -> None:
+        self._entries[key] = (validators, body)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+def request_key(method: str, url: str, params: Optional[Any]) -> str:
+    """Stable key for a request; list-valued params keep their order."""
+    query = urlencode(params or {}, doseq=True)
+    return f"{method} {url}?{query}"
+
+
+def validators_from(headers: Any) -> Dict[str, str]:
+    """ETag/Last-Modified from a response, as the headers a revalidation sends."""
+    validators: Dict[str, str] = {}
+    etag = headers.get("ETag")
+    if etag:
+        validators["If-None-Match"] = etag
+    last_modified = headers.get("Last-Modified")
+    if last_modified:
+        validators["If-Modified-Since"] = last_modified
+    return validators
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import asdict
+from datetime import datetime, timedelta
+import hashlib
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Set
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.storage import Store
+
+from .api import AuthTokens, JSEApi
+from .const import CONF_EMAIL, CONF_PASSWORD, DOMAIN, STORAGE_VERSION
+
+if TYPE_CHECKING:
+    from .coordinator import JSECoordinator
+
+# How often the hub checks which metering points are due; checking makes no API calls.
+SCHEDULER_TICK = timedelta(minutes=1)
+
+
+class JSEHub:
+    """One login and one client per account, shared by all its metering point entries."""
+
+    def __init__(self, hass: HomeAssistant, email: str, password: str) -> None:
+        self.hass = hass
+        self.api = JSEApi(
+            email=email,
+            password=password,
+            session=async_get_clientsession(hass),
+        )
+        self._token_store: Store = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{_account_key(email)}.tokens"
+        )
+        self._saved_tokens: Optional[AuthTokens] = None
+        self._setup_lock = asyncio.Lock()
+        self._loaded = False
+        self._coordinators: Dict[str, JSECoordinator] = {}
+        self._refreshing: Set[str] = set()
+        self._unsub_tick: Optional[Callable[[], None]] = None
+
+    async def async_setup(self) -> None:
+        """Restore saved tokens once, so a restart refreshes instead of logging in."""
+        async with self._setup_lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            stored = await self._token_store.async_load()
+            if not isinstance(stored, dict):
+                return
+            try:
+                self.api.tokens = AuthTokens(**stored)
+            except TypeError:
+                return
+            self._saved_tokens = self.api.tokens
+
+    async def async_save_tokens(self) -> None:
+        tokens = self.api.tokens
+        if tokens is not None and tokens is not self._saved_tokens:
+            self._saved_tokens = tokens
+            await self._token_store.async_save(asdict(tokens))
+
+    def async_add_coordinator(self, entry_id: str, coordinator: JSECoordinator) -> None:
+        self._coordinators[entry_id] = coordinator
+        if self._unsub_tick is None:
+            self._unsub_tick = async_track_time_interval(
+                self.hass, self._async_tick, SCHEDULER_TICK
+            )
+
+    def async_remove_coordinator(self, entry_id: str) -> bool:
+        """Detach an entry; returns True when the hub has no entries left."""
+        self._coordinators.pop(entry_id, None)
+        if not self._coordinators and self._unsub_tick is not None:
+            self._unsub_tick()
+            self._unsub_tick = None
+        return not self._coordinators
+
+    async def _async_tick(self, now: datetime) -> None:
+        """Refresh the metering points whose scheduler says new data should be there."""
+        due = [
+            entry_id
+            for entry_id, coordinator in self._coordinators.items()
+            if entry_id not in self._refreshing
+            and coordinator.next_refresh <= now.timestamp()
+        ]
+        if due:
+            await self.async_refresh(due)
+
+    async def async_refresh(self, entry_ids: Optional[List[str]] = None) -> None:
+        """Refresh the given metering points (default: all) concurrently on the shared login."""
+        if entry_ids is None:
+            entry_ids = list(self._coordinators)
+        self._refreshing.update(entry_ids)
+        try:
+            await asyncio.gather(
+                *(
+                    self._coordinators[entry_id].async_refresh()
+                    for entry_id in entry_ids
+                    if entry_id in self._coordinators
+                )
+            )
+        finally:
+            self._refreshing.difference_update(entry_ids)
+        await self.async_save_tokens()
+
+
+async def async_get_hub(hass: HomeAssistant, config: Dict[str, Any]) -> JSEHub:
+    """Return the shared hub for the entry's account, creating it on first use."""
+    hubs: Dict[str, JSEHub] = hass.data.setdefault(DOMAIN, {}).setdefault("hubs", {})
+    key = _account_key(config[CONF_EMAIL])
+    hub = hubs.get(key)
+    if hub is None:
+        hub = hubs[key] = JSEHub(hass, config[CONF_EMAIL], config[CONF_PASSWORD])
+    await hub.async_setup()
+    return hub
+
+
+def async_release_hub(hass: HomeAssistant, hub: JSEHub, entry_id: str) -> None:
+    if hub.async_remove_coordinator(entry_id):
+        hubs: Dict[str, JSEHub] = hass.data.get(DOMAIN, {}).get("hubs", {})
+        key = _account_key(hub.api.email)
+        if hubs.get(key) is hub:
+            del hubs[key]
+
+
+def _account_key(email: str) -> str:
+    # Keep the address itself out of storage file names.
+    return hashlib.sha256(email.strip().lower().encode()).hexdigest()[:16]
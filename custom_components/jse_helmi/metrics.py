@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass, field
+import time
+from typing import Any, Deque, Dict, List, Optional
+
+# Latency samples kept per label for the percentiles.
+SAMPLE_SIZE = 500
+ACCOUNT = "account"
+
+
+@dataclass
+class RequestTrace:
+    """Filled in by _request_with_retry for one logical call."""
+
+    attempts: int = 0
+    size: int = 0
+
+
+@dataclass
+class _LabelStats:
+    latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=SAMPLE_SIZE))
+    requests: int = 0
+    errors: int = 0
+    retries: int = 0
+    not_modified: int = 0
+    bytes: int = 0
+    last_error: Optional[str] = None
+    last_error_at: Optional[float] = None
+
+
+class ApiMetrics:
+    """Per-call counters kept by JSEApi, labelled by metering point (or ``account``)."""
+
+    def __init__(self) -> None:
+        self._labels: Dict[str, _LabelStats] = {}
+        self.password_logins = 0
+        self.token_refreshes = 0
+        self.rejected_tokens = 0
+
+    def record(
+        self,
+        label: str,
+        seconds: float,
+        trace: RequestTrace,
+        error: Optional[BaseException] = None,
+        not_modified: bool = False,
+    ) -> None:
+        stats = self._labels.setdefault(label, _LabelStats())
+        stats.requests += 1
+        stats.latencies.append(seconds)
+        stats.retries += max(trace.attempts - 1, 0)
+        stats.bytes += trace.size
+        if not_modified:
+            stats.not_modified += 1
+        if error is not None:
+            stats.errors += 1
+            stats.last_error = f"{type(error).__name__}: {error}"
+            stats.last_error_at = time.time()
+
+    def snapshot(self, label: str) -> Dict[str, Any]:
+        stats = self._labels.get(label) or _LabelStats()
+        latencies = sorted(stats.latencies)
+        return {
+            "requests": stats.requests,
+            "errors": stats.errors,
+            "retries": stats.retries,
+            "not_modified": stats.not_modified,
+            "bytes": stats.bytes,
+            "latency_ms": {
+                "p50": _percentile_ms(latencies, 50),
+                "p90": _percentile_ms(latencies, 90),
+                "p95": _percentile_ms(latencies, 95),
+                "p99": _percentile_ms(latencies, 99),
+                "max": _percentile_ms(latencies, 100),
+                "samples": len(latencies),
+            },
+            "last_error": stats.last_error,
+            "last_error_at": stats.last_error_at,
+        }
+
+    def auth_snapshot(self) -> Dict[str, int]:
+        return {
+            "password_logins": self.password_logins,
+            "token_refreshes": self.token_refreshes,
+            "rejected_tokens": self.rejected_tokens,
+        }
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "auth": self.auth_snapshot(),
+            "labels": {label: self.snapshot(label) for label in sorted(self._labels)},
+        }
+
+
+def _percentile_ms(ordered: List[float], percentile: float) -> Optional[float]:
+    """Nearest-rank percentile of sorted seconds, in milliseconds."""
+    if not ordered:
+        return None
+    rank = max(1, -(-len(ordered) * percentile // 100))
+    return round(ordered[int(rank) - 1] * 1000, 1)
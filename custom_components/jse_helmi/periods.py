@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from homeassistant.util import dt as dt_util
+
+from .const import STATUS_FINAL
+from .rollup import DAY, MONTH, rollup
+from .series import ConsumptionSeries, HourlyRecord
+
+
+def day_start(day: date) -> int:
+    """Epoch of local midnight; days are 23 or 25 hours long across DST changes."""
+    return int(dt_util.start_of_local_day(day).timestamp())
+
+
+def next_month(day: date) -> date:
+    return (day.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+
+def months_before(day: date, count: int) -> date:
+    """First day of the month ``count`` months before ``day``'s month."""
+    index = day.year * 12 + day.month - 1 - count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def closed_days(first: date, today: date) -> List[date]:
+    return [first + timedelta(days=offset) for offset in range((today - first).days)]
+
+
+def closed_months(first: date, today: date) -> List[date]:
+    months = []
+    cursor = first.replace(day=1)
+    while cursor < today.replace(day=1):
+        months.append(cursor)
+        cursor = next_month(cursor)
+    return months
+
+
+def is_final(series: ConsumptionSeries, epoch: int) -> bool:
+    index = bisect_left(series.epochs, epoch)
+    return (
+        index < len(series)
+        and series.epochs[index] == epoch
+        and series.statuses[index] == STATUS_FINAL
+    )
+
+
+def first_open(series: ConsumptionSeries, starts: Iterable[int]) -> Optional[int]:
+    """First period start that the series does not hold as final yet."""
+    for start in starts:
+        if not is_final(series, start):
+            return start
+    return None
+
+
+def derive_days(hours: ConsumptionSeries, days: Sequence[date]) -> List[HourlyRecord]:
+    """Day totals for the given local days whose hours are all held and final."""
+    expected = {
+        day: (day_start(day + timedelta(days=1)) - day_start(day)) // 3600 for day in days
+    }
+    if not days:
+        return []
+    return _derive(hours, days[0], days[-1] + timedelta(days=1), DAY, expected)
+
+
+def derive_months(days: ConsumptionSeries, months: Sequence[date]) -> List[HourlyRecord]:
+    """Month totals for the given months whose days are all held and final."""
+    expected = {month: (next_month(month) - month).days for month in months}
+    if not months:
+        return []
+    return _derive(days, months[0], next_month(months[-1]), MONTH, expected)
+
+
+def _derive(
+    fine: ConsumptionSeries,
+    first: date,
+    end: date,
+    period: str,
+    expected: Dict[date, int],
+) -> List[HourlyRecord]:
+    """Roll the finer points in [first, end) up and keep the complete, final periods.
+
+    ``expected`` maps each wanted period to its point count; partially known
+    periods are skipped and left for a coarser API request.
+    """
+    lo = bisect_left(fine.epochs, day_start(first))
+    hi = bisect_left(fine.epochs, day_start(end))
+    epochs = fine.epochs[lo:hi]
+    offsets = [
+        int(dt_util.as_local(dt_util.utc_from_timestamp(epoch)).utcoffset().total_seconds())
+        for epoch in epochs
+    ]
+    records: List[HourlyRecord] = []
+    for total in rollup(epochs, fine.values[lo:hi], fine.statuses[lo:hi], offsets, period):
+        if total.final and expected.get(total.start) == total.points:
+            records.append((day_start(total.start), total.total, STATUS_FINAL))
+    return records
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import random
+import threading
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Callable, Optional
+
+# Kept free of I/O. client/retry.py and custom_components/jse_helmi/retry.py are
+# byte-identical copies (tests/test_shared_copies.py fails if they drift); edit both.
+
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Statuses that mean the backend itself is struggling; 429 is throttling, not an outage.
+BREAKER_STATUSES = frozenset({500, 502, 503, 504})
+# Rejected credentials: the caller refreshes or re-logs in once and repeats the call.
+UNAUTHORIZED_STATUSES = frozenset({401, 403})
+
+OK = "ok"
+NOT_MODIFIED = "not_modified"
+RETRY = "retry"
+UNAUTHORIZED = "unauthorized"
+FAIL = "fail"
+
+
+def classify_status(status: int) -> str:
+    """What a request loop does with an HTTP status; shared by the CLI and the integration."""
+    if status in UNAUTHORIZED_STATUSES:
+        return UNAUTHORIZED
+    if status in RETRYABLE_STATUSES:
+        return RETRY
+    if status >= 400:
+        return FAIL
+    if status == 304:
+        return NOT_MODIFIED
+    return OK
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised without touching the network while the circuit breaker is open."""
+
+
+@dataclass
+class RetryPolicy:
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+    # Wall-clock budget for one call, including all retries and waits.
+    deadline: float = 60.0
+    # Upper bound on honouring a server's Retry-After.
+    max_retry_after: float = 60.0
+    # Per-attempt timeout; shortened to whatever is left of the deadline.
+    attempt_timeout: float = 30.0
+
+    def backoff(
+        self,
+        attempt: int,
+        retry_after: Optional[float] = None,
+        rng: Callable[[], float] = random.random,
+    ) -> float:
+        """Full jitter: a uniform wait up to the exponential cap, unless the server said when."""
+        if retry_after is not None:
+            return min(max(retry_after, 0.0), self.max_retry_after)
+        return rng() * min(self.max_delay, self.base_delay * 2**attempt)
+
+    def next_delay(
+        self,
+        attempt: int,
+        elapsed: float,
+        retry_after: Optional[float] = None,
+        rng: Callable[[], float] = random.random,
+    ) -> Optional[float]:
+        """Seconds to wait before retrying ``attempt`` (0-based), or None to give up."""
+        if attempt + 1 >= self.max_attempts:
+            return None
+        delay = self.backoff(attempt, retry_after, rng)
+        if elapsed + delay >= self.deadline:
+            return None
+        return delay
+
+    def timeout(self, elapsed: float) -> float:
+        return max(0.1, min(self.attempt_timeout, self.deadline - elapsed))
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """Seconds from a Retry-After header in either delta-seconds or HTTP-date form."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when is None:
+        return None
+    return max(0.0, when.timestamp() - (time.time() if now is None else now))
+
+
+class CircuitBreaker:
+    """Fail fast after consecutive failures, then let one probe through after a cool-down.
+
+    Shared by every request of a client, so an outage costs one timeout per
+    ``reset_timeout`` instead of one per caller.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+    def before_request(self) -> bool:
+        """Raise CircuitOpenError unless a request may go out now.
+
+        Returns True when this request is the half-open probe; the caller must
+        then call release_probe() once it is done, whatever the outcome.
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return False
+            if self.state == self.OPEN:
+                remaining = self._opened_at + self.reset_timeout - self._clock()
+                if remaining > 0:
+                    raise CircuitOpenError(
+                        f"API circuit open after {self.failures} failures; "
+                        f"retrying in {remaining:.0f}s"
+                    )
+                self.state = self.HALF_OPEN
+                self._probing = False
+            if self._probing:
+                raise CircuitOpenError("API circuit half-open; waiting for the probe request")
+            self._probing = True
+            return True
+
+    def release_probe(self) -> None:
+        """Let another probe through if this one ended without recording an outcome.
+
+        Covers probes that raised something the caller does not treat as a
+        failure (a decoding error, cancellation), which would otherwise leave
+        the breaker rejecting every request.
+        """
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._probing = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = self._clock()
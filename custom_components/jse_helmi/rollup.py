@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, List, Sequence
+
+# Kept free of I/O and time zone lookups. client/rollup.py and
+# custom_components/jse_helmi/rollup.py are byte-identical copies
+# (tests/test_shared_copies.py fails if they drift); edit both.
+# Callers pass the UTC offset of every point.
+
+DAY = "day"
+WEEK = "week"
+MONTH = "month"
+PERIODS = (DAY, WEEK, MONTH)
+
+STATUS_FINAL = 150
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+@dataclass
+class Period:
+    """Total of the points that fall in one local day, ISO week or month."""
+
+    start: date
+    total: float
+    points: int
+    # Every point in the period was final; whether any are missing is up to the caller.
+    final: bool
+
+
+def local_days(epochs: Sequence[int], offsets: Sequence[int]) -> List[int]:
+    """Local day number (days since 1970-01-01 in local time) of each point."""
+    return [(epoch + offset) // 86400 for epoch, offset in zip(epochs, offsets)]
+
+
+def period_start(day: int, period: str) -> int:
+    """Day number on which the period containing local day ``day`` starts."""
+    if period == DAY:
+        return day
+    if period == WEEK:
+        # 1970-01-01 was a Thursday; ISO weeks start on Monday.
+        return day - (day + 3) % 7
+    if period == MONTH:
+        return day - date.fromordinal(day + _EPOCH_ORDINAL).day + 1
+    raise ValueError(f"Unknown period: {period}")
+
+
+def next_period_start(start: int, period: str) -> int:
+    """Day number on which the period after the one starting on ``start`` begins."""
+    if period == DAY:
+        return start + 1
+    if period == WEEK:
+        return start + 7
+    first = date.fromordinal(start + _EPOCH_ORDINAL)
+    following = date(first.year + first.month // 12, first.month % 12 + 1, 1)
+    return following.toordinal() - _EPOCH_ORDINAL
+
+
+def day_number(day: date) -> int:
+    return day.toordinal() - _EPOCH_ORDINAL
+
+
+def rollup(
+    epochs: Sequence[int],
+    values: Sequence[float],
+    statuses: Sequence[int],
+    offsets: Sequence[int],
+    period: str,
+) -> List[Period]:
+    """Grouped sums over points sorted by epoch, in one pass.
+
+    Points are assigned to local days by their own offset, so DST days
+    simply hold 23 or 25 hours. Sorted input keeps every group contiguous,
+    so group ends are found by bisection and each group is summed as one
+    slice.
+    """
+    if not epochs:
+        return []
+    # Map each distinct day once; consecutive points mostly share a day.
+    starts: Dict[int, int] = {}
+    keys = []
+    for day in local_days(epochs, offsets):
+        key = starts.get(day)
+        if key is None:
+            key = starts[day] = period_start(day, period)
+        keys.append(key)
+    periods: List[Period] = []
+    lo = 0
+    size = len(keys)
+    while lo < size:
+        key = keys[lo]
+        hi = bisect_right(keys, key, lo)
+        periods.append(
+            Period(
+                start=date.fromordinal(key + _EPOCH_ORDINAL),
+                total=round(sum(values[lo:hi]), 6),
+                points=hi - lo,
+                final=all(status == STATUS_FINAL for status in statuses[lo:hi]),
+            )
+        )
+        lo = hi
+    return periods
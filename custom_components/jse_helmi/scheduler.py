@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from statistics import median
+from typing import Iterable, List, Optional
+
+# Lag samples (seconds from the end of an hour until it was final) kept per metering point.
+LAG_SAMPLES = 24
+# When a poll finds the data already there, assume it appeared this much earlier.
+EXPLORE_SECONDS = 10 * 60
+# Backoff while data is later than expected.
+MIN_BACKOFF_SECONDS = 5 * 60
+MAX_BACKOFF_SECONDS = 3 * 3600
+# Poll at least this often even when nothing is expected, for prices and provisional hours.
+MAX_INTERVAL_SECONDS = 6 * 3600
+# Longer lag samples are clamped to this; next-day publishing lags 24-36 hours.
+MAX_LAG_SECONDS = 48 * 3600
+
+
+class PublishScheduler:
+    """Learns when finalized hours appear for one metering point and picks the next poll.
+
+    The expected publish lag is the median of recent samples. A sample is
+    bracketed by the last poll that missed the hour and the poll that found
+    it; without a miss the hour was already there, so the sample is pulled
+    earlier to keep probing for a shorter lag.
+    """
+
+    def __init__(self, default_lag: float, lags: Optional[Iterable[float]] = None) -> None:
+        self.default_lag = default_lag
+        self.lags: List[float] = [float(lag) for lag in (lags or [])][-LAG_SAMPLES:]
+        self.misses = 0
+        self._last_miss: Optional[float] = None
+
+    @property
+    def expected_lag(self) -> float:
+        return median(self.lags) if self.lags else self.default_lag
+
+    def observe(
+        self, now: float, final_before: Optional[int], final_after: Optional[int]
+    ) -> bool:
+        """Record a successful poll; returns True when new final hours appeared."""
+        if final_after is None or (final_before is not None and final_after <= final_before):
+            self.misses += 1
+            self._last_miss = now
+            return False
+        hour_end = final_after + 3600
+        if final_before is not None and self._last_miss is not None:
+            sample = ((self._last_miss + now) / 2) - hour_end
+        else:
+            sample = now - hour_end - EXPLORE_SECONDS
+        # The first poll with nothing stored says nothing about the lag. Longer
+        # outages are clamped rather than dropped, so next-day lags are learned.
+        if final_before is not None:
+            self.lags.append(min(max(sample, 0.0), MAX_LAG_SECONDS))
+            del self.lags[:-LAG_SAMPLES]
+        self.misses = 0
+        self._last_miss = None
+        return True
+
+    def failed(self, now: float) -> None:
+        """A poll that errored counts as a miss for backoff purposes."""
+        self.misses += 1
+        self._last_miss = now
+
+    def next_poll(self, now: float, last_final: Optional[int]) -> float:
+        """Epoch seconds of the next poll."""
+        if last_final is None:
+            expected = now
+        else:
+            # The next missing hour ends an hour after the last final one.
+            expected = last_final + 2 * 3600 + self.expected_lag
+        if self.misses and expected <= now:
+            backoff = MIN_BACKOFF_SECONDS * 2 ** (self.misses - 1)
+            return now + min(backoff, MAX_BACKOFF_SECONDS)
+        if expected <= now:
+            return now + MIN_BACKOFF_SECONDS
+        return min(expected, now + MAX_INTERVAL_SECONDS)
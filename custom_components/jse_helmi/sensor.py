@@ -1,18 +1,22 @@
 from __future__ import annotations
 
+from bisect import bisect_left, bisect_right
 from datetime import date, datetime, time, timedelta
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
 from homeassistant.components.sensor import SensorEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EntityCategory
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.restore_state import RestoreEntity
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.util import dt as dt_util
 
-from .const import DOMAIN
+from .const import DOMAIN, STATUS_FINAL
 from .coordinator import ConsumptionData, JSECoordinator
+from .periods import day_start
+from .series import ConsumptionSeries
 
 
 async def async_setup_entry(
@@ -22,13 +26,36 @@ async def async_setup_entry(
     async_add_entities(
         [
             JSEConsumptionSensor(coordinator, entry),
+            JSECostSensor(coordinator, entry),
             JSEHourlyTotalSensor(coordinator, entry),
             JSEDailyTotalSensor(coordinator, entry),
+            JSEApiLatencySensor(coordinator, entry),
+            JSEApiErrorsSensor(coordinator, entry),
+            JSEReloginsSensor(coordinator, entry),
         ]
     )
 
 
-class JSEConsumptionSensor(CoordinatorEntity[JSECoordinator], SensorEntity):
+class _WriteOnChangeMixin:
+    """Skip state writes when value, availability and attributes are unchanged.
+
+    Every write lands in the recorder, so an identical state each hour is pure
+    database growth.
+    """
+
+    _written_state: Optional[Tuple[Any, ...]] = None
+
+    def _async_write_if_changed(self) -> None:
+        state = (self.available, self.native_value, self.extra_state_attributes)
+        if state == self._written_state:
+            return
+        self._written_state = state
+        self.async_write_ha_state()
+
+
+class JSEConsumptionSensor(
+    _WriteOnChangeMixin, CoordinatorEntity[JSECoordinator], SensorEntity
+):
     _attr_name = "JSE Helmi Consumption (Hourly)"
     _attr_native_unit_of_measurement = "kWh"
     _attr_state_class = "measurement"
@@ -50,47 +77,76 @@ class JSEConsumptionSensor(CoordinatorEntity[JSECoordinator], SensorEntity):
         data: ConsumptionData = self.coordinator.data
         if not data.series:
             return None
-        return data.series[-1].value
+        return data.series.values[-1]
 
     @property
     def available(self) -> bool:
         data: ConsumptionData = self.coordinator.data
-        if not data.series:
-            return False
-        last_ts = data.series[-1].timestamp
-        parsed = dt_util.parse_datetime(last_ts) if last_ts else None
-        if not parsed:
+        last_epoch = data.series.last_epoch
+        if last_epoch is None:
             return False
-        age = dt_util.as_local(dt_util.now()) - dt_util.as_local(parsed)
-        return age <= timedelta(hours=self.coordinator.stale_hours)
+        age = dt_util.utcnow().timestamp() - last_epoch
+        return age <= self.coordinator.stale_hours * 3600
 
     @property
     def extra_state_attributes(self) -> Dict[str, Any]:
         data: ConsumptionData = self.coordinator.data
-        last_ts = data.series[-1].timestamp if data.series else None
-        last_dt = dt_util.parse_datetime(last_ts) if last_ts else None
-        stale_minutes = None
-        if last_dt:
-            age = dt_util.as_local(dt_util.now()) - dt_util.as_local(last_dt)
-            stale_minutes = int(age.total_seconds() // 60)
+        last = data.series[-1] if data.series else None
+        # Only data-derived values: a wall-clock age here would defeat _async_write_if_changed.
+        # Staleness follows from last_timestamp and the entity's availability.
         return {
             "customer_id": data.customer_id,
             "metering_point_id": data.metering_point_id,
             "unit": data.unit,
-            "last_timestamp": last_ts,
-            "stale_minutes": stale_minutes,
-            "series": [
-                {
-                    "ts": point.timestamp,
-                    "value": point.value,
-                    "status": getattr(point, "status", None),
-                }
-                for point in data.series
-            ],
+            "last_timestamp": last.timestamp if last else None,
         }
 
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        self._async_write_if_changed()
+
+
+class JSECostSensor(_WriteOnChangeMixin, CoordinatorEntity[JSECoordinator], SensorEntity):
+    _attr_name = "JSE Helmi Cost (Hourly)"
+    _attr_native_unit_of_measurement = "EUR"
+    _attr_state_class = "measurement"
+
+    def __init__(self, coordinator: JSECoordinator, entry: ConfigEntry) -> None:
+        super().__init__(coordinator)
+        self._attr_unique_id = (
+            f"jse_helmi_cost_hourly_{coordinator.data.metering_point_id}"
+        )
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, entry.entry_id)},
+            name=entry.title or "JSE Helmi",
+            manufacturer="JSE",
+            model=coordinator.data.metering_point_id,
+        )
 
-class JSEDailyTotalSensor(CoordinatorEntity[JSECoordinator], RestoreEntity, SensorEntity):
+    @property
+    def native_value(self) -> Optional[float]:
+        data: ConsumptionData = self.coordinator.data
+        if not data.series:
+            return None
+        return data.series[-1].cost
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any]:
+        data: ConsumptionData = self.coordinator.data
+        last = data.series[-1] if data.series else None
+        return {
+            "last_timestamp": last.timestamp if last else None,
+            "price": last.price if last else None,
+        }
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        self._async_write_if_changed()
+
+
+class JSEDailyTotalSensor(
+    _WriteOnChangeMixin, CoordinatorEntity[JSECoordinator], RestoreEntity, SensorEntity
+):
     _attr_name = "JSE Helmi Consumption (Daily Total)"
     _attr_native_unit_of_measurement = "kWh"
     _attr_device_class = "energy"
@@ -147,29 +203,34 @@ class JSEDailyTotalSensor(CoordinatorEntity[JSECoordinator], RestoreEntity, Sens
         )
         if now_local < cutoff:
             # Before cutoff, keep the previous total.
-            self.async_write_ha_state()
+            self._async_write_if_changed()
             return
 
         target_day = (now_local - timedelta(days=1)).date()
-        total = None
-        for point in getattr(data, "daily_series", []):
-            parsed = dt_util.parse_datetime(point.timestamp) if point.timestamp else None
-            if not parsed:
-                continue
-            local_dt = dt_util.as_local(parsed)
-            if local_dt.date() == target_day:
-                total = float(point.value)
+        # Add every final day after the last one counted, so a day that finalized
+        # late is not skipped; on first run only yesterday is taken. Stop at the
+        # first day that is missing or not final and wait for it.
+        day = target_day if self._last_day is None else self._last_day + timedelta(days=1)
+        daily = data.daily_series
+        index = bisect_left(daily.epochs, day_start(day))
+        while day <= target_day:
+            if (
+                index >= len(daily)
+                or daily.epochs[index] != day_start(day)
+                or daily.statuses[index] != STATUS_FINAL
+            ):
                 break
+            self._total += daily.values[index]
+            self._last_day = day
+            day += timedelta(days=1)
+            index += 1
 
-        if self._last_day != target_day and total is not None:
-            # New day, increment the running total.
-            self._total += total
-            self._last_day = target_day
-
-        self.async_write_ha_state()
+        self._async_write_if_changed()
 
 
-class JSEHourlyTotalSensor(CoordinatorEntity[JSECoordinator], RestoreEntity, SensorEntity):
+class JSEHourlyTotalSensor(
+    _WriteOnChangeMixin, CoordinatorEntity[JSECoordinator], RestoreEntity, SensorEntity
+):
     _attr_name = "JSE Helmi Consumption (Hourly Total)"
     _attr_native_unit_of_measurement = "kWh"
     _attr_device_class = "energy"
@@ -188,6 +249,7 @@ class JSEHourlyTotalSensor(CoordinatorEntity[JSECoordinator], RestoreEntity, Sen
         )
         self._total = 0.0
         self._last_ts: Optional[str] = None
+        self._last_epoch: Optional[int] = None
         self._seed_ts: Optional[str] = None
 
     @property
@@ -210,60 +272,169 @@ class JSEHourlyTotalSensor(CoordinatorEntity[JSECoordinator], RestoreEntity, Sen
             self._seed_from_latest_if_needed()
             return
         self._last_ts = last_state.attributes.get("last_timestamp")
+        self._last_epoch = _epoch_from_iso(self._last_ts)
         self._seed_ts = last_state.attributes.get("seeded_ts")
         if self._last_ts is None:
             self._seed_from_latest_if_needed()
-        self.async_write_ha_state()
+        self._async_write_if_changed()
 
     def _seed_from_latest_if_needed(self) -> None:
         data: ConsumptionData = self.coordinator.data
-        if not data.series:
+        index = _latest_final_index(data.series)
+        if index is None:
             return
-        latest_point = data.series[-1]
-        if latest_point.value is not None and self._seed_ts is None:
-            self._total += float(latest_point.value)
+        latest_point = data.series[index]
+        if self._seed_ts is None:
+            self._total += latest_point.value
         self._last_ts = latest_point.timestamp
+        self._last_epoch = latest_point.epoch
         self._seed_ts = latest_point.timestamp
 
     def _handle_coordinator_update(self) -> None:
-        data: ConsumptionData = self.coordinator.data
-        points = []
-        for point in data.series:
-            parsed = dt_util.parse_datetime(point.timestamp) if point.timestamp else None
-            if parsed:
-                points.append((parsed, point))
-
-        points.sort(key=lambda item: item[0])
-
-        last_dt = dt_util.parse_datetime(self._last_ts) if self._last_ts else None
-        if points:
-            latest_point = points[-1][1]
-            if last_dt is None:
-                # Initialize with the latest point (single hour) without backfilling history.
-                if latest_point.value is not None:
-                    self._total += float(latest_point.value)
+        # Only final hours are counted: a total_increasing sensor cannot take back a
+        # provisional value that is later revised down.
+        series = self.coordinator.data.series
+        index = _latest_final_index(series)
+        if index is not None:
+            latest_point = series[index]
+            if self._last_epoch is None:
+                # Initialize with the latest final hour without backfilling history.
+                self._total += latest_point.value
                 self._last_ts = latest_point.timestamp
-                self._seed_ts = latest_point.timestamp
-                self.async_write_ha_state()
+                self._last_epoch = latest_point.epoch
+                self._seed_ts = self._last_ts
+                self._async_write_if_changed()
                 return
             if (
                 self._total == 0.0
-                and self._last_ts == latest_point.timestamp
-                and self._seed_ts != latest_point.timestamp
+                and self._last_epoch == latest_point.epoch
+                and _epoch_from_iso(self._seed_ts) != latest_point.epoch
             ):
                 # Seed once if we restored a zero total with a known last timestamp.
-                if latest_point.value is not None:
-                    self._total += float(latest_point.value)
+                self._total += latest_point.value
                 self._seed_ts = latest_point.timestamp
-                self.async_write_ha_state()
+                self._async_write_if_changed()
                 return
 
-        for parsed, point in points:
-            if last_dt and parsed <= last_dt:
-                continue
-            if point.value is not None:
-                self._total += float(point.value)
-            self._last_ts = point.timestamp
-            last_dt = parsed
+        if self._last_epoch is not None:
+            # Epochs are sorted; count final hours after the last one counted and stop
+            # at the first provisional hour, which is picked up once it finalizes.
+            start = bisect_right(series.epochs, self._last_epoch)
+            stop = start
+            statuses = series.statuses
+            while stop < len(series) and statuses[stop] == STATUS_FINAL:
+                stop += 1
+            if stop > start:
+                self._total += sum(series.values[start:stop])
+                self._last_epoch = series.epochs[stop - 1]
+                self._last_ts = series[stop - 1].timestamp
 
-        self.async_write_ha_state()
+        self._async_write_if_changed()
+
+
+class _JSEDiagnosticSensor(
+    _WriteOnChangeMixin, CoordinatorEntity[JSECoordinator], SensorEntity
+):
+    """Request metrics from JSEApi; stays available when updates fail, when it matters most."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _key = ""
+
+    def __init__(self, coordinator: JSECoordinator, entry: ConfigEntry) -> None:
+        super().__init__(coordinator)
+        self._attr_unique_id = f"jse_helmi_{self._key}_{coordinator.data.metering_point_id}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, entry.entry_id)},
+            name=entry.title or "JSE Helmi",
+            manufacturer="JSE",
+            model=coordinator.data.metering_point_id,
+        )
+
+    @property
+    def available(self) -> bool:
+        return True
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        self._async_write_if_changed()
+
+
+class JSEApiLatencySensor(_JSEDiagnosticSensor):
+    _attr_name = "JSE Helmi API Latency (p95)"
+    _attr_native_unit_of_measurement = "ms"
+    _attr_state_class = "measurement"
+    _key = "api_latency"
+
+    @property
+    def native_value(self) -> Optional[float]:
+        return self.coordinator.api_metrics()["latency_ms"]["p95"]
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any]:
+        metrics = self.coordinator.api_metrics()
+        latency = metrics["latency_ms"]
+        return {
+            "p50_ms": latency["p50"],
+            "p90_ms": latency["p90"],
+            "p99_ms": latency["p99"],
+            "max_ms": latency["max"],
+            "samples": latency["samples"],
+            "requests": metrics["requests"],
+            "not_modified": metrics["not_modified"],
+            "bytes": metrics["bytes"],
+        }
+
+
+class JSEApiErrorsSensor(_JSEDiagnosticSensor):
+    _attr_name = "JSE Helmi API Errors"
+    _attr_state_class = "total_increasing"
+    _key = "api_errors"
+
+    @property
+    def native_value(self) -> int:
+        return self.coordinator.api_metrics()["errors"]
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any]:
+        metrics = self.coordinator.api_metrics()
+        last_error_at = metrics["last_error_at"]
+        return {
+            "retries": metrics["retries"],
+            "last_error": metrics["last_error"],
+            "last_error_at": (
+                dt_util.utc_from_timestamp(last_error_at).isoformat() if last_error_at else None
+            ),
+        }
+
+
+class JSEReloginsSensor(_JSEDiagnosticSensor):
+    """Auth churn for the account; shared by every metering point of the same login."""
+
+    _attr_name = "JSE Helmi Re-logins"
+    _attr_state_class = "total_increasing"
+    _key = "relogins"
+
+    @property
+    def native_value(self) -> int:
+        return self.coordinator.api_metrics()["auth"]["password_logins"]
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any]:
+        auth = self.coordinator.api_metrics()["auth"]
+        return {
+            "token_refreshes": auth["token_refreshes"],
+            "rejected_tokens": auth["rejected_tokens"],
+        }
+
+
+def _latest_final_index(series: ConsumptionSeries) -> Optional[int]:
+    statuses = series.statuses
+    for index in range(len(statuses) - 1, -1, -1):
+        if statuses[index] == STATUS_FINAL:
+            return index
+    return None
+
+
+def _epoch_from_iso(value: Optional[str]) -> Optional[int]:
+    parsed = dt_util.parse_datetime(value) if value else None
+    return int(parsed.timestamp()) if parsed else None
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left
+import math
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from homeassistant.util import dt as dt_util
+
+HourlyRecord = Tuple[int, float, int]
+
+
+class ConsumptionPoint:
+    """Read-only view of one hour in a ConsumptionSeries."""
+
+    __slots__ = ("_series", "_index")
+
+    def __init__(self, series: ConsumptionSeries, index: int) -> None:
+        self._series = series
+        self._index = index
+
+    @property
+    def epoch(self) -> int:
+        return self._series.epochs[self._index]
+
+    @property
+    def value(self) -> float:
+        return self._series.values[self._index]
+
+    @property
+    def status(self) -> int:
+        return self._series.statuses[self._index]
+
+    @property
+    def price(self) -> Optional[float]:
+        price = self._series.prices[self._index]
+        return None if math.isnan(price) else price
+
+    @property
+    def cost(self) -> Optional[float]:
+        price = self.price
+        return None if price is None else round(self.value * price, 6)
+
+    @property
+    def timestamp(self) -> str:
+        """Local ISO timestamp, formatted only when someone asks for it."""
+        return dt_util.as_local(dt_util.utc_from_timestamp(self.epoch)).isoformat()
+
+
+class ConsumptionSeries:
+    """Hourly points as parallel arrays, sorted by UTC epoch seconds.
+
+    Timestamps are parsed once at ingest; readers compare integers instead of
+    re-parsing ISO strings, and a month of hours costs a few dozen kilobytes.
+    """
+
+    __slots__ = ("epochs", "values", "statuses", "prices")
+
+    def __init__(self) -> None:
+        self.epochs = array("q")
+        self.values = array("d")
+        self.statuses = array("H")
+        # NaN marks hours without a known price.
+        self.prices = array("d")
+
+    def __len__(self) -> int:
+        return len(self.epochs)
+
+    def __getitem__(self, index: int) -> ConsumptionPoint:
+        if index < 0:
+            index += len(self.epochs)
+        if not 0 <= index < len(self.epochs):
+            raise IndexError("series index out of range")
+        return ConsumptionPoint(self, index)
+
+    def __iter__(self) -> Iterator[ConsumptionPoint]:
+        for index in range(len(self.epochs)):
+            yield ConsumptionPoint(self, index)
+
+    @property
+    def last_epoch(self) -> Optional[int]:
+        return self.epochs[-1] if self.epochs else None
+
+    def upsert(self, epoch: int, value: float, status: int) -> bool:
+        """Insert or update one hour; returns True if anything changed."""
+        index = bisect_left(self.epochs, epoch)
+        if index < len(self.epochs) and self.epochs[index] == epoch:
+            if self.values[index] == value and self.statuses[index] == status:
+                return False
+            self.values[index] = value
+            self.statuses[index] = status
+            return True
+        self.epochs.insert(index, epoch)
+        self.values.insert(index, value)
+        self.statuses.insert(index, status)
+        self.prices.insert(index, math.nan)
+        return True
+
+    def apply_prices(self, prices: Iterable[Tuple[int, float]]) -> None:
+        """Merge-join sorted (epoch, price) pairs onto the hours we hold."""
+        index = 0
+        size = len(self.epochs)
+        for epoch, price in prices:
+            while index < size and self.epochs[index] < epoch:
+                index += 1
+            if index < size and self.epochs[index] == epoch:
+                self.prices[index] = price
+
+    def drop_before(self, epoch: int) -> None:
+        cut = bisect_left(self.epochs, epoch)
+        if cut:
+            del self.epochs[:cut]
+            del self.values[:cut]
+            del self.statuses[:cut]
+            del self.prices[:cut]
+
+    def since(self, epoch: int) -> ConsumptionSeries:
+        """Copy of the hours starting at or after ``epoch``."""
+        cut = bisect_left(self.epochs, epoch)
+        window = ConsumptionSeries()
+        window.epochs = self.epochs[cut:]
+        window.values = self.values[cut:]
+        window.statuses = self.statuses[cut:]
+        window.prices = self.prices[cut:]
+        return window
+
+    def records(self) -> List[HourlyRecord]:
+        return list(zip(self.epochs, self.values, self.statuses))
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timedelta
+import logging
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import (
+    async_add_external_statistics,
+    get_last_statistics,
+    statistics_during_period,
+)
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .const import BACKFILL_DAYS, DOMAIN
+from .series import ConsumptionSeries, HourlyRecord
+
+_LOGGER = logging.getLogger(__name__)
+
+# Rows handed to the recorder per import call.
+STATISTICS_BATCH_HOURS = 24 * 31
+# How far back to look for the sum preceding a revised hour; widened on a miss.
+SUM_LOOKBACKS = (timedelta(days=2), timedelta(days=BACKFILL_DAYS))
+
+HistoryFetcher = Callable[[datetime, datetime], Awaitable[List[HourlyRecord]]]
+
+
+class ConsumptionStatistics:
+    """Writes hourly consumption as external long-term statistics.
+
+    The Energy dashboard reads these directly, so history is backfilled once
+    (in the background, see async_prepare) and revised hours are rewritten in
+    place instead of being added to a running total.
+    """
+
+    def __init__(self, hass: HomeAssistant, metering_point_id: str) -> None:
+        self.hass = hass
+        self.statistic_id = f"{DOMAIN}:consumption_{metering_point_id.lower()}"
+        self._metadata = StatisticMetaData(
+            has_mean=False,
+            has_sum=True,
+            name=f"JSE Helmi consumption {metering_point_id}",
+            source=DOMAIN,
+            statistic_id=self.statistic_id,
+            unit_of_measurement="kWh",
+        )
+        # Set once history exists; updates before that are deferred to async_prepare.
+        self._ready = False
+        self._pending_from: Optional[int] = None
+        # Running sums this instance queued, by hour. The recorder writes imports
+        # asynchronously, so a read-back could miss rows queued moments ago.
+        self._sum_epochs = array("q")
+        self._sums = array("d")
+
+    async def async_prepare(
+        self, series: ConsumptionSeries, fetch_history: HistoryFetcher
+    ) -> None:
+        """Backfill history on first run; meant to run as a background task.
+
+        ``series`` is the live hourly series, so hours that arrived while
+        history was fetched are part of the import.
+        """
+        if self._ready:
+            return
+        if await self._async_last_sum_before(None) is None:
+            await self._async_backfill(series, fetch_history)
+        elif self._pending_from is not None:
+            await self._async_import_from(series, self._pending_from)
+        self._pending_from = None
+        self._ready = True
+
+    async def async_update(self, series: ConsumptionSeries, changed_from: Optional[int]) -> None:
+        """Import hours from ``changed_from`` on."""
+        if changed_from is None:
+            return
+        if not self._ready:
+            if self._pending_from is None or changed_from < self._pending_from:
+                self._pending_from = changed_from
+            return
+        await self._async_import_from(series, changed_from)
+        if series:
+            self._forget_before(series.epochs[0])
+
+    async def _async_import_from(self, series: ConsumptionSeries, changed_from: int) -> None:
+        base = self._imported_sum_before(changed_from)
+        if base is None:
+            base = await self._async_last_sum_before(changed_from)
+        self._import(series.since(changed_from).records(), base or 0.0)
+
+    async def _async_backfill(
+        self, series: ConsumptionSeries, fetch_history: HistoryFetcher
+    ) -> None:
+        first_epoch = series.epochs[0] if series else None
+        end = (
+            dt_util.utc_from_timestamp(first_epoch)
+            if first_epoch is not None
+            else dt_util.utcnow().replace(minute=0, second=0, microsecond=0)
+        )
+        start = end - timedelta(days=BACKFILL_DAYS)
+        history = await fetch_history(start, end)
+        history.sort()
+        _LOGGER.debug(
+            "Backfilling %s with %d historical and %d recent hours",
+            self.statistic_id,
+            len(history),
+            len(series),
+        )
+        self._import(history + series.records(), 0.0)
+
+    def _import(self, records: Iterable[HourlyRecord], base_sum: float) -> None:
+        """Queue cumulative rows in batches; rows with an existing start are replaced."""
+        total = base_sum
+        batch: List[StatisticData] = []
+        for epoch, value, _ in records:
+            total += value
+            self._remember(epoch, total)
+            batch.append(
+                StatisticData(
+                    start=dt_util.utc_from_timestamp(epoch), state=value, sum=total
+                )
+            )
+            if len(batch) >= STATISTICS_BATCH_HOURS:
+                async_add_external_statistics(self.hass, self._metadata, batch)
+                batch = []
+        if batch:
+            async_add_external_statistics(self.hass, self._metadata, batch)
+
+    def _remember(self, epoch: int, total: float) -> None:
+        # Imports run in epoch order from the first changed hour, so later sums are stale.
+        cut = bisect_left(self._sum_epochs, epoch)
+        del self._sum_epochs[cut:]
+        del self._sums[cut:]
+        self._sum_epochs.append(epoch)
+        self._sums.append(total)
+
+    def _imported_sum_before(self, epoch: int) -> Optional[float]:
+        index = bisect_left(self._sum_epochs, epoch)
+        return self._sums[index - 1] if index else None
+
+    def _forget_before(self, epoch: int) -> None:
+        """Drop sums older than the one preceding ``epoch``; revisions never reach them."""
+        cut = bisect_left(self._sum_epochs, epoch) - 1
+        if cut > 0:
+            del self._sum_epochs[:cut]
+            del self._sums[:cut]
+
+    async def _async_last_sum_before(self, epoch: Optional[int]) -> Optional[float]:
+        recorder = get_instance(self.hass)
+        if epoch is None:
+            last = await recorder.async_add_executor_job(
+                get_last_statistics, self.hass, 1, self.statistic_id, True, {"sum"}
+            )
+            rows = last.get(self.statistic_id) or []
+            return _row_sum(rows[-1]) if rows else None
+        end = dt_util.utc_from_timestamp(epoch)
+        for lookback in SUM_LOOKBACKS:
+            rows_by_id: Dict[str, List[Dict[str, Any]]] = (
+                await recorder.async_add_executor_job(
+                    statistics_during_period,
+                    self.hass,
+                    end - lookback,
+                    end,
+                    {self.statistic_id},
+                    "hour",
+                    None,
+                    {"sum"},
+                )
+            )
+            rows = rows_by_id.get(self.statistic_id) or []
+            if rows:
+                return _row_sum(rows[-1])
+        return None
+
+
+def _row_sum(row: Dict[str, Any]) -> Optional[float]:
+    value = row.get("sum")
+    return float(value) if value is not None else None
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import math
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, STATUS_FINAL, STORAGE_VERSION
+from .series import ConsumptionSeries, HourlyRecord
+
+# Coalesce writes; points only change once an hour.
+SAVE_DELAY_SECONDS = 30
+# Provisional runs this close together are re-requested as one range.
+REVISION_MERGE_GAP_HOURS = 3
+
+
+class ConsumptionStore:
+    """Points already received for one metering point, keyed by UTC epoch.
+
+    Days and months sit beside the hours, keyed by the epoch of their local
+    start; a final one never changes and is not requested again.
+    """
+
+    def __init__(self, hass: HomeAssistant, metering_point_id: str) -> None:
+        self._store: Store = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{metering_point_id}.consumption"
+        )
+        self.series = ConsumptionSeries()
+        self.days = ConsumptionSeries()
+        self.months = ConsumptionSeries()
+        self.unit = ""
+        # Publish lag samples learned by the refresh scheduler.
+        self.lags: List[float] = []
+
+    async def async_load(self) -> None:
+        stored = await self._store.async_load()
+        if not isinstance(stored, dict):
+            return
+        self.unit = stored.get("unit") or ""
+        self.lags = [float(lag) for lag in stored.get("lags") or [] if isinstance(lag, (int, float))]
+        for key, series in (("hour", self.series), ("day", self.days), ("month", self.months)):
+            for record in stored.get(key) or []:
+                try:
+                    epoch, value, status = record
+                except (TypeError, ValueError):
+                    continue
+                series.upsert(int(epoch), float(value), int(status))
+        prices = []
+        for record in stored.get("price") or []:
+            try:
+                epoch, price = record
+            except (TypeError, ValueError):
+                continue
+            prices.append((int(epoch), float(price)))
+        self.series.apply_prices(sorted(prices))
+
+    def merge(
+        self, records: Iterable[HourlyRecord], series: Optional[ConsumptionSeries] = None
+    ) -> Optional[int]:
+        """Insert or update points (hours by default); returns the earliest epoch that changed."""
+        target = self.series if series is None else series
+        changed_from: Optional[int] = None
+        for epoch, value, status in records:
+            if target.upsert(epoch, value, status):
+                if changed_from is None or epoch < changed_from:
+                    changed_from = epoch
+        return changed_from
+
+    def merge_prices(self, records: Iterable[Tuple[int, float]]) -> None:
+        self.series.apply_prices(sorted(records))
+
+    def prune(self, before_epoch: int) -> None:
+        self.series.drop_before(before_epoch)
+
+    def prune_periods(self, days_before: int, months_before: int) -> None:
+        self.days.drop_before(days_before)
+        self.months.drop_before(months_before)
+
+    def last_final_epoch(self) -> Optional[int]:
+        statuses = self.series.statuses
+        for index in range(len(statuses) - 1, -1, -1):
+            if statuses[index] == STATUS_FINAL:
+                return self.series.epochs[index]
+        return None
+
+    def provisional_ranges(self, since_epoch: int) -> List[Tuple[int, int]]:
+        """[start, end) epoch ranges covering held hours that are not final yet."""
+        series = self.series
+        return _ranges(
+            epoch
+            for epoch, status in zip(series.epochs, series.statuses)
+            if epoch >= since_epoch and status != STATUS_FINAL
+        )
+
+    def unpriced_ranges(self, since_epoch: int) -> List[Tuple[int, int]]:
+        """[start, end) epoch ranges covering held hours without a price."""
+        series = self.series
+        return _ranges(
+            epoch
+            for epoch, price in zip(series.epochs, series.prices)
+            if epoch >= since_epoch and math.isnan(price)
+        )
+
+    def since(self, start_epoch: int) -> ConsumptionSeries:
+        return self.series.since(start_epoch)
+
+    def async_schedule_save(self) -> None:
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY_SECONDS)
+
+    def _data_to_save(self) -> Dict[str, Any]:
+        series = self.series
+        return {
+            "unit": self.unit,
+            "hour": [list(record) for record in series.records()],
+            "day": [list(record) for record in self.days.records()],
+            "month": [list(record) for record in self.months.records()],
+            "price": [
+                [epoch, price]
+                for epoch, price in zip(series.epochs, series.prices)
+                if not math.isnan(price)
+            ],
+            "lags": list(self.lags),
+        }
+
+
+def _ranges(epochs: Iterable[int]) -> List[Tuple[int, int]]:
+    """Join sorted hour epochs into ranges, bridging gaps of up to REVISION_MERGE_GAP_HOURS."""
+    ranges: List[Tuple[int, int]] = []
+    for epoch in epochs:
+        if ranges and epoch - ranges[-1][1] <= REVISION_MERGE_GAP_HOURS * 3600:
+            ranges[-1] = (ranges[-1][0], epoch + 3600)
+        else:
+            ranges.append((epoch, epoch + 3600))
+    return ranges
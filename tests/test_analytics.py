@@ -0,0 +1,75 @@
+import json
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from datetime import datetime
+from io import StringIO
+
+import client.cli as cli
+from client.analytics import analyze
+from client.store import HistoryStore
+from client.timeutil import HELSINKI, helsinki_offsets
+
+
+class TestAnalytics(unittest.TestCase):
+    def test_peaks_percentiles_profiles_and_curve(self) -> None:
+        # Monday 2025-01-06, one value per local hour: 0, 1, ..., 47.
+        start = int(datetime(2025, 1, 6, tzinfo=HELSINKI).timestamp())
+        epochs = [start + hour * 3600 for hour in range(48)]
+        values = [float(hour) for hour in range(48)]
+        report = analyze(
+            epochs, values, helsinki_offsets(epochs), top=2, percentiles=[50, 100], curve_points=3
+        )
+        self.assertEqual(report["hours"], 48)
+        self.assertEqual(
+            report["peaks"],
+            [
+                {"ts": "2025-01-07T23:00:00+02:00", "value": 47.0},
+                {"ts": "2025-01-07T22:00:00+02:00", "value": 46.0},
+            ],
+        )
+        self.assertEqual(report["percentiles"], {"p50": 23.0, "p100": 47.0})
+        self.assertEqual(report["profile"]["hour"][0], 12.0)
+        self.assertEqual(report["profile"]["weekday"][:3], [11.5, 35.5, None])
+        self.assertEqual(
+            report["load_duration"],
+            [
+                {"share": round(1 / 48, 6), "value": 47.0},
+                {"share": round(25 / 48, 6), "value": 23.0},
+                {"share": 1.0, "value": 0.0},
+            ],
+        )
+
+    def test_empty_series(self) -> None:
+        report = analyze([], [], [])
+        self.assertEqual((report["hours"], report["mean"], report["peaks"]), (0, None, []))
+        self.assertEqual(report["load_duration"], [])
+
+    def test_query_command_reports_every_stored_metering_point(self) -> None:
+        start = int(datetime(2025, 1, 6, tzinfo=HELSINKI).timestamp())
+        with tempfile.TemporaryDirectory() as tmp:
+            for mp_id, value in (("FI_1", 1.0), ("FI_2", 2.0)):
+                records = [(start + hour * 3600, value, 150) for hour in range(24)]
+                HistoryStore(tmp, mp_id).write_window(
+                    "2025-01-06", start, start + 86400, records, "kWh", False
+                )
+            buf = StringIO()
+            with redirect_stdout(buf):
+                code = cli.main(["query", "--all", "--store", tmp, "--top", "1"])
+        self.assertEqual(code, 0)
+        reports = json.loads(buf.getvalue())["reports"]
+        self.assertEqual([report["metering_point_id"] for report in reports], ["FI_1", "FI_2"])
+        self.assertEqual([report["total"] for report in reports], [24.0, 48.0])
+
+    def test_out_of_range_percentiles_are_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            analyze([0], [1.0], [7200], percentiles=[150])
+        for value in ("150", "-5", "nan", "x"):
+            with self.subTest(value=value), redirect_stderr(StringIO()):
+                with self.assertRaises(SystemExit) as raised:
+                    cli.main(["query", "--percentiles", f"50,{value}"])
+                self.assertEqual(raised.exception.code, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
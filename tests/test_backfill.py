@@ -0,0 +1,95 @@
+import os
+import tempfile
+import unittest
+from datetime import date, datetime
+from unittest.mock import patch
+
+from client.backfill import RateLimiter, run_backfill, week_windows
+from client.fake_server import FakeHelmiServer
+from client.store import HistoryStore
+from client.timeutil import HELSINKI
+
+
+class TestBackfill(unittest.TestCase):
+    def test_week_windows_start_on_monday_and_clip_the_end(self) -> None:
+        until = datetime(2025, 3, 20, 12, tzinfo=HELSINKI)
+        windows = week_windows(date(2025, 3, 5), until)
+        self.assertEqual([key for key, _, _ in windows], ["2025-03-03", "2025-03-10", "2025-03-17"])
+        self.assertEqual(windows[-1][2], until)
+
+    def test_rerun_skips_completed_windows(self) -> None:
+        until = datetime(2025, 4, 7, tzinfo=HELSINKI)
+        with tempfile.TemporaryDirectory() as tmp, FakeHelmiServer() as server:
+            client = server.client()
+            store = HistoryStore(tmp, "FI_JSE000_1000000_0")
+            first = run_backfill(client, store, "jes_1000000", date(2025, 3, 17), until, rate=0)
+            requests_after_first = server.stats["api"]
+            second = run_backfill(client, store, "jes_1000000", date(2025, 3, 17), until, rate=0)
+            records = list(store.iter_records())
+            self.assertEqual(server.stats["api"], requests_after_first)
+        # Three whole weeks, one of them 167 hours long across the DST change.
+        self.assertEqual((first.fetched, first.complete, first.points), (3, 3, 3 * 168 - 1))
+        self.assertEqual((second.skipped, second.fetched), (3, 0))
+        self.assertEqual(len(records), 3 * 168 - 1)
+        self.assertEqual(records, sorted(records))
+
+    def test_interrupted_run_resumes_from_checkpoint(self) -> None:
+        until = datetime(2025, 3, 31, tzinfo=HELSINKI)
+        with tempfile.TemporaryDirectory() as tmp, FakeHelmiServer() as server:
+            store = HistoryStore(tmp, "FI_JSE000_1000000_0")
+            store.write_window("2025-03-17", 0, 0, [], "kWh", complete=True)
+            result = run_backfill(
+                server.client(), store, "jes_1000000", date(2025, 3, 17), until, rate=0
+            )
+            self.assertTrue(os.path.exists(os.path.join(store.directory, "2025-03-24.json")))
+        self.assertEqual((result.skipped, result.fetched), (1, 1))
+
+    def test_empty_window_is_not_checkpointed(self) -> None:
+        until = datetime(2025, 3, 24, tzinfo=HELSINKI)
+        empty = {"data": {"productSeries": []}}
+        with tempfile.TemporaryDirectory() as tmp, FakeHelmiServer() as server:
+            client = server.client()
+            store = HistoryStore(tmp, "FI_JSE000_1000000_0")
+            with patch.object(client, "get_consumption", return_value=empty):
+                result = run_backfill(
+                    client, store, "jes_1000000", date(2025, 3, 17), until, rate=0
+                )
+            completed = store.completed()
+        self.assertEqual((result.fetched, result.complete, result.points), (1, 0, 0))
+        self.assertEqual(completed, {})
+
+    def test_window_with_missing_hours_is_not_checkpointed(self) -> None:
+        until = datetime(2025, 3, 24, tzinfo=HELSINKI)
+        with tempfile.TemporaryDirectory() as tmp, FakeHelmiServer() as server:
+            client = server.client()
+            store = HistoryStore(tmp, "FI_JSE000_1000000_0")
+            fetch = client.get_consumption
+
+            def with_gap(**kwargs: str) -> dict:
+                raw = fetch(**kwargs)
+                del raw["data"]["productSeries"][0]["data"][80]
+                return raw
+
+            with patch.object(client, "get_consumption", side_effect=with_gap):
+                result = run_backfill(
+                    client, store, "jes_1000000", date(2025, 3, 17), until, rate=0
+                )
+            completed = store.completed()
+        self.assertEqual((result.fetched, result.complete, result.points), (1, 0, 167))
+        self.assertEqual(completed, {})
+
+    def test_rate_limiter_spaces_calls(self) -> None:
+        now = [0.0]
+        waits = []
+
+        def sleep(seconds: float) -> None:
+            waits.append(seconds)
+
+        limiter = RateLimiter(4.0, clock=lambda: now[0], sleep=sleep)
+        for _ in range(3):
+            limiter.acquire()
+        self.assertEqual(waits, [0.25, 0.5])
+
+
+if __name__ == "__main__":
+    unittest.main()
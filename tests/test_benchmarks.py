@@ -0,0 +1,60 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from benchmarks import run
+
+
+class TestBenchmarks(unittest.TestCase):
+    def test_compare_scales_baselines(self) -> None:
+        rows = run.compare({"normalize[day]": 3.0, "new[day]": 1.0}, {"normalize[day]": 1.0}, 2.0)
+        self.assertEqual(rows[0], ("normalize[day]", 3.0, 1.0, 1.5))
+        self.assertIsNone(rows[1][3])
+
+    def test_update_then_compare_smallest_size(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "baselines.json")
+            argv = ["--filter", "normalize", "--size", "day", "--baselines", path]
+            with redirect_stdout(io.StringIO()):
+                self.assertEqual(run.main([*argv, "--update"]), 0)
+            with open(path, "r", encoding="utf-8") as handle:
+                stored = json.load(handle)
+            self.assertIn("normalize[day]", stored["benchmarks"])
+            self.assertGreater(stored["calibration"], 0)
+            output = io.StringIO()
+            with redirect_stdout(output):
+                # A huge threshold keeps the check meaningful without being flaky.
+                self.assertEqual(run.main([*argv, "--threshold", "100"]), 0)
+            self.assertIn("normalize[day]", output.getvalue())
+            self.assertNotIn("UNCHECKED", output.getvalue())
+
+    def test_update_leaves_other_baselines_untouched(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "baselines.json")
+            with open(path, "w", encoding="utf-8") as handle:
+                json.dump({"calibration": 1.0, "benchmarks": {"other[day]": 0.5}}, handle)
+            argv = ["--filter", "normalize", "--size", "day", "--baselines", path, "--update"]
+            with redirect_stdout(io.StringIO()):
+                self.assertEqual(run.main(argv), 0)
+            with open(path, "r", encoding="utf-8") as handle:
+                stored = json.load(handle)
+        self.assertEqual(stored["calibration"], 1.0)
+        self.assertEqual(stored["benchmarks"]["other[day]"], 0.5)
+        self.assertIn("normalize[day]", stored["benchmarks"])
+
+    def test_cases_without_baseline_are_unchecked(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "baselines.json")
+            output = io.StringIO()
+            with redirect_stdout(output):
+                argv = ["--filter", "normalize", "--size", "day", "--baselines", path]
+                self.assertEqual(run.main(argv), 0)
+        self.assertIn("normalize[day]", output.getvalue())
+        self.assertIn("UNCHECKED (no baseline)", output.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
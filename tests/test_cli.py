@@ -28,7 +28,9 @@ class TestCLI(unittest.TestCase):
         fake_client = MagicMock()
         fake_client.get_user_sub.return_value = "sub-123"
         fake_client.get_customer_ids.return_value = ["jes_1"]
-        fake_client.get_metering_point_ids.return_value = ["FI_JSE000_1"]
+        fake_client.get_metering_point_ids_by_customer.return_value = {
+            "jes_1": ["FI_JSE000_1"]
+        }
 
         with patch.object(cli, "JSEClient", return_value=fake_client):
             with patch.dict(os.environ, {"JSE_EMAIL": "a", "JSE_PASSWORD": "b"}):
@@ -38,6 +40,49 @@ class TestCLI(unittest.TestCase):
         self.assertEqual(code, 0)
         payload = json.loads(buf.getvalue())
         self.assertEqual(payload["customers"][0]["customer_id"], "jes_1")
+        self.assertEqual(payload["customers"][0]["metering_point_ids"], ["FI_JSE000_1"])
+
+    def test_consumption_ndjson_streams_points(self) -> None:
+        def window(start_time: str, status: int) -> dict:
+            point = {"startTime": start_time, "value": 1.5, "type": "kWh", "status": status}
+            return {"data": {"productSeries": [{"data": [point]}]}}
+
+        fake_client = MagicMock()
+        fake_client.get_user_sub.return_value = "sub-123"
+        fake_client.get_customer_ids.return_value = ["jes_1"]
+        fake_client.iter_consumption_windows.return_value = iter(
+            [
+                window("2026-01-16T22:00:00.000Z", 150),
+                window("2026-01-16T22:00:00.000Z", 150),
+                window("2026-01-16T23:00:00.000Z", 0),
+            ]
+        )
+
+        with patch.object(cli, "JSEClient", return_value=fake_client):
+            with patch.dict(os.environ, {"JSE_EMAIL": "a", "JSE_PASSWORD": "b"}):
+                buf = StringIO()
+                with redirect_stdout(buf):
+                    code = cli.main(
+                        [
+                            "consumption",
+                            "--start",
+                            "2026-01-17",
+                            "--end",
+                            "2026-01-18",
+                            "--granularity",
+                            "hour",
+                            "--metering-point-id",
+                            "FI_JSE000_1",
+                            "--format",
+                            "ndjson",
+                            "--full-only",
+                        ]
+                    )
+        self.assertEqual(code, 0)
+        lines = [json.loads(line) for line in buf.getvalue().splitlines()]
+        self.assertEqual(len(lines), 1)
+        self.assertTrue(lines[0]["ts"].startswith("2026-01-17T00:00:00"))
+        self.assertEqual(lines[0]["unit"], "kWh")
 
 
 if __name__ == "__main__":
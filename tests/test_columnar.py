@@ -0,0 +1,93 @@
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+import client.cli as cli
+from client.columnar import HEADER_SIZE, append_records, open_columns
+from client.store import HistoryStore
+
+
+class TestColumnar(unittest.TestCase):
+    def test_append_new_hours_and_revise_in_place(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            first = append_records(tmp, [(0, 1.0, 150), (3600, 2.0, 100)], {"unit": "kWh"})
+            second = append_records(tmp, [(3600, 2.5, 150), (7200, 3.0, 100)], {})
+            with open_columns(tmp) as columns:
+                rows = (list(columns.epoch), list(columns.value), list(columns.status))
+                meta = columns.meta
+            size = os.path.getsize(os.path.join(tmp, "value.npy"))
+        self.assertEqual((first, second), ((2, 0), (1, 1)))
+        self.assertEqual(rows, ([0, 3600, 7200], [1.0, 2.5, 3.0], [150, 150, 100]))
+        self.assertEqual(meta, {"unit": "kWh"})
+        self.assertEqual(size, HEADER_SIZE + 3 * 8)
+
+    def test_older_hours_rewrite_in_order(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            append_records(tmp, [(7200, 3.0, 150)], {})
+            self.assertEqual(append_records(tmp, [(0, 1.0, 150)], {}), (1, 0))
+            with open_columns(tmp) as columns:
+                self.assertEqual(list(columns.epoch), [0, 7200])
+
+    def test_header_is_npy_v1(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            append_records(tmp, [(0, 1.0, 150)], {})
+            with open(os.path.join(tmp, "status.npy"), "rb") as handle:
+                header = handle.read(HEADER_SIZE)
+        self.assertTrue(header.startswith(b"\x93NUMPY\x01\x00"))
+        self.assertIn(b"'descr': '<u2'", header)
+        self.assertIn(b"'shape': (1,)", header)
+        self.assertTrue(header.endswith(b"\n"))
+
+    def test_export_command_appends_from_store(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = HistoryStore(os.path.join(tmp, "history"), "FI_1")
+            provisional = [(0, 1.0, 150), (3600, 2.0, 100)]
+            store.write_window("2025-03-03", 0, 7200, provisional, "kWh", False)
+            out = os.path.join(tmp, "columns")
+            argv = ["export", "--store", store.root, "--out", out]
+            with redirect_stdout(StringIO()) as first:
+                self.assertEqual(cli.main(argv), 0)
+            final = [(0, 1.0, 150), (3600, 2.5, 150), (7200, 4.0, 150)]
+            store.write_window("2025-03-03", 0, 10800, final, "kWh", True)
+            with redirect_stdout(StringIO()) as second:
+                self.assertEqual(cli.main(argv), 0)
+            with open_columns(out) as columns:
+                values = list(columns.value)
+                meta = columns.meta
+        self.assertEqual(json.loads(first.getvalue())["appended"], 2)
+        summary = json.loads(second.getvalue())
+        self.assertEqual((summary["rows"], summary["appended"], summary["updated"]), (3, 1, 1))
+        self.assertEqual(values, [1.0, 2.5, 4.0])
+        self.assertEqual(meta["metering_point_id"], "FI_1")
+        self.assertEqual(meta["exported_windows"], ["2025-03-03"])
+
+    def test_export_picks_up_a_week_backfilled_later(self) -> None:
+        week = 7 * 86400
+
+        def records(start: int) -> list:
+            return [(epoch, 1.0, 150) for epoch in range(start, start + week, 3600)]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            store = HistoryStore(os.path.join(tmp, "history"), "FI_1")
+            store.write_window("2025-03-03", 0, week, records(0), "kWh", True)
+            store.write_window("2025-03-17", 2 * week, 3 * week, records(2 * week), "kWh", True)
+            out = os.path.join(tmp, "columns")
+            argv = ["export", "--store", store.root, "--out", out]
+            with redirect_stdout(StringIO()):
+                self.assertEqual(cli.main(argv), 0)
+            # The week a failed backfill skipped arrives after the first export.
+            store.write_window("2025-03-10", week, 2 * week, records(week), "kWh", True)
+            with redirect_stdout(StringIO()) as second:
+                self.assertEqual(cli.main(argv), 0)
+            with open_columns(out) as columns:
+                epochs = list(columns.epoch)
+        summary = json.loads(second.getvalue())
+        self.assertEqual((summary["rows"], summary["appended"]), (3 * 168, 168))
+        self.assertEqual(epochs, list(range(0, 3 * week, 3600)))
+
+
+if __name__ == "__main__":
+    unittest.main()
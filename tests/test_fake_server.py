@@ -0,0 +1,60 @@
+import unittest
+from unittest.mock import patch
+
+import requests
+
+from client import jse_client
+from client.fake_server import FakeHelmiServer, FakeServerConfig
+
+
+class TestFakeServer(unittest.TestCase):
+    def test_discovery_and_consumption_range(self) -> None:
+        config = FakeServerConfig(customers=2, metering_points_per_customer=2)
+        with FakeHelmiServer(config) as server:
+            client = server.client()
+            sub = client.get_user_sub()
+            customer_ids = client.get_customer_ids(sub)
+            by_customer = client.get_metering_point_ids_by_customer(customer_ids)
+            raw = client.get_consumption_range(
+                customer_id=customer_ids[0],
+                metering_point_id=by_customer[customer_ids[0]][0],
+                start="2025-03-20",
+                end="2025-04-05",
+                resolution="hour",
+            )
+        self.assertEqual(len(customer_ids), 2)
+        self.assertEqual(len(by_customer[customer_ids[1]]), 2)
+        series = jse_client.normalize_consumption_response(raw, "hour")["series"]
+        # 16 local days including the spring-forward day, fetched in three windows.
+        self.assertEqual(len(series), 16 * 24 - 1)
+        self.assertEqual(series[0]["ts"], "2025-03-20T00:00:00+02:00")
+
+    def test_bad_password_is_rejected(self) -> None:
+        with FakeHelmiServer() as server:
+            with self.assertRaises(requests.HTTPError):
+                server.client(password="wrong").login()
+
+    def test_injected_faults_are_retried(self) -> None:
+        with FakeHelmiServer(FakeServerConfig(fault_script=[401, 503, 429])) as server:
+            client = server.client()
+            with patch.object(jse_client.time, "sleep"):
+                customer_ids = client.get_customer_ids(client.get_user_sub())
+            stats = dict(server.stats)
+        self.assertEqual(customer_ids, ["jes_1000000"])
+        self.assertEqual(stats["status:503"], 1)
+        self.assertEqual(stats["status:429"], 1)
+        # The 401 forced a token refresh before the retried request.
+        self.assertEqual(stats["cognito:InitiateAuth"], 2)
+
+    def test_expired_tokens_use_refresh_flow(self) -> None:
+        with FakeHelmiServer() as server:
+            client = server.client()
+            sub = client.get_user_sub()
+            server.expire_tokens()
+            self.assertEqual(client.get_customer_ids(sub), ["jes_1000000"])
+            self.assertEqual(server.stats["cognito:InitiateAuth"], 2)
+            self.assertEqual(server.stats["status:401"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
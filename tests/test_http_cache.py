@@ -0,0 +1,53 @@
+import os
+import tempfile
+import unittest
+from datetime import date, timedelta
+
+from client.fake_server import FakeHelmiServer
+from client.http_cache import ResponseCache, request_key
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmpdir.cleanup)
+        self.directory = os.path.join(self._tmpdir.name, "http")
+
+    def test_revalidates_and_serves_cached_body_on_304(self) -> None:
+        with FakeHelmiServer() as server:
+            first = server.client(response_cache=ResponseCache(self.directory))
+            sub = first.get_user_sub()
+            expected = first.get_customer_ids(sub)
+            # A new client stands in for the next CLI invocation.
+            second = server.client(response_cache=ResponseCache(self.directory))
+            self.assertEqual(second.get_customer_ids(sub), expected)
+            self.assertEqual(server.stats["status:304"], 1)
+            self.assertEqual(server.stats["status:200"], 1)
+
+    def test_only_final_consumption_windows_are_stored(self) -> None:
+        today = date.today()
+        with FakeHelmiServer() as server:
+            client = server.client(response_cache=ResponseCache(self.directory))
+            customer_id = client.get_customer_ids(client.get_user_sub())[0]
+            mp_id = client.get_metering_point_ids(customer_id)[0]
+            stored = len(os.listdir(self.directory))
+            for start in (today - timedelta(days=10), today - timedelta(days=1)):
+                client.get_consumption(
+                    customer_id, mp_id, start.isoformat(), (start + timedelta(days=1)).isoformat(), "hour"
+                )
+        # The closed day is kept; yesterday still has provisional hours.
+        self.assertEqual(len(os.listdir(self.directory)), stored + 1)
+
+    def test_prunes_least_recently_used(self) -> None:
+        cache = ResponseCache(self.directory, max_entries=2)
+        keys = [request_key("GET", "http://x/a", {"n": n}) for n in range(3)]
+        for index, key in enumerate(keys):
+            cache.put(key, {"If-None-Match": f'"{index}"'}, {"n": index})
+            os.utime(cache._path(key), (index, index))
+        cache.put(keys[2], {"If-None-Match": '"2"'}, {"n": 2})
+        self.assertIsNone(cache.get(keys[0]))
+        self.assertEqual(cache.get(keys[2])["body"], {"n": 2})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,24 @@
+import base64
+import json
+import os
+import tempfile
+import time
 import unittest
 
 from client import jse_client
+from client.cache import FileCache
+
+
+def _id_token(sub: str) -> str:
+    payload = base64.urlsafe_b64encode(json.dumps({"sub": sub}).encode()).rstrip(b"=")
+    return f"header.{payload.decode()}.signature"
+
+
+def _auth_result(access_token: str, refresh_token: str | None = "refresh-1") -> dict:
+    result = {"AccessToken": access_token, "IdToken": _id_token("sub-1"), "ExpiresIn": 3600}
+    if refresh_token:
+        result["RefreshToken"] = refresh_token
+    return {"AuthenticationResult": result}
 
 
 class TestJSEClientHelpers(unittest.TestCase):
@@ -36,6 +54,76 @@ class TestJSEClientHelpers(unittest.TestCase):
         self.assertTrue(ts.startswith("2026-01-17T00:00:00"))
         self.assertTrue(ts.endswith("+02:00"))
 
+    def test_consumption_records_skip_null_values(self) -> None:
+        points = [
+            {"startTime": "2026-01-16T22:00:00.000Z", "value": None, "status": 150},
+            {"startTime": "2026-01-16T23:00:00.000Z", "value": 0.5, "status": 150},
+            {"startTime": "2026-01-17T00:00:00.000Z", "status": 150},
+        ]
+        response = {"data": {"productSeries": [{"data": points}]}}
+        records, _ = jse_client.consumption_records(response)
+        self.assertEqual([record[1:] for record in records], [(0.5, 150)])
+
+
+class TestJSEClientRanges(unittest.TestCase):
+    def test_split_range_hourly_windows(self) -> None:
+        windows = jse_client.split_range(
+            "2026-01-01", "2026-01-20", jse_client.MAX_WINDOW["hour"]
+        )
+        self.assertEqual(len(windows), 3)
+        self.assertEqual(windows[0][0].isoformat(), "2026-01-01T00:00:00+02:00")
+        self.assertEqual(windows[1][0].isoformat(), "2026-01-08T00:00:00+02:00")
+        self.assertEqual(windows[-1][1].isoformat(), "2026-01-20T00:00:00+02:00")
+
+    def test_split_range_keeps_local_midnight_across_dst(self) -> None:
+        windows = jse_client.split_range(
+            "2026-03-25", "2026-04-05", jse_client.MAX_WINDOW["hour"]
+        )
+        self.assertEqual(windows[1][0].isoformat(), "2026-04-01T00:00:00+03:00")
+
+    def test_get_consumption_range_stitches_in_order(self) -> None:
+        client = jse_client.JSEClient(email="a", password="b")
+        client._access_token = lambda: "token"
+
+        def fake_get(customer_id, metering_point_id, start, end, resolution):
+            return {
+                "data": {
+                    "productSeries": [
+                        {"data": [{"startTime": start}, {"startTime": end}]}
+                    ]
+                }
+            }
+
+        client.get_consumption = fake_get
+        raw = client.get_consumption_range(
+            "jes_1", "FI_1", "2026-01-01", "2026-01-20", "hour", max_workers=3
+        )
+        starts = [p["startTime"] for p in raw["data"]["productSeries"][0]["data"]]
+        self.assertEqual(
+            starts,
+            [
+                "2026-01-01T00:00:00+02:00",
+                "2026-01-08T00:00:00+02:00",
+                "2026-01-15T00:00:00+02:00",
+                "2026-01-20T00:00:00+02:00",
+            ],
+        )
+
+    def test_merge_cost_series_single_pass(self) -> None:
+        consumption = [
+            {"startTime": "2026-01-16T22:00:00.000Z", "value": 2.0},
+            {"startTime": "2026-01-16T23:00:00.000Z", "value": 1.0},
+            {"startTime": "2026-01-17T00:00:00.000Z", "value": 3.0},
+        ]
+        prices = [
+            {"startTime": "2026-01-16T21:00:00.000Z", "value": 9.0},
+            {"startTime": "2026-01-16T22:00:00.000Z", "value": 0.1},
+            {"startTime": "2026-01-17T00:00:00.000Z", "value": 0.2},
+        ]
+        merged = jse_client.merge_cost_series(consumption, prices)
+        self.assertEqual([p["price"] for p in merged], [0.1, None, 0.2])
+        self.assertEqual([p["cost"] for p in merged], [0.2, None, 0.6])
+
 
 class TestJSEClientMeteringPoints(unittest.TestCase):
     def test_get_metering_point_ids(self) -> None:
@@ -49,6 +137,98 @@ class TestJSEClientMeteringPoints(unittest.TestCase):
         metering_points = client.get_metering_point_ids("jes_123")
         self.assertEqual(metering_points, ["FI_JSE000_111", "FI_JSE000_222"])
 
+    def test_customer_profiles_batch_with_fallback(self) -> None:
+        client = jse_client.JSEClient(email="a", password="b")
+        requested: list = []
+
+        def fake_api_get(path: str, params: dict | None = None) -> dict:
+            ids = params["customerId[]"]
+            requested.append(ids)
+            # Pretend the server caps the array at two customers.
+            ids = ids if isinstance(ids, list) else [ids]
+            return {
+                "data": [
+                    {
+                        "id": customer_id,
+                        "contracts": [
+                            {"meteringPoint": {"meteringPointId": f"FI_{customer_id}"}}
+                        ],
+                    }
+                    for customer_id in ids[:2]
+                ]
+            }
+
+        client._api_get = fake_api_get
+        result = client.get_metering_point_ids_by_customer(["jes_1", "jes_2", "jes_3"])
+        self.assertEqual(
+            result,
+            {"jes_1": ["FI_jes_1"], "jes_2": ["FI_jes_2"], "jes_3": ["FI_jes_3"]},
+        )
+        self.assertEqual(requested, [["jes_1", "jes_2", "jes_3"], "jes_3"])
+
+
+class TestJSEClientTokenCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.cache = FileCache(os.path.join(self._tmp.name, "tokens.json"))
+        self.calls: list = []
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _client(self) -> jse_client.JSEClient:
+        client = jse_client.JSEClient(email="a", password="b", cache=self.cache)
+
+        def fake_cognito(target: str, payload: dict) -> dict:
+            flow = payload.get("AuthFlow")
+            self.calls.append(flow)
+            if flow == "REFRESH_TOKEN_AUTH":
+                return _auth_result("access-refreshed", refresh_token=None)
+            return _auth_result("access-password")
+
+        client._cognito_request = fake_cognito
+        return client
+
+    def test_cached_tokens_are_shared_between_clients(self) -> None:
+        self.assertEqual(self._client()._access_token(), "access-password")
+        self.assertEqual(self._client()._access_token(), "access-password")
+        self.assertEqual(self.calls, ["USER_PASSWORD_AUTH"])
+
+    def test_expiring_tokens_use_refresh_flow(self) -> None:
+        self._client()._access_token()
+        with self.cache.locked() as data:
+            data["tokens:a"]["expires_at"] = time.time() + 10
+        client = self._client()
+        self.assertEqual(client._access_token(), "access-refreshed")
+        self.assertEqual(self.calls, ["USER_PASSWORD_AUTH", "REFRESH_TOKEN_AUTH"])
+        # The refresh token is kept because Cognito does not return a new one.
+        self.assertEqual(client.tokens.refresh_token, "refresh-1")
+
+    def test_tokens_from_legacy_cache_file_are_reused(self) -> None:
+        self._client()._access_token()
+        self.cache = FileCache(
+            os.path.join(self._tmp.name, "cache.json"), legacy_path=self.cache.path
+        )
+        self.assertEqual(self._client()._access_token(), "access-password")
+        self.assertEqual(self.calls, ["USER_PASSWORD_AUTH"])
+        self.assertTrue(os.path.exists(self.cache.path))
+
+    def test_sub_from_id_token_and_cached_discovery(self) -> None:
+        api_calls: list = []
+
+        def fake_api_get(path: str, params: dict | None = None) -> dict:
+            api_calls.append(path)
+            return {"data": {"customer_ids": ["jes_1"]}}
+
+        for _ in range(2):
+            client = self._client()
+            client._api_get = fake_api_get
+            sub = client.get_user_sub()
+            self.assertEqual(client.get_customer_ids(sub), ["jes_1"])
+        self.assertEqual(sub, "sub-1")
+        self.assertEqual(self.calls, ["USER_PASSWORD_AUTH"])
+        self.assertEqual(api_calls, ["/idm/customerMetadata"])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,112 @@
+import unittest
+from unittest.mock import Mock, patch
+
+from client import jse_client
+from client.fake_server import FakeHelmiServer, FakeServerConfig
+from client.retry import (
+    FAIL,
+    NOT_MODIFIED,
+    OK,
+    RETRY,
+    UNAUTHORIZED,
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryPolicy,
+    classify_status,
+    parse_retry_after,
+)
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def test_full_jitter_and_retry_after(self) -> None:
+        policy = RetryPolicy(base_delay=0.5, max_delay=4.0, max_retry_after=10.0)
+        self.assertEqual(policy.backoff(0, rng=lambda: 1.0), 0.5)
+        self.assertEqual(policy.backoff(5, rng=lambda: 1.0), 4.0)
+        self.assertEqual(policy.backoff(3, rng=lambda: 0.0), 0.0)
+        self.assertEqual(policy.backoff(0, retry_after=7.0), 7.0)
+        self.assertEqual(policy.backoff(0, retry_after=120.0), 10.0)
+
+    def test_attempts_and_deadline(self) -> None:
+        policy = RetryPolicy(max_attempts=3, deadline=5.0)
+        self.assertIsNotNone(policy.next_delay(0, 0.0, retry_after=1.0))
+        self.assertIsNone(policy.next_delay(2, 0.0, retry_after=1.0))
+        self.assertIsNone(policy.next_delay(0, 4.5, retry_after=1.0))
+        self.assertEqual(policy.timeout(4.0), 1.0)
+
+    def test_parse_retry_after(self) -> None:
+        self.assertEqual(parse_retry_after("12"), 12.0)
+        self.assertEqual(
+            parse_retry_after("Thu, 01 Jan 1970 00:01:00 GMT", now=30.0), 30.0
+        )
+        self.assertIsNone(parse_retry_after("soon"))
+        self.assertIsNone(parse_retry_after(None))
+
+    def test_classify_status(self) -> None:
+        self.assertEqual(
+            [classify_status(status) for status in (200, 304, 401, 403, 404, 429, 503)],
+            [OK, NOT_MODIFIED, UNAUTHORIZED, UNAUTHORIZED, FAIL, RETRY, RETRY],
+        )
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_opens_then_probes_once(self) -> None:
+        now = [0.0]
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10.0, clock=lambda: now[0])
+        breaker.record_failure()
+        breaker.before_request()
+        breaker.record_failure()
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_request()
+        now[0] = 11.0
+        breaker.before_request()
+        # Only one probe goes out while half-open.
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_request()
+        breaker.record_failure()
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_request()
+        now[0] = 22.0
+        breaker.before_request()
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        breaker.before_request()
+
+    def test_probe_without_outcome_is_released(self) -> None:
+        now = [0.0]
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10.0, clock=lambda: now[0])
+        breaker.record_failure()
+        now[0] = 11.0
+        session = Mock()
+        session.request.side_effect = ValueError("unexpected")
+        with self.assertRaises(ValueError):
+            jse_client._request_with_retry(session, "GET", "http://x", {}, breaker=breaker)
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        # The next request becomes the probe instead of being rejected for good.
+        self.assertTrue(breaker.before_request())
+
+
+class TestRequestWithRetry(unittest.TestCase):
+    def test_retry_after_is_honoured(self) -> None:
+        config = FakeServerConfig(fault_script=[429], retry_after=2)
+        with FakeHelmiServer(config) as server:
+            client = server.client()
+            with patch.object(jse_client.time, "sleep") as sleep:
+                client.get_customer_ids(client.get_user_sub())
+        sleep.assert_called_once_with(2.0)
+
+    def test_outage_trips_breaker_and_fails_fast(self) -> None:
+        with FakeHelmiServer(FakeServerConfig(rate_5xx=1.0)) as server:
+            client = server.client(breaker=CircuitBreaker(failure_threshold=2))
+            sub = client.get_user_sub()
+            with patch.object(jse_client.time, "sleep"):
+                with self.assertRaises(RuntimeError):
+                    client.get_customer_ids(sub)
+                sent = server.stats["api"]
+                with self.assertRaises(CircuitOpenError):
+                    client.get_customer_ids(sub)
+            self.assertEqual(sent, 2)
+            self.assertEqual(server.stats["api"], sent)
+
+
+if __name__ == "__main__":
+    unittest.main()
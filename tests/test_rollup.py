@@ -0,0 +1,73 @@
+import json
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from datetime import date, datetime
+from io import StringIO
+
+import client.cli as cli
+from client.rollup import DAY, MONTH, WEEK, rollup
+from client.store import HistoryStore
+from client.timeutil import HELSINKI, helsinki_offsets
+
+
+def _hours(start: datetime, end: datetime) -> list:
+    return list(range(int(start.timestamp()), int(end.timestamp()), 3600))
+
+
+class TestRollup(unittest.TestCase):
+    def test_days_follow_local_midnights_across_dst(self) -> None:
+        epochs = _hours(
+            datetime(2025, 3, 29, tzinfo=HELSINKI), datetime(2025, 4, 1, tzinfo=HELSINKI)
+        )
+        values = [1.0] * len(epochs)
+        statuses = [150] * len(epochs)
+        days = rollup(epochs, values, statuses, helsinki_offsets(epochs), DAY)
+        self.assertEqual(
+            [(day.start, day.points) for day in days],
+            [(date(2025, 3, 29), 24), (date(2025, 3, 30), 23), (date(2025, 3, 31), 24)],
+        )
+        self.assertEqual(days[1].total, 23.0)
+
+    def test_weeks_and_months(self) -> None:
+        epochs = _hours(
+            datetime(2025, 10, 20, tzinfo=HELSINKI), datetime(2025, 11, 4, tzinfo=HELSINKI)
+        )
+        values = [0.5] * len(epochs)
+        statuses = [150] * (len(epochs) - 1) + [100]
+        offsets = helsinki_offsets(epochs)
+        weeks = rollup(epochs, values, statuses, offsets, WEEK)
+        months = rollup(epochs, values, statuses, offsets, MONTH)
+        self.assertEqual(
+            [week.start for week in weeks],
+            [date(2025, 10, 20), date(2025, 10, 27), date(2025, 11, 3)],
+        )
+        # Summer time ends on Sunday 2025-10-26, so that week has an extra hour.
+        self.assertEqual([week.points for week in weeks], [169, 168, 24])
+        self.assertEqual(
+            [(month.start, month.points) for month in months],
+            [(date(2025, 10, 1), 12 * 24 + 1), (date(2025, 11, 1), 72)],
+        )
+        self.assertEqual([month.final for month in months], [True, False])
+
+    def test_rollup_command_flags_incomplete_periods(self) -> None:
+        epochs = _hours(
+            datetime(2025, 3, 30, tzinfo=HELSINKI), datetime(2025, 3, 31, 12, tzinfo=HELSINKI)
+        )
+        records = [(epoch, 1.0, 150) for epoch in epochs]
+        with tempfile.TemporaryDirectory() as tmp:
+            store = HistoryStore(tmp, "FI_1")
+            store.write_window("2025-03-24", epochs[0], epochs[-1] + 3600, records, "kWh", False)
+            buf = StringIO()
+            with redirect_stdout(buf):
+                code = cli.main(["rollup", "--period", "day", "--store", tmp])
+        self.assertEqual(code, 0)
+        periods = json.loads(buf.getvalue())["periods"]
+        self.assertEqual(
+            [(p["start"], p["hours"], p["expected_hours"], p["complete"]) for p in periods],
+            [("2025-03-30", 23, 23, True), ("2025-03-31", 12, 24, False)],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+import importlib.util
+import os
+import unittest
+
+# scheduler.py is plain Python; load it by path so the integration package
+# (and Home Assistant) is not imported.
+_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "custom_components",
+    "jse_helmi",
+    "scheduler.py",
+)
+_spec = importlib.util.spec_from_file_location("jse_helmi_scheduler", _PATH)
+scheduler = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(scheduler)
+
+
+class TestPublishScheduler(unittest.TestCase):
+    def test_next_day_lag_is_learned(self) -> None:
+        lag = 30 * 3600
+        hour = 1_700_000_000 // 3600 * 3600
+        publisher = scheduler.PublishScheduler(default_lag=600)
+        # The hour was missing one poll before it appeared, 30 hours after it ended.
+        publisher.observe(hour + 3600 + lag - 60, hour - 3600, hour - 3600)
+        self.assertTrue(publisher.observe(hour + 3600 + lag + 60, hour - 3600, hour))
+        self.assertEqual(publisher.lags, [lag])
+        self.assertEqual(publisher.next_poll(hour + 3600 + lag + 60, hour), hour + 2 * 3600 + lag)
+
+    def test_long_lags_are_clamped(self) -> None:
+        publisher = scheduler.PublishScheduler(default_lag=600)
+        hour = 1_700_000_000 // 3600 * 3600
+        publisher.observe(hour + 10 * 86400, hour - 3600, hour)
+        self.assertEqual(publisher.lags, [scheduler.MAX_LAG_SECONDS])
+
+
+if __name__ == "__main__":
+    unittest.main()
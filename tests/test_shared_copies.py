@@ -0,0 +1,28 @@
+import os
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Pure modules the CLI and the Home Assistant integration each carry a copy of,
+# since the integration cannot import from client/.
+SHARED = ("retry.py", "rollup.py")
+
+
+def _read(*parts: str) -> bytes:
+    with open(os.path.join(ROOT, *parts), "rb") as handle:
+        return handle.read()
+
+
+class TestSharedCopies(unittest.TestCase):
+    def test_copies_are_identical(self) -> None:
+        for name in SHARED:
+            with self.subTest(name=name):
+                self.assertEqual(
+                    _read("client", name),
+                    _read("custom_components", "jse_helmi", name),
+                    f"client/{name} and custom_components/jse_helmi/{name} have drifted",
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
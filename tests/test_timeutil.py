@@ -0,0 +1,47 @@
+import unittest
+from datetime import datetime, timezone
+
+from client import jse_client, timeutil
+
+
+class TestTimeUtil(unittest.TestCase):
+    def test_fast_path_matches_zoneinfo_across_dst(self) -> None:
+        start = int(datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp())
+        end = int(datetime(2027, 1, 1, tzinfo=timezone.utc).timestamp())
+        epochs = list(range(start, end, 3600))
+        offsets = timeutil.helsinki_offsets(epochs)
+        for epoch, offset in zip(epochs, offsets):
+            utc = datetime.fromtimestamp(epoch, timezone.utc)
+            text = utc.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+            self.assertEqual(timeutil.parse_api_epoch(text), epoch)
+            self.assertEqual(timeutil.helsinki_offset(epoch), offset)
+            self.assertEqual(
+                timeutil.format_local_iso(epoch, offset),
+                utc.astimezone(timeutil.HELSINKI).isoformat(),
+            )
+
+    def test_parse_api_epoch_rejects_other_formats(self) -> None:
+        for text in (
+            "2026-01-17T10:00:00Z",
+            "2026-01-17T10:00:00.250Z",
+            "2026-01-17T10:00:00.000+02:00",
+            "2026-01-17",
+        ):
+            self.assertIsNone(timeutil.parse_api_epoch(text))
+        # Slow path still handles them.
+        self.assertEqual(
+            jse_client._to_helsinki_iso("2026-01-17T10:00:00Z"), "2026-01-17T12:00:00+02:00"
+        )
+
+    def test_offsets_outside_table_and_unsorted(self) -> None:
+        summer = int(datetime(2026, 7, 1, tzinfo=timezone.utc).timestamp())
+        winter = int(datetime(2026, 1, 1, tzinfo=timezone.utc).timestamp())
+        early = int(datetime(1990, 7, 1, tzinfo=timezone.utc).timestamp())
+        self.assertEqual(
+            timeutil.helsinki_offsets([summer, winter, early]), [10800, 7200, 10800]
+        )
+        self.assertIsNone(timeutil.helsinki_offset(early))
+
+
+if __name__ == "__main__":
+    unittest.main()